@@ -6,7 +6,12 @@ from alembic import context
 
 from base.model import BaseModel
 from config import settings
+from analytics.models.model import (
+    AnalyticsResultModel, AnalyticsJobModel, TrainedModelModel,
+    TunedParamsModel
+)
 from attachment.models.model import AttachmentModel
+from info.models.model import DatasetProfileModel
 from endpoint.models.model import EndpointModel
 from permission.models.model import PermissionModel
 from role.models.model import RoleModel
@@ -0,0 +1,41 @@
+"""trained-model-unique
+
+Revision ID: 2f8a6c1d9b53
+Revises: 9e3b6d1f4a27
+Create Date: 2026-02-03 11:26:47.518302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2f8a6c1d9b53'
+down_revision: Union[str, Sequence[str], None] = '9e3b6d1f4a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Повторные версии от параллельных запусков: остается первая запись
+    op.execute(sa.text(
+        'DELETE FROM trained_model AS duplicate '
+        'USING trained_model AS original '
+        'WHERE duplicate.model_name = original.model_name '
+        'AND duplicate.dataset_etag = original.dataset_etag '
+        'AND duplicate.params_hash = original.params_hash '
+        'AND duplicate.id > original.id'
+    ))
+    op.create_unique_constraint(
+        'uq_trained_model_version',
+        'trained_model',
+        ['model_name', 'dataset_etag', 'params_hash']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_trained_model_version', 'trained_model', type_='unique')
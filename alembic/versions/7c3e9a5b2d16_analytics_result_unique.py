@@ -0,0 +1,40 @@
+"""analytics-result-unique
+
+Revision ID: 7c3e9a5b2d16
+Revises: 2f8a6c1d9b53
+Create Date: 2026-02-05 09:14:33.870215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3e9a5b2d16'
+down_revision: Union[str, Sequence[str], None] = '2f8a6c1d9b53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Повторные результаты от параллельных запросов: остается первая запись
+    op.execute(sa.text(
+        'DELETE FROM analytics_result AS duplicate '
+        'USING analytics_result AS original '
+        'WHERE duplicate.dataset_etag = original.dataset_etag '
+        'AND duplicate.config_hash = original.config_hash '
+        'AND duplicate.id > original.id'
+    ))
+    op.create_unique_constraint(
+        'uq_analytics_result_config',
+        'analytics_result',
+        ['dataset_etag', 'config_hash']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_analytics_result_config', 'analytics_result', type_='unique')
@@ -0,0 +1,100 @@
+from typing import Any
+from sqlalchemy import JSON, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from base.model import BaseModel
+
+
+class AnalyticsResultModel(BaseModel):
+    '''
+    SQL Alchemy модель сохраненного результата аналитики
+
+    Args:
+        id (int): Идентификатор
+        dataset_etag (Mapped[str]): ETag обучающей выборки в MinIO
+        config_hash (Mapped[str]): Хэш конфигурации моделей
+        result (Mapped[dict[str, Any]]): Результат аналитики
+    '''
+    __tablename__ = 'analytics_result'
+    __table_args__ = (
+        UniqueConstraint(
+            'dataset_etag', 'config_hash',
+            name='uq_analytics_result_config'
+        ),
+    )
+
+    dataset_etag: Mapped[str] = mapped_column(nullable=False, index=True)
+    config_hash: Mapped[str] = mapped_column(nullable=False)
+    result: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
+
+
+class AnalyticsJobModel(BaseModel):
+    '''
+    SQL Alchemy модель фоновой задачи аналитики
+
+    Args:
+        id (int): Идентификатор задачи
+        status (Mapped[str]): Статус задачи: pending, running, done, \
+            failed, cancelled
+        stages (Mapped[dict[str, float]]): Прогресс этапов задачи от 0 до 1
+        result (Mapped[dict[str, Any] | None]): Результат аналитики
+        error (Mapped[str | None]): Текст ошибки
+    '''
+    __tablename__ = 'analytics_job'
+
+    status: Mapped[str] = mapped_column(nullable=False, index=True)
+    stages: Mapped[dict[str, float]] = mapped_column(JSON, nullable=False)
+    result: Mapped[dict[str, Any] | None] = mapped_column(JSON, nullable=True)
+    error: Mapped[str | None] = mapped_column(nullable=True)
+
+
+class TrainedModelModel(BaseModel):
+    '''
+    SQL Alchemy модель обученной модели классификации, \
+        сохраненной в MinIO
+
+    Args:
+        id (int): Идентификатор
+        model_name (Mapped[str]): Класс модели
+        dataset_etag (Mapped[str]): ETag обучающей выборки в MinIO
+        params_hash (Mapped[str]): Хэш гиперпараметров модели
+        params (Mapped[dict[str, Any]]): Гиперпараметры модели
+        object_name (Mapped[str]): Имя объекта модели в MinIO
+        size (Mapped[int]): Размер сериализованной модели в байтах
+    '''
+    __tablename__ = 'trained_model'
+    __table_args__ = (
+        UniqueConstraint(
+            'model_name', 'dataset_etag', 'params_hash',
+            name='uq_trained_model_version'
+        ),
+    )
+
+    model_name: Mapped[str] = mapped_column(nullable=False)
+    dataset_etag: Mapped[str] = mapped_column(nullable=False, index=True)
+    params_hash: Mapped[str] = mapped_column(nullable=False)
+    params: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
+    object_name: Mapped[str] = mapped_column(nullable=False)
+    size: Mapped[int] = mapped_column(nullable=False)
+
+
+class TunedParamsModel(BaseModel):
+    '''
+    SQL Alchemy модель лучших гиперпараметров модели, \
+        найденных поиском гиперпараметров
+
+    Args:
+        id (int): Идентификатор
+        model_name (Mapped[str]): Класс модели
+        params (Mapped[dict[str, Any]]): Гиперпараметры модели
+        metric (Mapped[str]): Метрика, по которой выбирались гиперпараметры
+        score (Mapped[float]): Значение метрики на валидационной части
+        dataset_etag (Mapped[str]): ETag обучающей выборки, \
+            на которой выполнялся поиск
+    '''
+    __tablename__ = 'tuned_params'
+
+    model_name: Mapped[str] = mapped_column(nullable=False, unique=True)
+    params: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
+    metric: Mapped[str] = mapped_column(nullable=False)
+    score: Mapped[float] = mapped_column(nullable=False)
+    dataset_etag: Mapped[str] = mapped_column(nullable=False)
@@ -0,0 +1,58 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from base.repository import BaseRepository
+from analytics.models.model import (
+    AnalyticsResultModel, AnalyticsJobModel, TrainedModelModel,
+    TunedParamsModel
+)
+
+
+class AnalyticsResultRepository(BaseRepository[AnalyticsResultModel]):
+    '''Обработка сохраненных результатов аналитики в БД'''
+
+    def __init__(self, db: AsyncSession):
+        '''
+        Обработка сохраненных результатов аналитики в БД
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД
+        '''
+        super().__init__(db)
+
+
+class AnalyticsJobRepository(BaseRepository[AnalyticsJobModel]):
+    '''Обработка данных фоновых задач аналитики в БД'''
+
+    def __init__(self, db: AsyncSession):
+        '''
+        Обработка данных фоновых задач аналитики в БД
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД
+        '''
+        super().__init__(db)
+
+
+class TrainedModelRepository(BaseRepository[TrainedModelModel]):
+    '''Обработка данных обученных моделей в БД'''
+
+    def __init__(self, db: AsyncSession):
+        '''
+        Обработка данных обученных моделей в БД
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД
+        '''
+        super().__init__(db)
+
+
+class TunedParamsRepository(BaseRepository[TunedParamsModel]):
+    '''Обработка данных лучших гиперпараметров моделей в БД'''
+
+    def __init__(self, db: AsyncSession):
+        '''
+        Обработка данных лучших гиперпараметров моделей в БД
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД
+        '''
+        super().__init__(db)
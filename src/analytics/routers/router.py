@@ -1,6 +1,19 @@
-from fastapi import APIRouter, Depends
-from analytics.services.service import AnalyticsService
-from dependencies.services import analytics_service
+from typing import Literal
+from fastapi import APIRouter, Depends, Request, status
+from fastapi.responses import StreamingResponse
+from analytics.services.service import AnalyticsService, AnalyticsMode
+from analytics.services.job_service import AnalyticsJobService, AnalyticsJobRunner
+from analytics.services.prediction_service import PredictionService
+from analytics.services.search_service import SearchService
+from analytics.services.roc_service import RocOutput
+from analytics.schemas.schema import (
+    AnalyticsJobSchema, PredictionSchema,
+    SearchRequestSchema, SearchResultSchema
+)
+from dependencies.services import (
+    analytics_service, analytics_job_service, analytics_job_runner,
+    prediction_service, search_service
+)
 
 router = APIRouter(prefix='/analytics', tags=['Аналитика'])
 
@@ -8,7 +21,132 @@ router = APIRouter(prefix='/analytics', tags=['Аналитика'])
 @router.get(
     path="/",
     summary='Получение аналитики',
-    description=('Получение аналитики. '),
+    description=('Получение аналитики. '
+                 'Режим `chunked` обучает модели с `partial_fit` '
+                 'по фрагментам выборки, для выборок больше памяти. '
+                 'ROC-кривые возвращаются рядом точек `roc=points` '
+                 'или URL изображений `roc=image`'),
+)
+async def get_users(
+    mode: AnalyticsMode = 'holdout',
+    roc: RocOutput = 'points',
+    service: AnalyticsService = Depends(analytics_service)
+):
+    return await service.analyze(mode=mode, roc=roc)
+
+
+@router.post(
+    path='/jobs',
+    summary='Запуск аналитики в фоне',
+    description=('Запуск аналитики в фоне. '
+                 'Возвращает задачу, статус которой можно запрашивать '
+                 'по ее идентификатору'),
+    response_model=AnalyticsJobSchema,
+    status_code=status.HTTP_202_ACCEPTED
+)
+async def create_job(
+    mode: AnalyticsMode = 'holdout',
+    roc: RocOutput = 'points',
+    service: AnalyticsJobService = Depends(analytics_job_service),
+    runner: AnalyticsJobRunner = Depends(analytics_job_runner)
+):
+    job = await service.create_job()
+    runner.start(job.id, mode, roc)
+    return job
+
+
+@router.get(
+    path='/jobs/{job_id}',
+    summary='Получение задачи аналитики',
+    description=('Получение статуса, прогресса этапов '
+                 'и результата задачи аналитики'),
+    response_model=AnalyticsJobSchema
+)
+async def get_job(
+    job_id: int,
+    service: AnalyticsJobService = Depends(analytics_job_service)
+):
+    return await service.get({'id': job_id})
+
+
+@router.delete(
+    path='/jobs/{job_id}',
+    summary='Отмена задачи аналитики',
+    description=('Отмена задачи аналитики. '
+                 'Завершенные задачи не изменяются. '
+                 'Обучение, уже начатое в пуле процессов, не прерывается: '
+                 'оно досчитывается, а результат отбрасывается'),
+    response_model=AnalyticsJobSchema
+)
+async def cancel_job(
+    job_id: int,
+    service: AnalyticsJobService = Depends(analytics_job_service),
+    runner: AnalyticsJobRunner = Depends(analytics_job_runner)
+):
+    job = await service.cancel(job_id)
+    if job.status == service.CANCELLED:
+        runner.cancel(job_id)
+    return job
+
+
+@router.post(
+    path='/predict',
+    summary='Предсказание релевантности',
+    description=('Предсказание релевантности для пакета строк признаков '
+                 'обученной моделью. Тело запроса: JSON '
+                 '`{"rows": [{"признак": значение}, ...]}` '
+                 'или CSV (text/csv) с разделителем `;`'),
+    response_model=PredictionSchema
+)
+async def predict(
+    request: Request,
+    model: str = 'RandomForestClassifier',
+    service: PredictionService = Depends(prediction_service)
+):
+    rows = service.read_rows(
+        await request.body(),
+        request.headers.get('content-type', '')
+    )
+    return await service.predict(model, rows)
+
+
+@router.post(
+    path='/predict/stream',
+    summary='Потоковое предсказание релевантности для CSV-файла',
+    description=('Предсказание релевантности для CSV-файла '
+                 'произвольного размера. Тело запроса: CSV (text/csv) '
+                 'с разделителем `;`. Результат передается потоком '
+                 'по мере обработки фрагментов файла, последняя строка - '
+                 'количество строк и скорость обработки в строках в секунду'),
+    response_class=StreamingResponse
+)
+async def predict_stream(
+    request: Request,
+    model: str = 'RandomForestClassifier',
+    format: Literal['ndjson', 'csv'] = 'ndjson',
+    service: PredictionService = Depends(prediction_service)
+):
+    content = await service.score_stream(model, request.stream(), format)
+    return StreamingResponse(content, media_type=service.MEDIA_TYPES[format])
+
+
+@router.post(
+    path='/search',
+    summary='Поиск гиперпараметров',
+    description=('Поиск гиперпараметров моделей методом последовательного '
+                 'деления пополам с ограничением времени и процессорного '
+                 'времени. Лучшие гиперпараметры используются '
+                 'следующими запусками аналитики'),
+    response_model=SearchResultSchema
 )
-async def get_users(service: AnalyticsService = Depends(analytics_service)):
-    return await service.analyze()
+async def search(
+    request: SearchRequestSchema,
+    service: SearchService = Depends(search_service)
+):
+    return await service.search(
+        model_names=request.models,
+        space=request.space,
+        metric=request.metric,
+        budget_seconds=request.budget_seconds,
+        cpu_budget_seconds=request.cpu_budget_seconds
+    )
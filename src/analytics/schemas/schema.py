@@ -0,0 +1,116 @@
+from typing import Any, Literal
+from pydantic import Field
+from base.schema import BaseSchema, BaseSimpleSchema
+
+
+class AnalyticsJobSchema(BaseSchema):
+    '''
+    Pydantic-схема фоновой задачи аналитики
+
+    Args:
+        id (int): Идентификатор задачи
+        status (str): Статус задачи: pending, running, done, \
+            failed, cancelled
+        stages (dict[str, float]): Прогресс этапов задачи от 0 до 1
+        result (dict[str, Any] | None): Результат аналитики
+        error (str | None): Текст ошибки
+    '''
+    status: str
+    stages: dict[str, float]
+    result: dict[str, Any] | None = None
+    error: str | None = None
+
+
+class PredictionSchema(BaseSimpleSchema):
+    '''
+    Pydantic-схема результата предсказания
+
+    Args:
+        model (str): Класс модели
+        classes (list[int]): Классы целевого признака
+        predictions (list[int]): Предсказанный класс для каждой строки
+        probabilities (list[list[float]]): Вероятности классов \
+            для каждой строки в порядке `classes`
+    '''
+    model: str
+    classes: list[int]
+    predictions: list[int]
+    probabilities: list[list[float]]
+
+
+class SearchRequestSchema(BaseSimpleSchema):
+    '''
+    Pydantic-схема запроса поиска гиперпараметров
+
+    Args:
+        models (list[str] | None): Классы моделей, \
+            `None` - все модели из пространства поиска
+        space (dict[str, dict[str, list[Any]]] | None): Значения \
+            гиперпараметров по классу модели вместо пространства \
+            поиска по умолчанию
+        metric (str): Метрика, по которой выбираются гиперпараметры
+        budget_seconds (float | None): Ограничение времени поиска, секунды
+        cpu_budget_seconds (float | None): Ограничение процессорного \
+            времени всех оценок, секунды
+    '''
+    models: list[str] | None = None
+    space: dict[str, dict[str, list[Any]]] | None = None
+    metric: Literal[
+        'accuracy', 'precision', 'recall', 'balanced_accuracy', 'f1'
+    ] = 'f1'
+    budget_seconds: float | None = Field(default=None, gt=0)
+    cpu_budget_seconds: float | None = Field(default=None, gt=0)
+
+
+class SearchRoundSchema(BaseSimpleSchema):
+    '''
+    Pydantic-схема раунда поиска гиперпараметров
+
+    Args:
+        rows (int): Количество строк обучения
+        candidates (int): Количество наборов гиперпараметров в раунде
+        evaluated (int): Количество оцененных наборов до исчерпания бюджета
+        failed (int): Количество наборов, неприменимых к этой части \
+            выборки, например n_neighbors больше количества строк
+        best_score (float | None): Лучшее значение метрики в раунде, \
+            `None` - ни один набор не оценен
+    '''
+    rows: int
+    candidates: int
+    evaluated: int
+    failed: int
+    best_score: float | None
+
+
+class SearchModelSchema(BaseSimpleSchema):
+    '''
+    Pydantic-схема результата поиска гиперпараметров модели
+
+    Args:
+        model (str): Класс модели
+        params (dict[str, Any] | None): Лучшие гиперпараметры
+        score (float | None): Значение метрики лучших гиперпараметров
+        rounds (list[SearchRoundSchema]): Раунды поиска
+    '''
+    model: str
+    params: dict[str, Any] | None
+    score: float | None
+    rounds: list[SearchRoundSchema]
+
+
+class SearchResultSchema(BaseSimpleSchema):
+    '''
+    Pydantic-схема результата поиска гиперпараметров
+
+    Args:
+        metric (str): Метрика, по которой выбирались гиперпараметры
+        elapsed (float): Время поиска, секунды
+        cpu_time (float): Процессорное время всех оценок, секунды
+        budget_exhausted (bool): Поиск остановлен по исчерпанию бюджета
+        models (list[SearchModelSchema]): Результаты по моделям
+    '''
+    metric: str
+    elapsed: float
+    cpu_time: float
+    budget_exhausted: bool
+    models: list[SearchModelSchema]
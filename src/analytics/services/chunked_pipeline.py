@@ -0,0 +1,302 @@
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from typing import IO, Any, Iterator
+from urllib.request import urlopen
+from sklearn.base import ClassifierMixin
+from sklearn.preprocessing import StandardScaler
+from analytics.services.pipeline import curve_report, matrix_frame
+from analytics.services.metrics import matrix_scores, threshold_sweep
+from analytics.services.registry_service import ModelArtifact
+from analytics.services.preprocessing import feature_columns, needs_scaling
+
+# Количество интервалов гистограммы вероятностей для ROC-кривой
+ROC_BINS = 1000
+# Количество различных значений релевантности, до которого
+# медиана считается точно по частотам значений
+MEDIAN_MAX_VALUES = 10_000
+# Количество интервалов гистограммы релевантности для медианы
+# выборки с большим числом различных значений
+MEDIAN_BINS = 100_000
+# Размер фрагмента копирования выборки из MinIO во временный файл
+SPOOL_CHUNK_SIZE = 1024 * 1024
+
+
+def spool(url: str, file: IO[bytes]) -> None:
+    '''
+    Копирование CSV по URL во временный файл фрагментами. \
+        Выборка загружается из MinIO один раз, проходы читают \
+        локальный файл
+
+    Args:
+        url (str): URL-файла
+        file (IO[bytes]): Временный файл
+    '''
+    with urlopen(url) as response:
+        shutil.copyfileobj(response, file, SPOOL_CHUNK_SIZE)
+    file.flush()
+
+
+def read_chunks(
+    path: str,
+    chunk_rows: int,
+    columns: list[str] | None = None
+) -> Iterator[pd.DataFrame]:
+    '''
+    Потоковое чтение CSV фрагментами
+
+    Args:
+        path (str): Путь к файлу
+        chunk_rows (int): Количество строк во фрагменте
+        columns (list[str] | None): Читаемые столбцы, `None` - все
+
+    Yields:
+        pd.DataFrame: Фрагмент выборки
+    '''
+    with pd.read_csv(
+        path,
+        sep=';',
+        encoding='utf-8',
+        usecols=columns,
+        chunksize=chunk_rows
+    ) as reader:
+        yield from reader
+
+
+def split_chunks(
+    path: str,
+    chunk_rows: int,
+    test_size: float,
+    random_state: int
+) -> Iterator[tuple[pd.DataFrame, np.ndarray]]:
+    '''
+    Фрагменты выборки с маской тестовой части. Маска зависит \
+        только от номера строки, поэтому совпадает во всех проходах
+
+    Args:
+        path (str): Путь к файлу
+        chunk_rows (int): Количество строк во фрагменте
+        test_size (float): Доля тестовой части выборки
+        random_state (int): Начальное значение генератора
+
+    Yields:
+        tuple[pd.DataFrame, np.ndarray]: Фрагмент выборки \
+            и маска его строк, попавших в тестовую часть
+    '''
+    rng = np.random.default_rng(random_state)
+    for chunk in read_chunks(path, chunk_rows):
+        yield chunk, rng.random(len(chunk)) < test_size
+
+
+def count_values(
+    counts: dict[float, int] | None,
+    values: np.ndarray
+) -> dict[float, int] | None:
+    '''
+    Добавление фрагмента столбца к частотам его значений
+
+    Args:
+        counts (dict[float, int] | None): Частоты значений, \
+            `None` - различных значений больше `MEDIAN_MAX_VALUES`
+        values (np.ndarray): Значения фрагмента без пропусков
+
+    Returns:
+        dict[float, int] | None: Частоты значений, `None` - различных \
+            значений больше `MEDIAN_MAX_VALUES`
+    '''
+    if counts is None:
+        return None
+    for value, count in zip(*np.unique(values, return_counts=True)):
+        counts[float(value)] = counts.get(float(value), 0) + int(count)
+    return counts if len(counts) <= MEDIAN_MAX_VALUES else None
+
+
+def counts_median(counts: dict[float, int]) -> float:
+    '''
+    Точная медиана по частотам значений, как у `np.median`: \
+        при четном количестве - среднее двух центральных значений
+
+    Args:
+        counts (dict[float, int]): Частоты значений
+
+    Returns:
+        float: Медиана
+    '''
+    values = np.array(sorted(counts))
+    cumulative = np.cumsum([counts[value] for value in values])
+    total = int(cumulative[-1])
+    lower = values[np.searchsorted(cumulative, (total - 1) // 2, side='right')]
+    upper = values[np.searchsorted(cumulative, total // 2, side='right')]
+    return float((lower + upper) / 2)
+
+
+def histogram_median(
+    path: str,
+    chunk_rows: int,
+    low: float,
+    high: float
+) -> float:
+    '''
+    Приближенная медиана релевантности по гистограмме из `MEDIAN_BINS` \
+        интервалов между минимумом и максимумом. Ошибка не больше \
+        ширины интервала, в памяти хранится только гистограмма
+
+    Args:
+        path (str): Путь к файлу выборки
+        chunk_rows (int): Количество строк во фрагменте
+        low (float): Минимум релевантности
+        high (float): Максимум релевантности
+
+    Returns:
+        float: Медиана
+    '''
+    edges = np.linspace(low, high, MEDIAN_BINS + 1)
+    histogram = np.zeros(MEDIAN_BINS, dtype=np.int64)
+    for chunk in read_chunks(path, chunk_rows, ['relevance']):
+        values = chunk['relevance'].dropna().to_numpy()
+        histogram += np.histogram(values, bins=edges)[0]
+    cumulative = np.cumsum(histogram)
+    half = cumulative[-1] / 2
+    i = int(np.searchsorted(cumulative, half))
+    before = cumulative[i - 1] if i > 0 else 0
+    # Линейная интерполяция внутри интервала медианы
+    share = (half - before) / histogram[i]
+    return float(edges[i] + share * (edges[i + 1] - edges[i]))
+
+
+def evaluate_chunked(
+    models: list[ClassifierMixin],
+    artifacts: list[ModelArtifact | None],
+    url: str,
+    chunk_rows: int,
+    test_size: float = 0.2,
+    random_state: int = 42
+) -> list[dict[str, Any]]:
+    '''
+    Обучение и оценка моделей на выборке, которая не помещается в память. \
+        Выборка один раз копируется из MinIO во временный файл \
+        и читается фрагментами по `chunk_rows` строк в три прохода: \
+        порог релевантности и масштабирование признаков, обучение \
+        через `partial_fit`, расчет метрик на тестовой части. \
+        Память ограничена размером фрагмента
+
+    Args:
+        models (list[ClassifierMixin]): Модели с `partial_fit`
+        artifacts (list[ModelArtifact | None]): Уже обученные модели, \
+            `None` - модель нужно обучить
+        url (str): URL обучающей выборки
+        chunk_rows (int): Количество строк во фрагменте
+        test_size (float): Доля тестовой части выборки
+        random_state (int): Начальное значение генератора
+
+    Returns:
+        list[dict[str, Any]]: Результаты в формате `evaluate_model`
+    '''
+    estimators = [
+        artifact.estimator if artifact else model
+        for model, artifact in zip(models, artifacts)
+    ]
+    scalers = [
+        artifact.scaler if artifact
+        else StandardScaler() if needs_scaling(model) else None
+        for model, artifact in zip(models, artifacts)
+    ]
+    untrained = [i for i, artifact in enumerate(artifacts) if artifact is None]
+
+    with tempfile.NamedTemporaryFile(suffix='.csv') as file:
+        spool(url, file)
+        return _evaluate_spooled(
+            estimators, scalers, untrained, file.name,
+            chunk_rows, test_size, random_state
+        )
+
+
+def _evaluate_spooled(
+    estimators: list[ClassifierMixin],
+    scalers: list[StandardScaler | None],
+    untrained: list[int],
+    path: str,
+    chunk_rows: int,
+    test_size: float,
+    random_state: int
+) -> list[dict[str, Any]]:
+    def chunks() -> Iterator[tuple[pd.DataFrame, np.ndarray]]:
+        return split_chunks(path, chunk_rows, test_size, random_state)
+
+    # Проход 1. Медиана релевантности считается по частотам значений,
+    # а если различных значений слишком много - по гистограмме.
+    # Столбец целиком в памяти не хранится
+    counts: dict[float, int] | None = {}
+    low, high = np.inf, -np.inf
+    for chunk, test in chunks():
+        relevance = chunk['relevance'].dropna().to_numpy()
+        if len(relevance):
+            counts = count_values(counts, relevance)
+            low, high = min(low, relevance.min()), max(high, relevance.max())
+        x_train = chunk.loc[~test, feature_columns(chunk)]
+        # В коротком фрагменте может не оказаться строк обучающей
+        # или тестовой части, пустые части пропускаются
+        if not len(x_train):
+            continue
+        for i in untrained:
+            if scalers[i] is not None:
+                scalers[i].partial_fit(x_train)  # type: ignore
+    if counts is not None:
+        threshold = counts_median(counts)
+    else:
+        threshold = histogram_median(path, chunk_rows, low, high)
+
+    def features(i: int, x: pd.DataFrame) -> Any:
+        scaler = scalers[i]
+        return scaler.transform(x) if scaler is not None else x
+
+    # Проход 2. Обучение, одна эпоха по обучающей части
+    if untrained:
+        for chunk, test in chunks():
+            x = chunk.loc[~test, feature_columns(chunk)]
+            if not len(x):
+                continue
+            y = (chunk['relevance'][~test] > threshold).astype(int)
+            for i in untrained:
+                estimators[i].partial_fit(  # type: ignore
+                    features(i, x), y, classes=[0, 1]
+                )
+
+    # Проход 3. Матрица ошибок и гистограммы вероятностей классов
+    # накапливаются по фрагментам тестовой части
+    matrices = [np.zeros((2, 2), dtype=np.int64) for _ in estimators]
+    edges = np.linspace(0.0, 1.0, ROC_BINS + 1)
+    histograms = [np.zeros((2, ROC_BINS), dtype=np.int64) for _ in estimators]
+    for chunk, test in chunks():
+        x = chunk.loc[test, feature_columns(chunk)]
+        if not len(x):
+            continue
+        y = (chunk['relevance'][test] > threshold).to_numpy(dtype=int)
+        for i, estimator in enumerate(estimators):
+            proba = estimator.predict_proba(features(i, x))[:, 1]  # type: ignore
+            predicted = (proba > 0.5).astype(int)
+            matrices[i] += np.bincount(
+                2 * y + predicted, minlength=4
+            ).reshape(2, 2)
+            for label in (0, 1):
+                histograms[i][label] += np.histogram(
+                    proba[y == label], bins=edges
+                )[0]
+
+    labels = np.array([0, 1])
+    scores = matrix_scores(np.stack(matrices), labels)
+    evaluations = []
+    for i, estimator in enumerate(estimators):
+        # Порог проходит нижние границы интервалов гистограммы от 1 к 0
+        fps, tps = np.cumsum(histograms[i][:, ::-1], axis=1)
+        curve = threshold_sweep(edges[-2::-1], tps, fps)
+        evaluations.append({
+            'model': type(estimator).__name__,
+            'estimator': estimator,
+            'scaler': scalers[i],
+            'scores': scores[i],
+            'matrix': matrix_frame(matrices[i], labels),
+            **curve_report(curve),
+        })
+    return evaluations
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+
+def frame_memory(df: pd.DataFrame) -> int:
+    '''
+    Объем памяти выборки вместе с содержимым строк
+
+    Args:
+        df (pd.DataFrame): Выборка
+
+    Returns:
+        int: Объем памяти в байтах
+    '''
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def _compact_float(values: pd.Series, float_rtol: float) -> pd.Series:
+    compact = values.astype(np.float32)
+    # float32 принимается, только если относительная погрешность
+    # не превышает допустимую и значения не выходят за диапазон
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        exact = values.to_numpy()
+        error = np.abs(compact.to_numpy(dtype=np.float64) - exact)
+        allowed = float_rtol * np.abs(exact)
+    finite = np.isfinite(exact)
+    if np.all(error[finite] <= allowed[finite]) and np.array_equal(
+        np.isfinite(compact.to_numpy()), finite
+    ):
+        return compact
+    return values
+
+
+def compact_frame(
+    df: pd.DataFrame,
+    float_rtol: float = 0.0,
+    category_ratio: float = 0.5
+) -> pd.DataFrame:
+    '''
+    Выборка с наименьшими подходящими типами столбцов: целые числа - \
+        наименьший целочисленный тип, вещественные - float32 \
+        при допустимой погрешности, строки с небольшим количеством \
+        различных значений - категории
+
+    Args:
+        df (pd.DataFrame): Выборка с типами pandas по умолчанию
+        float_rtol (float): Допустимая относительная погрешность \
+            float32, 0 - только точное представление
+        category_ratio (float): Наибольшая доля различных значений \
+            строкового столбца, при которой он становится категорией
+
+    Returns:
+        pd.DataFrame: Выборка с уменьшенными типами столбцов
+    '''
+    columns = {}
+    for name, values in df.items():
+        if pd.api.types.is_bool_dtype(values):
+            columns[name] = values
+        elif pd.api.types.is_integer_dtype(values):
+            downcast = 'unsigned' if len(values) and values.min() >= 0 else 'integer'
+            columns[name] = pd.to_numeric(values, downcast=downcast)
+        elif pd.api.types.is_float_dtype(values) and values.dtype.itemsize > 4:
+            columns[name] = _compact_float(values, float_rtol)
+        elif (
+            pd.api.types.is_object_dtype(values)
+            or pd.api.types.is_string_dtype(values)
+        ) and values.nunique(dropna=False) <= category_ratio * len(values):
+            columns[name] = values.astype('category')
+        else:
+            columns[name] = values
+    return pd.DataFrame(columns, index=df.index)
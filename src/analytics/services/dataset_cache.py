@@ -0,0 +1,252 @@
+import json
+import pickle
+import shutil
+import asyncio
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+
+class DatasetCache:
+    '''
+    Колоночный кэш обучающей выборки на диске. \
+        Каждая версия выборки (ETag) хранится набором .npy-файлов, \
+        по одному на столбец, которые читаются через memory map
+    '''
+    MANIFEST = 'columns.json'
+
+    def __init__(self, root: str) -> None:
+        '''
+        Колоночный кэш обучающей выборки на диске
+
+        Args:
+            root (str): Каталог кэша
+        '''
+        self.root = Path(root)
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    def lock(self, dataset_etag: str) -> asyncio.Lock:
+        '''
+        Блокировка построения кэша версии выборки, \
+            чтобы одновременные запросы не разбирали CSV повторно
+
+        Args:
+            dataset_etag (str): ETag обучающей выборки в MinIO
+
+        Returns:
+            asyncio.Lock: Блокировка версии выборки
+        '''
+        return self._locks.setdefault(dataset_etag, asyncio.Lock())
+
+    def path(self, dataset_etag: str) -> Path:
+        return self.root / dataset_etag.strip('"')
+
+    def exists(self, dataset_etag: str) -> bool:
+        return (self.path(dataset_etag) / self.MANIFEST).exists()
+
+    def build(
+        self,
+        dataset_etag: str,
+        df: pd.DataFrame,
+        metadata: dict[str, Any] | None = None
+    ) -> None:
+        '''
+        Сохранение версии выборки по столбцам. Набор файлов пишется \
+            во временный каталог и переименовывается целиком, \
+            поэтому читатели не видят частично записанный кэш. \
+            Категориальные столбцы хранятся кодами категорий
+
+        Args:
+            dataset_etag (str): ETag обучающей выборки в MinIO
+            df (pd.DataFrame): Обучающая выборка
+            metadata (dict[str, Any] | None): Сведения о версии выборки, \
+                сохраняемые вместе с ней
+        '''
+        target = self.path(dataset_etag)
+        tmp = self.root / f'.{target.name}-{uuid4().hex}'
+        tmp.mkdir(parents=True)
+
+        columns = []
+        for i, name in enumerate(df.columns):
+            column: dict[str, Any] = {'name': str(name), 'file': f'{i}.npy'}
+            if isinstance(df[name].dtype, pd.CategoricalDtype):
+                values = df[name].cat.codes.to_numpy()
+                column['categories'] = df[name].cat.categories.tolist()
+            else:
+                values = df[name].to_numpy()
+            np.save(tmp / column['file'], values, allow_pickle=values.dtype == object)
+            columns.append(column)
+        (tmp / self.MANIFEST).write_text(
+            json.dumps({
+                'rows': len(df),
+                'columns': columns,
+                'metadata': metadata or {},
+            }),
+            encoding='utf-8'
+        )
+
+        try:
+            tmp.rename(target)
+        except OSError:
+            # Кэш этой версии уже построен другим процессом
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    def load(
+        self,
+        dataset_etag: str,
+        columns: list[str] | None = None
+    ) -> pd.DataFrame:
+        '''
+        Чтение версии выборки без копирования: столбцы отображаются \
+            в память, с диска читаются только используемые страницы
+
+        Args:
+            dataset_etag (str): ETag обучающей выборки в MinIO
+            columns (list[str] | None): Читаемые столбцы, \
+                `None` - все столбцы
+
+        Returns:
+            pd.DataFrame: Обучающая выборка только для чтения
+        '''
+        names = self.columns(dataset_etag) if columns is None else columns
+
+        data = {}
+        for name in names:
+            values, categories = self.load_column(dataset_etag, name)
+            if categories is not None:
+                values = pd.Categorical.from_codes(values, categories=categories)
+            data[name] = values
+        return pd.DataFrame(data, copy=False)
+
+    def load_column(
+        self,
+        dataset_etag: str,
+        name: str
+    ) -> tuple[np.ndarray, list[Any] | None]:
+        '''
+        Чтение хранимого массива столбца через memory map. \
+            Строка с номером i находится по смещению i * itemsize \
+            от начала данных .npy-файла, поэтому чтение любых строк \
+            не зависит от размера выборки
+
+        Args:
+            dataset_etag (str): ETag обучающей выборки в MinIO
+            name (str): Имя столбца
+
+        Returns:
+            tuple[np.ndarray, list[Any] | None]: Массив только для чтения \
+                и категории, если столбец хранится кодами категорий
+        '''
+        column = self._column(dataset_etag, name)
+        file = self.path(dataset_etag) / column['file']
+        try:
+            values = np.load(file, mmap_mode='r')
+        except ValueError:
+            # Столбцы с объектами не отображаются в память
+            values = np.load(file, allow_pickle=True)
+        return values, column.get('categories')
+
+    def columns(self, dataset_etag: str) -> list[str]:
+        return [column['name'] for column in self._manifest(dataset_etag)['columns']]
+
+    def _column(self, dataset_etag: str, name: str) -> dict[str, Any]:
+        for column in self._manifest(dataset_etag)['columns']:
+            if column['name'] == name:
+                return column
+        raise KeyError(name)
+
+    def metadata(self, dataset_etag: str) -> dict[str, Any]:
+        '''
+        Сведения о версии выборки, сохраненные при построении кэша
+
+        Args:
+            dataset_etag (str): ETag обучающей выборки в MinIO
+
+        Returns:
+            dict[str, Any]: Количество строк и сведения из `build`
+        '''
+        manifest = self._manifest(dataset_etag)
+        return {'rows': manifest['rows'], **manifest.get('metadata', {})}
+
+    def _manifest(self, dataset_etag: str) -> dict[str, Any]:
+        manifest = self.path(dataset_etag) / self.MANIFEST
+        return json.loads(manifest.read_text(encoding='utf-8'))
+
+    def save_array(self, dataset_etag: str, name: str, values: np.ndarray) -> None:
+        '''
+        Сохранение производного массива версии выборки, \
+            например номеров блоков кросс-валидации
+
+        Args:
+            dataset_etag (str): ETag обучающей выборки в MinIO
+            name (str): Имя массива
+            values (np.ndarray): Массив
+        '''
+        path = self.path(dataset_etag)
+        tmp = path / f'.{name}-{uuid4().hex}.npy'
+        np.save(tmp, values)
+        tmp.replace(path / f'{name}.npy')
+
+    def load_array(self, dataset_etag: str, name: str) -> np.ndarray | None:
+        '''
+        Чтение производного массива версии выборки через memory map
+
+        Args:
+            dataset_etag (str): ETag обучающей выборки в MinIO
+            name (str): Имя массива
+
+        Returns:
+            np.ndarray | None: Массив только для чтения, \
+                `None` если массив не сохранялся
+        '''
+        file = self.path(dataset_etag) / f'{name}.npy'
+        if not file.exists():
+            return None
+        return np.load(file, mmap_mode='r')
+
+    def save_object(self, dataset_etag: str, name: str, value: Any) -> None:
+        '''
+        Сохранение производного объекта версии выборки через pickle, \
+            например обученного масштабирования признаков
+
+        Args:
+            dataset_etag (str): ETag обучающей выборки в MinIO
+            name (str): Имя объекта
+            value (Any): Объект
+        '''
+        path = self.path(dataset_etag)
+        tmp = path / f'.{name}-{uuid4().hex}.pkl'
+        tmp.write_bytes(pickle.dumps(value))
+        tmp.replace(path / f'{name}.pkl')
+
+    def load_object(self, dataset_etag: str, name: str) -> Any | None:
+        '''
+        Чтение производного объекта версии выборки
+
+        Args:
+            dataset_etag (str): ETag обучающей выборки в MinIO
+            name (str): Имя объекта
+
+        Returns:
+            Any | None: Объект, `None` если объект не сохранялся
+        '''
+        file = self.path(dataset_etag) / f'{name}.pkl'
+        if not file.exists():
+            return None
+        return pickle.loads(file.read_bytes())
+
+    def evict_stale(self, dataset_etag: str) -> None:
+        '''
+        Удаление кэша устаревших версий выборки
+
+        Args:
+            dataset_etag (str): ETag актуальной обучающей выборки
+        '''
+        current = self.path(dataset_etag).name
+        if not self.root.exists():
+            return
+        for path in self.root.iterdir():
+            if path.is_dir() and not path.name.startswith('.') and path.name != current:
+                shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,85 @@
+import asyncio
+import multiprocessing
+from typing import Any, Callable, TypeVar
+from concurrent.futures import ProcessPoolExecutor
+
+
+T = TypeVar('T')
+
+
+class ExecutorService:
+    '''
+    Пул процессов для CPU-нагруженных этапов аналитики \
+        (обучение моделей, расчет метрик, отрисовка графиков)
+
+    Выполняемые функции и их аргументы должны сериализоваться через pickle
+    '''
+
+    def __init__(self, workers: int, queue_size: int) -> None:
+        '''
+        Пул процессов для CPU-нагруженных этапов аналитики
+
+        Args:
+            workers (int): Количество процессов
+            queue_size (int): Максимальное количество задач, \
+                одновременно переданных в пул. Остальные ожидают \
+                своей очереди, не блокируя цикл событий
+        '''
+        self.workers = workers
+        self.queue_size = max(queue_size, workers)
+        self._slots = asyncio.Semaphore(self.queue_size)
+        self._pool: ProcessPoolExecutor | None = None
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: форк процесса с запущенным циклом событий и потоками
+            # uvicorn небезопасен
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._pool
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        '''
+        Выполнение функции в пуле процессов
+
+        При отмене ожидающая в очереди пула функция снимается \
+            с очереди. Уже выполняющуюся функцию прервать нельзя: \
+            она досчитывается в процессе и занимает слот очереди \
+            до своего завершения
+
+        Args:
+            func (Callable[..., T]): Функция уровня модуля
+            *args (Any): Аргументы функции
+
+        Returns:
+            T: Результат выполнения функции
+        '''
+        await self._slots.acquire()
+        loop = asyncio.get_running_loop()
+        try:
+            future = self.pool.submit(func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # Слот освобождается по завершении функции в процессе,
+        # а не по выходу из ожидания
+        future.add_done_callback(lambda _: self._release(loop))
+        try:
+            return await asyncio.shield(asyncio.wrap_future(future))
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+
+    def _release(self, loop: asyncio.AbstractEventLoop) -> None:
+        # Вызывается из потока пула процессов
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(self._slots.release)
+
+    def shutdown(self) -> None:
+        '''Остановка пула процессов с отменой ожидающих задач'''
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
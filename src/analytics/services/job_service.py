@@ -0,0 +1,230 @@
+import asyncio
+from typing import Any, Callable
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from base.service import BaseService
+from analytics.models.model import AnalyticsJobModel
+from analytics.repositories.repository import AnalyticsJobRepository
+from analytics.services.service import AnalyticsService, AnalyticsMode
+from analytics.services.roc_service import RocOutput
+
+
+class AnalyticsJobService(BaseService[AnalyticsJobModel]):
+    '''
+    Бизнес-логика фоновых задач аналитики
+    '''
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+    UNFINISHED = (PENDING, RUNNING)
+
+    def __init__(self, db: AsyncSession):
+        '''
+        Бизнес-логика фоновых задач аналитики
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД
+        '''
+        super().__init__(
+            AnalyticsJobRepository(db),
+            AnalyticsJobModel,
+            single_model_name='задача аналитики',
+            multiple_models_name='задачи аналитики'
+        )
+
+    async def create_job(self) -> AnalyticsJobModel:
+        '''
+        Создание задачи аналитики в статусе `pending`. \
+            Задача фиксируется в БД сразу, чтобы фоновый обработчик \
+            со своей сессией мог ее прочитать
+
+        Returns:
+            AnalyticsJobModel: SQLAlchemy-модель задачи
+        '''
+        job = await self.create(AnalyticsJobModel(
+            status=self.PENDING,
+            stages={stage: 0.0 for stage in AnalyticsService.STAGES}
+        ))
+        await self.repository.db.commit()
+        return job
+
+    async def set_stage(self, job_id: int, stage: str, progress: float) -> None:
+        '''
+        Обновление прогресса этапа задачи
+
+        Args:
+            job_id (int): Идентификатор задачи
+            stage (str): Название этапа
+            progress (float): Прогресс этапа от 0 до 1
+        '''
+        job = await self.get({'id': job_id})
+        job.stages = {**job.stages, stage: round(progress, 4)}
+        await self.repository.db.flush()
+
+    async def set_status(
+        self,
+        job_id: int,
+        status: str,
+        result: dict[str, Any] | None = None,
+        error: str | None = None
+    ) -> bool:
+        '''
+        Обновление статуса задачи одним условным UPDATE. \
+            `running` устанавливается только из `pending`, \
+            завершающие статусы - только из незавершенных. \
+            Так отмена и завершение задачи не перезаписывают друг друга
+
+        Args:
+            job_id (int): Идентификатор задачи
+            status (str): Новый статус задачи
+            result (dict[str, Any] | None): Результат аналитики
+            error (str | None): Текст ошибки
+
+        Returns:
+            bool: Статус изменен. `False` - задача уже в другом \
+                статусе или не найдена
+        '''
+        previous = (self.PENDING,) if status == self.RUNNING else self.UNFINISHED
+        updated = await self.repository.execute_update(
+            update(AnalyticsJobModel)
+            .where(
+                AnalyticsJobModel.id == job_id,
+                AnalyticsJobModel.status.in_(previous)
+            )
+            .values(status=status, result=result, error=error)
+        )
+        return updated > 0
+
+    async def cancel(self, job_id: int) -> AnalyticsJobModel:
+        '''
+        Отмена задачи. Завершенные задачи не изменяются. \
+            Статус фиксируется в БД сразу, до отмены фоновой задачи
+
+        Args:
+            job_id (int): Идентификатор задачи
+
+        Returns:
+            AnalyticsJobModel: SQLAlchemy-модель задачи
+
+        Raises:
+            NotFoundError: Задача не найдена
+        '''
+        await self.set_status(job_id, self.CANCELLED)
+        await self.repository.db.commit()
+        return await self.get({'id': job_id})
+
+    async def fail_unfinished(self) -> None:
+        '''
+        Перевод незавершенных задач в статус `failed`. \
+            Вызывается при старте приложения: задачи, выполнявшиеся \
+            до перезапуска, продолжить уже невозможно
+        '''
+        await self.repository.execute_update(
+            update(AnalyticsJobModel)
+            .where(AnalyticsJobModel.status.in_(self.UNFINISHED))
+            .values(
+                status=self.FAILED,
+                error='Задача прервана перезапуском приложения'
+            )
+        )
+
+
+class AnalyticsJobRunner:
+    '''
+    Выполнение задач аналитики в фоне процесса приложения
+    '''
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        analytics_service_factory: Callable[[AsyncSession], AnalyticsService]
+    ) -> None:
+        '''
+        Выполнение задач аналитики в фоне процесса приложения
+
+        Args:
+            session_maker (async_sessionmaker[AsyncSession]): Фабрика \
+                сессий БД. У каждой задачи своя сессия, так как сессия \
+                запроса закрывается раньше, чем завершается задача
+            analytics_service_factory (Callable[[AsyncSession], AnalyticsService]): \
+                Фабрика сервиса аналитики
+        '''
+        self.session_maker = session_maker
+        self.analytics_service_factory = analytics_service_factory
+        self._tasks: dict[int, asyncio.Task] = {}
+
+    def start(
+        self,
+        job_id: int,
+        mode: AnalyticsMode = 'holdout',
+        roc: RocOutput = 'points'
+    ) -> None:
+        '''
+        Запуск задачи аналитики
+
+        Args:
+            job_id (int): Идентификатор задачи
+            mode (AnalyticsMode): Режим обучения
+            roc (RocOutput): Представление ROC-кривых
+        '''
+        task = asyncio.create_task(self._run(job_id, mode, roc))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    def cancel(self, job_id: int) -> None:
+        '''
+        Отмена выполняющейся задачи аналитики. Этапы, еще ожидающие \
+            в очереди пула процессов, снимаются с очереди. Обучение, \
+            уже начатое в процессе пула, прервать нельзя: оно \
+            досчитывается, а его результат отбрасывается
+
+        Args:
+            job_id (int): Идентификатор задачи
+        '''
+        task = self._tasks.get(job_id)
+        if task is not None:
+            task.cancel()
+
+    async def _run(
+        self,
+        job_id: int,
+        mode: AnalyticsMode,
+        roc: RocOutput
+    ) -> None:
+        async with self.session_maker() as session:
+            job_service = AnalyticsJobService(session)
+            analytics_service = self.analytics_service_factory(session)
+            # Модели обучаются параллельно и сообщают о прогрессе
+            # одновременно, а сессия БД не допускает конкурентных запросов
+            lock = asyncio.Lock()
+
+            async def progress(stage: str, value: float) -> None:
+                async with lock:
+                    await job_service.set_stage(job_id, stage, value)
+                    await session.commit()
+
+            try:
+                started = await job_service.set_status(job_id, job_service.RUNNING)
+                await session.commit()
+                if not started:
+                    # Задача отменена до запуска
+                    return
+                result = await analytics_service.analyze(
+                    progress=progress, mode=mode, roc=roc
+                )
+                await job_service.set_status(job_id, job_service.DONE, result)
+                await session.commit()
+            except asyncio.CancelledError:
+                # Статус `cancelled` уже записан обработчиком запроса отмены.
+                # Условное обновление не даст записать `done` или `failed`
+                # поверх него, даже если отмена не успела прервать задачу
+                await session.rollback()
+                raise
+            except Exception as exc:
+                await session.rollback()
+                await job_service.set_status(
+                    job_id, job_service.FAILED, error=str(exc)
+                )
+                await session.commit()
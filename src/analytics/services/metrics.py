@@ -0,0 +1,240 @@
+import numpy as np
+from typing import Literal, Sequence
+
+
+Average = Literal['auto', 'binary', 'macro', 'weighted']
+
+
+def confusion_matrices(
+    y_true: Sequence[np.ndarray],
+    y_pred: Sequence[np.ndarray],
+    labels: np.ndarray | None = None
+) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    Матрицы ошибок для пакета предсказаний (моделей или блоков \
+        кросс-валидации) за один проход `np.bincount`
+
+    Args:
+        y_true (Sequence[np.ndarray]): Настоящие классы, \
+            массив на каждый элемент пакета
+        y_pred (Sequence[np.ndarray]): Предсказанные классы, \
+            массив на каждый элемент пакета
+        labels (np.ndarray | None): Классы в порядке строк и столбцов \
+            матриц, `None` - все встреченные классы по возрастанию
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Матрицы ошибок формы \
+            (пакет, классы, классы), строки - настоящие классы, \
+            столбцы - предсказанные; классы
+    '''
+    true = [np.asarray(y).ravel() for y in y_true]
+    pred = [np.asarray(y).ravel() for y in y_pred]
+    if labels is None:
+        labels = np.unique(np.concatenate(true + pred))
+    k = len(labels)
+    batch = np.repeat(np.arange(len(true)), [len(y) for y in true])
+    flat = (
+        (batch * k + np.searchsorted(labels, np.concatenate(true))) * k
+        + np.searchsorted(labels, np.concatenate(pred))
+    )
+    matrices = np.bincount(flat, minlength=len(true) * k * k)
+    return matrices.reshape(len(true), k, k), labels
+
+
+def confusion_matrix(
+    y_true: np.ndarray,
+    y_pred: np.ndarray,
+    labels: np.ndarray | None = None
+) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    Матрица ошибок, как `sklearn.metrics.confusion_matrix`
+
+    Args:
+        y_true (np.ndarray): Настоящие классы
+        y_pred (np.ndarray): Предсказанные классы
+        labels (np.ndarray | None): Классы в порядке строк и столбцов
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Матрица ошибок и классы
+    '''
+    matrices, labels = confusion_matrices([y_true], [y_pred], labels)
+    return matrices[0], labels
+
+
+def _divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    # Деление на ноль дает 0, как `zero_division=0` в sklearn
+    return np.divide(
+        numerator,
+        denominator,
+        out=np.zeros(np.broadcast(numerator, denominator).shape),
+        where=denominator != 0
+    )
+
+
+def matrix_scores(
+    matrices: np.ndarray,
+    labels: np.ndarray,
+    average: Average = 'auto',
+    pos_label: int = 1
+) -> list[dict[str, float]]:
+    '''
+    Метрики классификации по пакету матриц ошибок. Совпадают \
+        с `accuracy_score`, `precision_score`, `recall_score`, \
+        `balanced_accuracy_score` и `f1_score` из sklearn
+
+    Args:
+        matrices (np.ndarray): Матрицы ошибок формы (пакет, классы, классы)
+        labels (np.ndarray): Классы матриц
+        average (Average): Усреднение precision, recall и f1: \
+            `binary` - по классу `pos_label`, `macro` - среднее по классам, \
+            `weighted` - среднее, взвешенное количеством строк класса, \
+            `auto` - `binary`, если в настоящих классах ровно два класса, \
+            иначе `weighted`
+        pos_label (int): Положительный класс для `binary`
+
+    Returns:
+        list[dict[str, float]]: Метрики для каждой матрицы пакета
+    '''
+    matrices = np.asarray(matrices, dtype=np.int64)
+    tp = np.diagonal(matrices, axis1=1, axis2=2).astype(np.float64)
+    support = matrices.sum(axis=2).astype(np.float64)
+    predicted = matrices.sum(axis=1).astype(np.float64)
+    total = support.sum(axis=1)
+
+    accuracy = _divide(tp.sum(axis=1), total)
+    precision = _divide(tp, predicted)
+    recall = _divide(tp, support)
+    f1 = _divide(2 * tp, support + predicted)
+
+    scores = []
+    for i in range(len(matrices)):
+        present = support[i] > 0
+        # Как в sklearn: классы без строк в настоящих классах
+        # не участвуют в balanced accuracy
+        balanced_accuracy = (
+            float(np.mean(recall[i][present])) if present.any() else 0.0
+        )
+
+        _average = average
+        if _average == 'auto':
+            _average = 'binary' if present.sum() == 2 else 'weighted'
+        if _average == 'binary':
+            pos = int(np.searchsorted(labels, pos_label))
+            if pos >= len(labels) or labels[pos] != pos_label:
+                raise ValueError(f'Класс {pos_label} отсутствует в выборке')
+            averaged = [float(metric[i][pos]) for metric in (precision, recall, f1)]
+        elif _average == 'macro':
+            # Как в sklearn: только классы, встреченные в настоящих
+            # или предсказанных классах этой матрицы
+            seen = present | (predicted[i] > 0)
+            averaged = [
+                float(np.mean(metric[i][seen])) if seen.any() else 0.0
+                for metric in (precision, recall, f1)
+            ]
+        else:
+            averaged = [
+                float(np.average(metric[i], weights=support[i]))
+                if total[i] else 0.0
+                for metric in (precision, recall, f1)
+            ]
+
+        scores.append({
+            'accuracy': float(accuracy[i]),
+            'precision': averaged[0],
+            'recall': averaged[1],
+            'balanced_accuracy': balanced_accuracy,
+            'f1': averaged[2],
+        })
+    return scores
+
+
+def threshold_sweep(
+    thresholds: np.ndarray,
+    tps: np.ndarray,
+    fps: np.ndarray
+) -> dict[str, np.ndarray]:
+    '''
+    Метрики бинарной классификации для каждого порога по накопленным \
+        количествам истинно- и ложноположительных предсказаний
+
+    Args:
+        thresholds (np.ndarray): Пороги по убыванию, положительный класс - \
+            оценка не меньше порога
+        tps (np.ndarray): Истинноположительные предсказания при каждом пороге
+        fps (np.ndarray): Ложноположительные предсказания при каждом пороге
+
+    Returns:
+        dict[str, np.ndarray]: Пороги `thresholds`, `precision`, `recall`, \
+            `f1`, доли истинноположительных `tpr` и ложноположительных \
+            `fpr` предсказаний для каждого порога
+    '''
+    tps = np.asarray(tps, dtype=np.float64)
+    fps = np.asarray(fps, dtype=np.float64)
+    positives = tps[-1] if len(tps) else 0.0
+    negatives = fps[-1] if len(fps) else 0.0
+    recall = _divide(tps, np.full_like(tps, positives))
+    return {
+        'thresholds': np.asarray(thresholds, dtype=np.float64),
+        'precision': _divide(tps, tps + fps),
+        'recall': recall,
+        'f1': _divide(2 * tps, tps + fps + positives),
+        'tpr': recall,
+        'fpr': _divide(fps, np.full_like(fps, negatives)),
+    }
+
+
+def threshold_curve(
+    y_true: np.ndarray,
+    y_score: np.ndarray,
+    pos_label: int = 1
+) -> dict[str, np.ndarray]:
+    '''
+    Метрики бинарной классификации для всех порогов за один проход \
+        накопленных сумм по оценкам, отсортированным по убыванию. \
+        Пороги - различные значения оценок, как в `sklearn.metrics.roc_curve` \
+        без прореживания
+
+    Args:
+        y_true (np.ndarray): Настоящие классы
+        y_score (np.ndarray): Оценки положительного класса: \
+            вероятность или значение решающей функции
+        pos_label (int): Положительный класс
+
+    Returns:
+        dict[str, np.ndarray]: Результат `threshold_sweep`
+    '''
+    y_true = np.asarray(y_true).ravel() == pos_label
+    y_score = np.asarray(y_score, dtype=np.float64).ravel()
+    order = np.argsort(y_score, kind='mergesort')[::-1]
+    y_score = y_score[order]
+    y_true = y_true[order]
+    # Последняя строка каждой группы одинаковых оценок
+    last = np.r_[np.flatnonzero(np.diff(y_score)), len(y_score) - 1]
+    tps = np.cumsum(y_true)[last]
+    fps = last + 1 - tps
+    return threshold_sweep(y_score[last], tps, fps)
+
+
+def optimal_threshold(curve: dict[str, np.ndarray]) -> dict[str, float]:
+    '''
+    Порог с наибольшим f1
+
+    Args:
+        curve (dict[str, np.ndarray]): Результат `threshold_sweep`
+
+    Returns:
+        dict[str, float]: Порог `threshold` и `precision`, `recall`, `f1` \
+            при этом пороге
+    '''
+    if not len(curve['thresholds']):
+        return {'threshold': 0.0, 'precision': 0.0, 'recall': 0.0, 'f1': 0.0}
+    best = int(np.argmax(curve['f1']))
+    return {
+        metric: float(curve[name][best])
+        for metric, name in (
+            ('threshold', 'thresholds'),
+            ('precision', 'precision'),
+            ('recall', 'recall'),
+            ('f1', 'f1'),
+        )
+    }
@@ -0,0 +1,245 @@
+import time
+import pandas as pd
+import numpy as np
+from typing import Any
+from sklearn.metrics import auc
+from sklearn.base import ClassifierMixin, RegressorMixin
+from analytics.services.dataset_cache import DatasetCache
+from analytics.services.preprocessing import read_split
+from analytics.services.metrics import (
+    confusion_matrix, matrix_scores, optimal_threshold, threshold_curve
+)
+
+
+def predict_scores(
+    model: ClassifierMixin,
+    x: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    Предсказанные классы и оценки положительного класса за один вызов \
+        модели: вероятность из `predict_proba` или значение \
+        `decision_function`. Классы совпадают с `predict` для двух классов
+
+    Args:
+        model (ClassifierMixin): Обученная модель классификации
+        x (np.ndarray): Признаки
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Предсказанные классы \
+            и оценки положительного класса
+    '''
+    if hasattr(model, 'predict_proba'):
+        y_score = model.predict_proba(x)[:, 1]  # type: ignore
+        threshold = 0.5
+    else:
+        y_score = model.decision_function(x)  # type: ignore
+        threshold = 0.0
+    return model.classes_[(y_score > threshold).astype(int)], y_score  # type: ignore
+
+
+def apply_model(
+    model: ClassifierMixin | RegressorMixin,
+    x_train: np.ndarray,
+    x_test: np.ndarray,
+    y_train: np.ndarray,
+    fitted: bool = False
+) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    Обучение модели и предсказание на тестовой части выборки. \
+        Признаки уже предобработаны, см. `PreprocessedSplit.features`
+
+    Args:
+        model (ClassifierMixin | RegressorMixin): Модель
+        x_train (np.ndarray): Признаки обучающей части выборки
+        x_test (np.ndarray): Признаки тестовой части выборки
+        y_train (np.ndarray): Целевой признак обучающей части выборки
+        fitted (bool): Модель уже обучена, обучение пропускается
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Предсказанные классы \
+            и оценки положительного класса
+    '''
+    if not fitted:
+        model.fit(x_train, y_train)  # type: ignore
+    return predict_scores(model, x_test)
+
+
+def calc_scores(
+    y_test: np.ndarray,
+    y_pred: np.ndarray
+) -> dict[str, float]:
+    '''
+    Метрики классификации по одной матрице ошибок: binary-усреднение \
+        для двух классов, weighted - для большего количества классов
+
+    Args:
+        y_test (np.ndarray): Настоящие классы
+        y_pred (np.ndarray): Предсказанные классы
+
+    Returns:
+        dict[str, float]: accuracy, precision, recall, \
+            balanced_accuracy и f1
+    '''
+    matrix, labels = confusion_matrix(y_test, y_pred)
+    return matrix_scores(matrix[np.newaxis], labels)[0]
+
+
+def matrix_frame(
+    matrix: np.ndarray,
+    labels: np.ndarray | list[int] = [0, 1]
+) -> pd.DataFrame:
+    return pd.DataFrame(
+        matrix,
+        index=[f'Настоящее {label}' for label in labels],
+        columns=[f'Предсказанное {label}' for label in labels]
+    )
+
+
+def confusion_matrix_frame(
+    y_true: np.ndarray,
+    y_pred: np.ndarray
+) -> pd.DataFrame:
+    return matrix_frame(*confusion_matrix(y_true, y_pred))
+
+
+def curve_report(curve: dict[str, np.ndarray]) -> dict[str, Any]:
+    '''
+    ROC-кривая и оптимальный порог по метрикам всех порогов
+
+    Args:
+        curve (dict[str, np.ndarray]): Результат `threshold_sweep`
+
+    Returns:
+        dict[str, Any]: Точки `fpr`, `tpr` и площадь `auc` ROC-кривой, \
+            порог с наибольшим f1 и метрики при нем
+    '''
+    # Кривая начинается в (0, 0): порог выше всех оценок
+    fpr = np.r_[0.0, curve['fpr']]
+    tpr = np.r_[0.0, curve['tpr']]
+    return {
+        'roc_curve': {'fpr': fpr, 'tpr': tpr, 'auc': float(auc(fpr, tpr))},
+        'threshold': optimal_threshold(curve),
+    }
+
+
+def threshold_report(y_true: np.ndarray, y_score: np.ndarray) -> dict[str, Any]:
+    '''
+    ROC-кривая и оптимальный порог по оценкам положительного класса
+
+    Args:
+        y_true (np.ndarray): Настоящие классы
+        y_score (np.ndarray): Оценки положительного класса
+
+    Returns:
+        dict[str, Any]: Результат `curve_report`
+    '''
+    return curve_report(threshold_curve(y_true, y_score))
+
+
+def evaluate_model(
+    model: ClassifierMixin,
+    cache_root: str,
+    dataset_etag: str,
+    split: str,
+    fitted: bool = False
+) -> dict[str, Any]:
+    '''
+    Обучение модели, расчет метрик, матрицы ошибок, ROC-кривой \
+        и оптимального порога. Признаки разбиения читаются \
+        из колоночного кэша через memory map, а не передаются в процесс
+
+    Args:
+        model (ClassifierMixin): Модель классификации
+        cache_root (str): Каталог колоночного кэша выборки
+        dataset_etag (str): ETag обучающей выборки в MinIO
+        split (str): Имя предобработанного разбиения
+        fitted (bool): Модель уже обучена, обучение пропускается
+
+    Returns:
+        dict[str, Any]: Имя модели, обученная модель и масштабирование \
+            признаков, метрики, матрица ошибок, точки ROC-кривой \
+            и оптимальный порог
+    '''
+    prepared = read_split(DatasetCache(cache_root), dataset_etag, split)
+    x_train, x_test = prepared.features(model)
+    predicted, y_score = apply_model(
+        model, x_train, x_test, prepared.y_train, fitted
+    )
+    # Матрица ошибок строится один раз, метрики считаются по ней
+    matrix, labels = confusion_matrix(prepared.y_test, predicted)
+    return {
+        'model': type(model).__name__,
+        'estimator': model,
+        'scaler': prepared.model_scaler(model),
+        'scores': matrix_scores(matrix[np.newaxis], labels)[0],
+        'matrix': matrix_frame(matrix, labels),
+        **threshold_report(prepared.y_test, y_score),
+    }
+
+
+def evaluate_fold(
+    model: ClassifierMixin,
+    cache_root: str,
+    dataset_etag: str,
+    split: str
+) -> dict[str, Any]:
+    '''
+    Обучение модели и расчет оценок на одном блоке кросс-валидации
+
+    Args:
+        model (ClassifierMixin): Модель классификации
+        cache_root (str): Каталог колоночного кэша выборки
+        dataset_etag (str): ETag обучающей выборки в MinIO
+        split (str): Имя предобработанного разбиения блока
+
+    Returns:
+        dict[str, Any]: Имя модели, индексы, предсказания \
+            и оценки положительного класса тестовых строк
+    '''
+    prepared = read_split(DatasetCache(cache_root), dataset_etag, split)
+    x_train, x_test = prepared.features(model)
+    predicted, y_score = apply_model(
+        model, x_train, x_test, prepared.y_train
+    )
+    return {
+        'model': type(model).__name__,
+        'test_index': prepared.test_index,
+        'predicted': predicted,
+        'y_score': y_score,
+    }
+
+
+def evaluate_candidate(
+    model: ClassifierMixin,
+    cache_root: str,
+    dataset_etag: str,
+    split: str,
+    rows: int,
+    metric: str
+) -> dict[str, float]:
+    '''
+    Оценка набора гиперпараметров при поиске гиперпараметров. \
+        Модель обучается на первых `rows` строках обучающей части \
+        разбиения и оценивается на его тестовой (валидационной) части
+
+    Args:
+        model (ClassifierMixin): Модель с проверяемыми гиперпараметрами
+        cache_root (str): Каталог колоночного кэша выборки
+        dataset_etag (str): ETag обучающей выборки в MinIO
+        split (str): Имя предобработанного разбиения поиска
+        rows (int): Количество строк для обучения
+        metric (str): Метрика из `calc_scores`
+
+    Returns:
+        dict[str, float]: Значение метрики и процессорное время оценки
+    '''
+    started = time.process_time()
+    prepared = read_split(DatasetCache(cache_root), dataset_etag, split)
+    x_train, x_test = prepared.features(model)
+    predicted, _ = apply_model(
+        model, x_train[:rows], x_test, prepared.y_train[:rows]
+    )
+    return {
+        'score': calc_scores(prepared.y_test, predicted)[metric],
+        'cpu_time': time.process_time() - started,
+    }
@@ -0,0 +1,430 @@
+import json
+import time
+import asyncio
+import numpy as np
+import pandas as pd
+from io import BytesIO
+from tempfile import SpooledTemporaryFile
+from typing import Any, AsyncIterator
+from analytics.services.service import AnalyticsService
+from analytics.services.registry_service import (
+    ModelArtifact, ModelRegistryService, get_params_hash
+)
+from exceptions.exception import BadRequestError, NotFoundError
+from config import settings
+
+
+def feature_names(artifact: ModelArtifact) -> list[str]:
+    '''
+    Признаки, на которых обучалась модель, в порядке обучения
+
+    Args:
+        artifact (ModelArtifact): Обученная модель
+
+    Returns:
+        list[str]: Названия признаков
+    '''
+    fitted = artifact.scaler if artifact.scaler is not None else artifact.estimator
+    return list(fitted.feature_names_in_)  # type: ignore
+
+
+def predict_proba(artifact: ModelArtifact, x: np.ndarray) -> np.ndarray:
+    '''
+    Векторизованный расчет вероятностей классов для всего пакета строк
+
+    Args:
+        artifact (ModelArtifact): Обученная модель
+        x (np.ndarray): Признаки в порядке `feature_names`
+
+    Returns:
+        np.ndarray: Вероятности классов, строка на каждую строку `x`
+    '''
+    features: Any = pd.DataFrame(x, columns=feature_names(artifact))
+    if artifact.scaler is not None:
+        features = artifact.scaler.transform(features)
+    return artifact.estimator.predict_proba(features)  # type: ignore
+
+
+def score_frame(
+    artifact: ModelArtifact,
+    frame: pd.DataFrame,
+    offset: int,
+    output_format: str,
+    header: bool
+) -> str:
+    '''
+    Предсказание для фрагмента файла и его сериализация
+
+    Args:
+        artifact (ModelArtifact): Обученная модель
+        frame (pd.DataFrame): Фрагмент строк признаков
+        offset (int): Номер первой строки фрагмента в файле
+        output_format (str): Формат результата: `ndjson` или `csv`
+        header (bool): Добавить заголовок CSV
+
+    Returns:
+        str: Номер строки, предсказанный класс и вероятности классов \
+            для каждой строки фрагмента
+    '''
+    names = feature_names(artifact)
+    proba = predict_proba(artifact, frame[names].to_numpy(dtype=np.float64))
+    classes = artifact.estimator.classes_  # type: ignore
+    result = pd.DataFrame(proba, columns=[f'proba_{c}' for c in classes])
+    result.insert(0, 'prediction', classes[proba.argmax(axis=1)])
+    result.insert(0, 'row', np.arange(offset, offset + len(frame)))
+    if output_format == 'csv':
+        return result.to_csv(sep=';', index=False, header=header)
+    return result.to_json(orient='records', lines=True).rstrip('\n') + '\n'
+
+
+class MicroBatcher:
+    '''
+    Объединение одновременных небольших запросов к модели \
+        в один вызов `predict_proba`
+    '''
+
+    def __init__(
+        self,
+        artifact: ModelArtifact,
+        max_rows: int,
+        window: float
+    ) -> None:
+        '''
+        Объединение одновременных небольших запросов к модели
+
+        Args:
+            artifact (ModelArtifact): Обученная модель
+            max_rows (int): Максимальное количество строк в пакете
+            window (float): Время ожидания других запросов \
+                после первого запроса пакета, секунды
+        '''
+        self.artifact = artifact
+        self.max_rows = max_rows
+        self.window = window
+        self._queue: asyncio.Queue[tuple[np.ndarray, asyncio.Future]] = asyncio.Queue()
+        self._worker: asyncio.Task | None = None
+
+    async def predict_proba(self, x: np.ndarray) -> np.ndarray:
+        '''
+        Расчет вероятностей классов в составе общего пакета
+
+        Args:
+            x (np.ndarray): Признаки в порядке `feature_names`
+
+        Returns:
+            np.ndarray: Вероятности классов для строк `x`
+        '''
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((x, future))
+        # Обработчик завершается, когда очередь пуста,
+        # и запускается заново с первым запросом
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while not self._queue.empty():
+            batch = [self._queue.get_nowait()]
+            rows = len(batch[0][0])
+            deadline = loop.time() + self.window
+            while rows < self.max_rows:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except TimeoutError:
+                    break
+                batch.append(item)
+                rows += len(item[0])
+
+            batch = [(x, future) for x, future in batch if not future.done()]
+            if not batch:
+                continue
+            try:
+                proba = await asyncio.to_thread(
+                    predict_proba,
+                    self.artifact,
+                    np.concatenate([x for x, _ in batch])
+                )
+            except Exception as exc:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+
+            offset = 0
+            for x, future in batch:
+                if not future.done():
+                    future.set_result(proba[offset:offset + len(x)])
+                offset += len(x)
+
+
+class BatchPredictor:
+    '''
+    Прогретые модели и их очереди пакетной обработки. \
+        Один на процесс приложения
+    '''
+
+    def __init__(
+        self,
+        max_rows: int,
+        window: float,
+        refresh_interval: float
+    ) -> None:
+        '''
+        Прогретые модели и их очереди пакетной обработки
+
+        Args:
+            max_rows (int): Максимальное количество строк в пакете
+            window (float): Время сбора пакета, секунды
+            refresh_interval (float): Интервал проверки новой версии \
+                модели, секунды
+        '''
+        self.max_rows = max_rows
+        self.window = window
+        self.refresh_interval = refresh_interval
+        self._batchers: dict[str, tuple[float, MicroBatcher]] = {}
+
+    def get(self, model_name: str) -> MicroBatcher | None:
+        '''
+        Получение очереди модели, если ее версия проверялась недавно
+
+        Args:
+            model_name (str): Класс модели
+
+        Returns:
+            MicroBatcher | None: Очередь модели
+        '''
+        item = self._batchers.get(model_name)
+        if item is None:
+            return None
+        checked_at, batcher = item
+        if asyncio.get_running_loop().time() - checked_at > self.refresh_interval:
+            return None
+        return batcher
+
+    def put(self, model_name: str, artifact: ModelArtifact) -> MicroBatcher:
+        '''
+        Прогрев модели. Очередь переиспользуется, пока не сменится версия
+
+        Args:
+            model_name (str): Класс модели
+            artifact (ModelArtifact): Обученная модель
+
+        Returns:
+            MicroBatcher: Очередь модели
+        '''
+        now = asyncio.get_running_loop().time()
+        item = self._batchers.get(model_name)
+        if item is None or item[1].artifact is not artifact:
+            batcher = MicroBatcher(artifact, self.max_rows, self.window)
+        else:
+            batcher = item[1]
+        self._batchers[model_name] = (now, batcher)
+        return batcher
+
+
+class PredictionService:
+    '''
+    Бизнес-логика предсказаний обученными моделями
+    '''
+    MEDIA_TYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+    def __init__(
+        self,
+        analytics_service: AnalyticsService,
+        registry_service: ModelRegistryService,
+        batch_predictor: BatchPredictor
+    ) -> None:
+        '''
+        Бизнес-логика предсказаний обученными моделями
+
+        Args:
+            analytics_service (AnalyticsService): Сервис аналитики
+            registry_service (ModelRegistryService): Сервис реестра моделей
+            batch_predictor (BatchPredictor): Прогретые модели
+        '''
+        self.analytics_service = analytics_service
+        self.registry_service = registry_service
+        self.batch_predictor = batch_predictor
+
+    def read_rows(self, body: bytes, content_type: str) -> pd.DataFrame:
+        '''
+        Чтение строк признаков из тела запроса
+
+        Args:
+            body (bytes): Тело запроса: CSV с разделителем `;` или JSON \
+                вида `{"rows": [{"признак": значение}, ...]}`
+            content_type (str): Заголовок Content-Type запроса
+
+        Returns:
+            pd.DataFrame: Строки признаков
+
+        Raises:
+            BadRequestError: Тело запроса не удалось прочитать
+        '''
+        try:
+            if 'csv' in content_type:
+                return pd.read_csv(BytesIO(body), sep=';', encoding='utf-8')
+            rows = json.loads(body)
+            if isinstance(rows, dict):
+                rows = rows['rows']
+            return pd.DataFrame.from_records(rows)
+        except (ValueError, KeyError, TypeError) as exc:
+            raise BadRequestError(f'Не удалось прочитать строки: {exc}')
+
+    async def predict(
+        self,
+        model_name: str,
+        rows: pd.DataFrame
+    ) -> dict[str, Any]:
+        '''
+        Предсказание класса и вероятностей классов для пакета строк
+
+        Args:
+            model_name (str): Класс модели
+            rows (pd.DataFrame): Строки признаков
+
+        Returns:
+            dict[str, Any]: Классы, предсказания и вероятности
+
+        Raises:
+            NotFoundError: Модель не обучена на текущей версии выборки
+            BadRequestError: В строках не хватает признаков
+        '''
+        batcher = await self._batcher(model_name)
+        names = feature_names(batcher.artifact)
+        missing = [name for name in names if name not in rows.columns]
+        if missing:
+            raise BadRequestError(f'Не хватает признаков: {missing}')
+        try:
+            x = rows[names].to_numpy(dtype=np.float64)
+        except ValueError as exc:
+            raise BadRequestError(f'Признаки должны быть числами: {exc}')
+
+        proba = await batcher.predict_proba(x)
+        classes = batcher.artifact.estimator.classes_  # type: ignore
+        return {
+            'model': model_name,
+            'classes': classes.tolist(),
+            'predictions': classes[proba.argmax(axis=1)].tolist(),
+            'probabilities': proba.tolist(),
+        }
+
+    async def score_stream(
+        self,
+        model_name: str,
+        body: AsyncIterator[bytes],
+        output_format: str
+    ) -> AsyncIterator[str]:
+        '''
+        Потоковое предсказание для CSV-файла произвольного размера. \
+            Файл читается фрагментами по `score_chunk_rows` строк, \
+            поэтому потребление памяти не зависит от размера файла
+
+        Args:
+            model_name (str): Класс модели
+            body (AsyncIterator[bytes]): Поток тела запроса: CSV \
+                с разделителем `;`
+            output_format (str): Формат результата: `ndjson` или `csv`
+
+        Returns:
+            AsyncIterator[str]: Поток результатов. Последняя строка - \
+                количество строк и скорость обработки или, если \
+                следующий фрагмент прочитать не удалось, ошибка: \
+                `{"error": ...}` или `# error=...`
+
+        Raises:
+            NotFoundError: Модель не обучена на текущей версии выборки
+            BadRequestError: Файл не удалось прочитать \
+                или в нем не хватает признаков
+        '''
+        artifact = (await self._batcher(model_name)).artifact
+        # Тело запроса нельзя читать во время отправки ответа,
+        # поэтому оно сохраняется целиком: в памяти до `score_spool_size`,
+        # дальше - во временный файл, отдельный для каждого запроса
+        file = SpooledTemporaryFile(max_size=settings.analytics.score_spool_size)
+        try:
+            async for data in body:
+                await asyncio.to_thread(file.write, data)
+            file.seek(0)
+            reader = pd.read_csv(
+                file,  # type: ignore
+                sep=';',
+                encoding='utf-8',
+                chunksize=settings.analytics.score_chunk_rows
+            )
+            first = await asyncio.to_thread(next, reader, None)
+        except ValueError as exc:
+            file.close()
+            raise BadRequestError(f'Не удалось прочитать файл: {exc}')
+
+        missing = [] if first is None else [
+            name for name in feature_names(artifact) if name not in first.columns
+        ]
+        if missing:
+            reader.close()
+            file.close()
+            raise BadRequestError(f'Не хватает признаков: {missing}')
+        return self._score_chunks(artifact, reader, first, file, output_format)
+
+    async def _score_chunks(
+        self,
+        artifact: ModelArtifact,
+        reader: Any,
+        frame: pd.DataFrame | None,
+        file: SpooledTemporaryFile,
+        output_format: str
+    ) -> AsyncIterator[str]:
+        started = time.perf_counter()
+        rows = 0
+        try:
+            while frame is not None:
+                yield await asyncio.to_thread(
+                    score_frame, artifact, frame, rows, output_format, rows == 0
+                )
+                rows += len(frame)
+                frame = await asyncio.to_thread(next, reader, None)
+        except ValueError as exc:
+            # Заголовки ответа уже отправлены: ошибка в следующих фрагментах
+            # передается последней строкой вместо итоговой
+            error = f'Фрагмент со строки {rows}: {exc}'
+            if output_format == 'csv':
+                yield '# error=' + ' '.join(error.split()) + '\n'
+            else:
+                yield json.dumps({'error': error, 'rows': rows}) + '\n'
+            return
+        finally:
+            reader.close()
+            file.close()
+
+        seconds = time.perf_counter() - started
+        summary = {
+            'rows': rows,
+            'seconds': round(seconds, 3),
+            'rows_per_sec': round(rows / seconds, 1) if seconds else 0.0,
+        }
+        if output_format == 'csv':
+            yield '# ' + ';'.join(f'{k}={v}' for k, v in summary.items()) + '\n'
+        else:
+            yield json.dumps({'summary': summary}) + '\n'
+
+    async def _batcher(self, model_name: str) -> MicroBatcher:
+        batcher = self.batch_predictor.get(model_name)
+        if batcher is not None:
+            return batcher
+
+        model = await self.analytics_service.get_model(model_name)
+        artifact = await self.registry_service.load(
+            model_name,
+            await self.analytics_service.get_dataset_etag(),
+            get_params_hash(model)
+        )
+        if artifact is None:
+            raise NotFoundError(
+                f'Модель {model_name} не обучена на текущей версии выборки. '
+                'Запустите аналитику'
+            )
+        return self.batch_predictor.put(model_name, artifact)
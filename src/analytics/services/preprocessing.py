@@ -0,0 +1,205 @@
+import numpy as np
+import pandas as pd
+from typing import NamedTuple
+from sklearn.base import ClassifierMixin
+from sklearn.linear_model import SGDClassifier
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.preprocessing import StandardScaler
+from analytics.services.dataset_cache import DatasetCache
+from exceptions.exception import NotFoundError
+
+
+# Модели, чувствительные к масштабу признаков
+SCALED_MODELS = (KNeighborsClassifier, SGDClassifier)
+
+
+def needs_scaling(model: ClassifierMixin) -> bool:
+    return isinstance(model, SCALED_MODELS)
+
+
+def feature_columns(df: pd.DataFrame) -> list[str]:
+    return [name for name in df.columns if name != 'relevance']
+
+
+def split_features(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.Series]:
+    '''
+    Разделение выборки на признаки и целевой признак. Признаки \
+        выбираются по столбцам, а не копией выборки без целевого признака
+
+    Args:
+        df (pd.DataFrame): Обучающая выборка
+
+    Returns:
+        tuple[pd.DataFrame, pd.Series]: Признаки и целевой признак: \
+            0 или 1 (нерелевантно/релевантно)
+    '''
+    X = df[feature_columns(df)]
+    y = (df['relevance'] > df['relevance'].median()).astype(int)
+    return X, y
+
+
+class PreprocessedSplit(NamedTuple):
+    '''
+    Разбиение выборки после предобработки. Матрицы признаков float32 \
+        отображены в память из колоночного кэша, поэтому одни и те же \
+        буферы без копирования получают все модели во всех процессах
+
+    Args:
+        x_train (pd.DataFrame): Признаки обучающей части
+        x_test (pd.DataFrame): Признаки тестовой части
+        x_train_scaled (pd.DataFrame): Масштабированные признаки \
+            обучающей части
+        x_test_scaled (pd.DataFrame): Масштабированные признаки \
+            тестовой части
+        y_train (np.ndarray): Целевой признак обучающей части
+        y_test (np.ndarray): Целевой признак тестовой части
+        test_index (np.ndarray): Номера строк тестовой части в выборке
+        scaler (StandardScaler): Масштабирование, обученное \
+            на обучающей части
+    '''
+    x_train: pd.DataFrame
+    x_test: pd.DataFrame
+    x_train_scaled: pd.DataFrame
+    x_test_scaled: pd.DataFrame
+    y_train: np.ndarray
+    y_test: np.ndarray
+    test_index: np.ndarray
+    scaler: StandardScaler
+
+    def features(self, model: ClassifierMixin) -> tuple[pd.DataFrame, pd.DataFrame]:
+        '''
+        Признаки обучающей и тестовой части для модели
+
+        Args:
+            model (ClassifierMixin): Модель классификации
+
+        Returns:
+            tuple[pd.DataFrame, pd.DataFrame]: Масштабированные признаки, \
+                если модель чувствительна к масштабу, иначе исходные
+        '''
+        if needs_scaling(model):
+            return self.x_train_scaled, self.x_test_scaled
+        return self.x_train, self.x_test
+
+    def model_scaler(self, model: ClassifierMixin) -> StandardScaler | None:
+        return self.scaler if needs_scaling(model) else None
+
+
+def _frame(values: np.ndarray, columns: list[str]) -> pd.DataFrame:
+    # Двумерный массив одного типа становится одним блоком без копирования
+    return pd.DataFrame(values, columns=columns, copy=False)
+
+
+def preprocess_split(
+    cache: DatasetCache,
+    dataset_etag: str,
+    split: str,
+    train_index: np.ndarray,
+    test_index: np.ndarray
+) -> PreprocessedSplit:
+    '''
+    Предобработка разбиения выборки: матрицы признаков float32 \
+        и масштабирование, обученное на обучающей части. \
+        Результат сохраняется в колоночный кэш версии выборки
+
+    Args:
+        cache (DatasetCache): Колоночный кэш выборки
+        dataset_etag (str): ETag обучающей выборки в MinIO
+        split (str): Имя разбиения
+        train_index (np.ndarray): Номера строк обучающей части
+        test_index (np.ndarray): Номера строк тестовой части
+
+    Returns:
+        PreprocessedSplit: Разбиение после предобработки
+    '''
+    X, y = split_features(cache.load(dataset_etag))
+    names = [str(name) for name in X.columns]
+    # Столбцы пишутся сразу в float32 без промежуточной копии выборки,
+    # категории кодируются номерами
+    x = np.empty((len(X), len(names)), dtype=np.float32)
+    for i, (_, values) in enumerate(X.items()):
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.cat.codes
+        x[:, i] = values
+    x_train = np.ascontiguousarray(x[train_index])
+    x_test = np.ascontiguousarray(x[test_index])
+    scaler = StandardScaler().fit(_frame(x_train, names))
+
+    arrays = {
+        'x-train': x_train,
+        'x-test': x_test,
+        'x-train-scaled': scaler.transform(_frame(x_train, names)).astype(np.float32),
+        'x-test-scaled': scaler.transform(_frame(x_test, names)).astype(np.float32),
+        'y-train': y.to_numpy()[train_index],
+        'y-test': y.to_numpy()[test_index],
+        'test-index': np.asarray(test_index),
+    }
+    for name, values in arrays.items():
+        cache.save_array(dataset_etag, f'{split}-{name}', values)
+    # Описание разбиения пишется последним и отмечает, что разбиение готово
+    cache.save_object(
+        dataset_etag, f'{split}-preprocessed', {'features': names, 'scaler': scaler}
+    )
+    return read_split(cache, dataset_etag, split)
+
+
+def load_split(
+    cache: DatasetCache,
+    dataset_etag: str,
+    split: str
+) -> PreprocessedSplit | None:
+    '''
+    Чтение разбиения после предобработки через memory map
+
+    Args:
+        cache (DatasetCache): Колоночный кэш выборки
+        dataset_etag (str): ETag обучающей выборки в MinIO
+        split (str): Имя разбиения
+
+    Returns:
+        PreprocessedSplit | None: Разбиение только для чтения, \
+            `None` если разбиение еще не предобработано
+    '''
+    meta = cache.load_object(dataset_etag, f'{split}-preprocessed')
+    if meta is None:
+        return None
+
+    def array(name: str) -> np.ndarray:
+        return cache.load_array(dataset_etag, f'{split}-{name}')  # type: ignore
+
+    names = meta['features']
+    return PreprocessedSplit(
+        x_train=_frame(array('x-train'), names),
+        x_test=_frame(array('x-test'), names),
+        x_train_scaled=_frame(array('x-train-scaled'), names),
+        x_test_scaled=_frame(array('x-test-scaled'), names),
+        y_train=array('y-train'),
+        y_test=array('y-test'),
+        test_index=array('test-index'),
+        scaler=meta['scaler'],
+    )
+
+
+def read_split(
+    cache: DatasetCache,
+    dataset_etag: str,
+    split: str
+) -> PreprocessedSplit:
+    '''
+    Чтение разбиения, которое уже должно быть предобработано
+
+    Args:
+        cache (DatasetCache): Колоночный кэш выборки
+        dataset_etag (str): ETag обучающей выборки в MinIO
+        split (str): Имя разбиения
+
+    Returns:
+        PreprocessedSplit: Разбиение только для чтения
+
+    Raises:
+        NotFoundError: Разбиение не предобработано
+    '''
+    prepared = load_split(cache, dataset_etag, split)
+    if prepared is None:
+        raise NotFoundError(f'Разбиение {split} выборки не предобработано')
+    return prepared
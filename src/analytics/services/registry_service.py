@@ -0,0 +1,204 @@
+import json
+import pickle
+import asyncio
+import hashlib
+from collections import OrderedDict
+from typing import NamedTuple
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sklearn.base import ClassifierMixin
+from sklearn.preprocessing import StandardScaler
+from base.service import BaseService
+from analytics.models.model import TrainedModelModel
+from analytics.repositories.repository import TrainedModelRepository
+from storage.services.minio_service import MinioService
+
+
+class ModelArtifact(NamedTuple):
+    '''
+    Обученная модель вместе с масштабированием признаков
+
+    Args:
+        estimator (ClassifierMixin): Обученная модель классификации
+        scaler (StandardScaler | None): Масштабирование признаков, \
+            с которым обучалась модель
+    '''
+    estimator: ClassifierMixin
+    scaler: StandardScaler | None
+
+
+class ModelCache:
+    '''
+    LRU-кэш обученных моделей в памяти процесса, \
+        ограниченный суммарным размером моделей
+    '''
+
+    def __init__(self, max_bytes: int) -> None:
+        '''
+        LRU-кэш обученных моделей в памяти процесса
+
+        Args:
+            max_bytes (int): Максимальный суммарный размер \
+                сериализованных моделей в байтах
+        '''
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items: OrderedDict[str, tuple[ModelArtifact, int]] = OrderedDict()
+
+    def get(self, key: str) -> ModelArtifact | None:
+        item = self._items.get(key)
+        if item is None:
+            return None
+        self._items.move_to_end(key)
+        return item[0]
+
+    def put(self, key: str, artifact: ModelArtifact, size: int) -> None:
+        if size > self.max_bytes:
+            return
+        if key in self._items:
+            self.size -= self._items.pop(key)[1]
+        self._items[key] = (artifact, size)
+        self.size += size
+        while self.size > self.max_bytes:
+            _, (_, evicted_size) = self._items.popitem(last=False)
+            self.size -= evicted_size
+
+
+def get_params_hash(model: ClassifierMixin) -> str:
+    '''
+    Хэш гиперпараметров модели
+
+    Args:
+        model (ClassifierMixin): Модель классификации
+
+    Returns:
+        str: SHA-256 хэш гиперпараметров
+    '''
+    dumped = json.dumps(model.get_params(), sort_keys=True, default=str)  # type: ignore
+    return hashlib.sha256(dumped.encode()).hexdigest()
+
+
+class ModelRegistryService(BaseService[TrainedModelModel]):
+    '''
+    Бизнес-логика реестра обученных моделей. \
+        Модели хранятся в MinIO, версии - в БД, \
+        загруженные модели - в `ModelCache`
+    '''
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        minio_service: MinioService,
+        model_cache: ModelCache
+    ):
+        '''
+        Бизнес-логика реестра обученных моделей
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД
+            minio_service (MinioService): Сервис MinIO
+            model_cache (ModelCache): Кэш загруженных моделей
+        '''
+        super().__init__(
+            TrainedModelRepository(db),
+            TrainedModelModel,
+            single_model_name='обученная модель',
+            multiple_models_name='обученные модели'
+        )
+        self.minio_service = minio_service
+        self.model_cache = model_cache
+
+    async def register(
+        self,
+        artifact: ModelArtifact,
+        dataset_etag: str
+    ) -> TrainedModelModel:
+        '''
+        Сохранение обученной модели в MinIO и ее версии в БД
+
+        Args:
+            artifact (ModelArtifact): Обученная модель
+            dataset_etag (str): ETag обучающей выборки в MinIO
+
+        Returns:
+            TrainedModelModel: SQLAlchemy-модель версии обученной модели
+        '''
+        model_name = type(artifact.estimator).__name__
+        params_hash = get_params_hash(artifact.estimator)
+        existing = await self._find(model_name, dataset_etag, params_hash)
+        if existing is not None:
+            return existing
+
+        data = await asyncio.to_thread(pickle.dumps, artifact)
+        object_name = (f'{MinioService.PRIVATE_PREFIX}{model_name}/'
+                       f'{dataset_etag}-{params_hash}.pkl')
+        await self.minio_service.put_object(object_name, data)
+
+        try:
+            async with self.repository.db.begin_nested():
+                version = await self.repository.create(TrainedModelModel(
+                    model_name=model_name,
+                    dataset_etag=dataset_etag,
+                    params_hash=params_hash,
+                    params=json.loads(json.dumps(
+                        artifact.estimator.get_params(),  # type: ignore
+                        default=str
+                    )),
+                    object_name=object_name,
+                    size=len(data)
+                ))
+        except IntegrityError:
+            # Ту же версию параллельно сохранил другой запуск: объект
+            # в MinIO у версии общий, используется его запись в БД
+            existing = await self._find(model_name, dataset_etag, params_hash)
+            if existing is None:
+                raise
+            version = existing
+        self.model_cache.put(object_name, artifact, len(data))
+        return version
+
+    async def load(
+        self,
+        model_name: str,
+        dataset_etag: str,
+        params_hash: str
+    ) -> ModelArtifact | None:
+        '''
+        Получение обученной модели. Модель загружается из MinIO \
+            только при первом обращении
+
+        Args:
+            model_name (str): Класс модели
+            dataset_etag (str): ETag обучающей выборки в MinIO
+            params_hash (str): Хэш гиперпараметров модели
+
+        Returns:
+            ModelArtifact | None: Обученная модель, \
+                `None` если такая версия не обучалась
+        '''
+        version = await self._find(model_name, dataset_etag, params_hash)
+        if version is None:
+            return None
+
+        cached = self.model_cache.get(version.object_name)
+        if cached is not None:
+            return cached
+        data = await self.minio_service.get_object(version.object_name)
+        artifact: ModelArtifact = await asyncio.to_thread(pickle.loads, data)
+        self.model_cache.put(version.object_name, artifact, len(data))
+        return artifact
+
+    async def _find(
+        self,
+        model_name: str,
+        dataset_etag: str,
+        params_hash: str
+    ) -> TrainedModelModel | None:
+        return await self.repository.scalar_first(
+            select(TrainedModelModel).filter_by(
+                model_name=model_name,
+                dataset_etag=dataset_etag,
+                params_hash=params_hash
+            )
+        )
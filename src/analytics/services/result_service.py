@@ -0,0 +1,124 @@
+import json
+from typing import Any
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from base.service import BaseService
+from analytics.models.model import AnalyticsResultModel
+from analytics.repositories.repository import AnalyticsResultRepository
+
+
+class AnalyticsResultService(BaseService[AnalyticsResultModel]):
+    '''
+    Бизнес-логика кэша результатов аналитики
+    '''
+
+    def __init__(self, db: AsyncSession):
+        '''
+        Бизнес-логика кэша результатов аналитики
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД
+        '''
+        super().__init__(
+            AnalyticsResultRepository(db),
+            AnalyticsResultModel,
+            single_model_name='результат аналитики',
+            multiple_models_name='результаты аналитики'
+        )
+
+    async def get_cached(
+        self,
+        dataset_etag: str,
+        config_hash: str
+    ) -> dict[str, Any] | None:
+        '''
+        Получение сохраненного результата аналитики
+
+        Args:
+            dataset_etag (str): ETag обучающей выборки в MinIO
+            config_hash (str): Хэш конфигурации моделей
+
+        Returns:
+            dict[str, Any] | None: Результат аналитики, \
+                `None` если результат не найден
+        '''
+        model = await self._find(dataset_etag, config_hash)
+        return model.result if model else None
+
+    async def store(
+        self,
+        dataset_etag: str,
+        config_hash: str,
+        result: dict[str, Any]
+    ) -> AnalyticsResultModel:
+        '''
+        Сохранение результата аналитики. Если тот же результат \
+            параллельно сохранил другой запрос или задача, \
+            возвращается сохраненная ими запись
+
+        Args:
+            dataset_etag (str): ETag обучающей выборки в MinIO
+            config_hash (str): Хэш конфигурации моделей
+            result (dict[str, Any]): Результат аналитики
+
+        Returns:
+            AnalyticsResultModel: SQLAlchemy-модель результата аналитики
+        '''
+        try:
+            async with self.repository.db.begin_nested():
+                return await self.repository.create(AnalyticsResultModel(
+                    dataset_etag=dataset_etag,
+                    config_hash=config_hash,
+                    result=self._to_json(result)
+                ))
+        except IntegrityError:
+            existing = await self._find(dataset_etag, config_hash)
+            if existing is None:
+                raise
+            return existing
+
+    async def evict_stale(self, dataset_etag: str) -> None:
+        '''
+        Удаление результатов, посчитанных по другим версиям обучающей выборки
+
+        Args:
+            dataset_etag (str): ETag актуальной обучающей выборки в MinIO
+        '''
+        try:
+            await self.repository.delete(
+                statement=delete(AnalyticsResultModel).where(
+                    AnalyticsResultModel.dataset_etag != dataset_etag
+                ),
+                filter={'dataset_etag': dataset_etag}
+            )
+        except Exception as e:
+            await self.repository.db.rollback()
+            raise e
+
+    def _to_json(self, result: dict[str, Any]) -> dict[str, Any]:
+        '''
+        Приведение numpy-типов результата к JSON-совместимым
+
+        Args:
+            result (dict[str, Any]): Результат аналитики
+
+        Returns:
+            dict[str, Any]: Результат аналитики из стандартных типов Python
+        '''
+        return json.loads(json.dumps(
+            result,
+            default=lambda value: value.item() if hasattr(value, 'item') else str(value)
+        ))
+
+    async def _find(
+        self,
+        dataset_etag: str,
+        config_hash: str
+    ) -> AnalyticsResultModel | None:
+        return await self.repository.scalar_first(
+            select(AnalyticsResultModel).filter_by(
+                dataset_etag=dataset_etag,
+                config_hash=config_hash
+            )
+        )
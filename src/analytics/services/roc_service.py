@@ -0,0 +1,260 @@
+import io
+import heapq
+import asyncio
+import hashlib
+import numpy as np
+from typing import Any, Literal
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from storage.services.minio_service import MinioService
+from analytics.services.executor_service import ExecutorService
+
+
+RocImageFormat = Literal['png', 'webp', 'svg']
+# points - точки кривой в ответе, image - изображение в MinIO
+RocOutput = Literal['points', 'image']
+
+CONTENT_TYPES: dict[str, str] = {
+    'png': 'image/png',
+    'webp': 'image/webp',
+    'svg': 'image/svg+xml',
+}
+
+
+def _farthest_point(
+    x: np.ndarray,
+    y: np.ndarray,
+    start: int,
+    end: int
+) -> tuple[float, int]:
+    # Наиболее удаленная от отрезка [start, end] точка между его концами
+    if end - start < 2:
+        return 0.0, start
+    xs = x[start + 1:end] - x[start]
+    ys = y[start + 1:end] - y[start]
+    dx = x[end] - x[start]
+    dy = y[end] - y[start]
+    norm = np.hypot(dx, dy)
+    if norm == 0:
+        distances = np.hypot(xs, ys)
+    else:
+        distances = np.abs(dx * ys - dy * xs) / norm
+    i = int(np.argmax(distances))
+    return float(distances[i]), start + 1 + i
+
+
+def simplify_curve(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    '''
+    Прореживание кривой алгоритмом Рамера-Дугласа-Пекера \
+        с ограничением количества точек: вместо порога расстояния \
+        отрезки делятся в порядке убывания отклонения, \
+        пока точек меньше `max_points`
+
+    Args:
+        x (np.ndarray): Абсциссы точек кривой
+        y (np.ndarray): Ординаты точек кривой
+        max_points (int): Наибольшее количество точек, не меньше 2
+
+    Returns:
+        np.ndarray: Индексы оставленных точек по возрастанию
+    '''
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    last = len(x) - 1
+    if len(x) <= max_points:
+        return np.arange(len(x))
+
+    keep = [0, last]
+    distance, index = _farthest_point(x, y, 0, last)
+    segments = [(-distance, 0, last, index)]
+    while segments and len(keep) < max_points:
+        distance, start, end, index = heapq.heappop(segments)
+        if distance == 0:
+            # Остальные точки лежат на оставленных отрезках
+            break
+        keep.append(index)
+        for segment_start, segment_end in ((start, index), (index, end)):
+            distance, farthest = _farthest_point(x, y, segment_start, segment_end)
+            heapq.heappush(
+                segments, (-distance, segment_start, segment_end, farthest)
+            )
+    return np.sort(keep)
+
+
+def render_roc_curve(
+    fpr: np.ndarray,
+    tpr: np.ndarray,
+    roc_auc: float,
+    model_name: str,
+    dpi: int,
+    image_format: RocImageFormat
+) -> bytes:
+    '''
+    Отрисовка ROC-кривой. Каждый вызов создает собственную фигуру \
+        с холстом Agg без глобального состояния `pyplot`, поэтому \
+        кривые можно рисовать одновременно в потоках и процессах
+
+    Args:
+        fpr (np.ndarray): Доля ложноположительных предсказаний
+        tpr (np.ndarray): Доля истинноположительных предсказаний
+        roc_auc (float): Площадь под ROC-кривой
+        model_name (str): Имя модели
+        dpi (int): Разрешение изображения, точек на дюйм
+        image_format (RocImageFormat): Формат изображения
+
+    Returns:
+        bytes: Содержимое изображения
+    '''
+    figure = Figure()
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot()
+    axes.plot(fpr, tpr)
+    axes.plot([0, 1], [0, 1], linestyle='--', color='grey', linewidth=0.8)
+    axes.set_xlabel('FPR')
+    axes.set_ylabel('TPR')
+    axes.set_title(f'{model_name} (AUC = {roc_auc:.4f})')
+
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format=image_format, dpi=dpi, bbox_inches='tight')
+    return buffer.getvalue()
+
+
+class RocCurveService:
+    '''
+    Бизнес-логика ROC-кривых. Кривая передается в ответе прореженным \
+        рядом точек или изображением. Изображения рисуются в пуле \
+        процессов и хранятся в MinIO под хэшем точек кривой, поэтому \
+        одинаковая кривая рисуется и загружается один раз
+    '''
+
+    def __init__(
+        self,
+        minio_service: MinioService,
+        executor_service: ExecutorService,
+        dpi: int,
+        image_format: RocImageFormat,
+        max_points: int
+    ) -> None:
+        '''
+        Бизнес-логика ROC-кривых
+
+        Args:
+            minio_service (MinioService): Сервис MinIO
+            executor_service (ExecutorService): Пул процессов
+            dpi (int): Разрешение изображений, точек на дюйм
+            image_format (RocImageFormat): Формат изображений
+            max_points (int): Наибольшее количество точек ряда
+        '''
+        self.minio_service = minio_service
+        self.executor_service = executor_service
+        self.dpi = dpi
+        self.image_format = image_format
+        self.max_points = max_points
+
+    def series(self, curve: dict[str, Any]) -> dict[str, Any]:
+        '''
+        Прореженный ряд точек ROC-кривой для отрисовки на клиенте
+
+        Args:
+            curve (dict[str, Any]): Точки `fpr`, `tpr` и площадь `auc`
+
+        Returns:
+            dict[str, Any]: Не больше `max_points` точек `fpr` и `tpr`, \
+                площадь `auc` по всем точкам кривой
+        '''
+        keep = simplify_curve(curve['fpr'], curve['tpr'], self.max_points)
+        return {
+            'fpr': np.round(np.asarray(curve['fpr'])[keep], 6).tolist(),
+            'tpr': np.round(np.asarray(curve['tpr'])[keep], 6).tolist(),
+            'auc': float(curve['auc']),
+        }
+
+    def series_all(
+        self,
+        curves: dict[str, dict[str, Any]]
+    ) -> dict[str, dict[str, Any]]:
+        '''
+        Прореженные ряды точек ROC-кривых всех моделей
+
+        Args:
+            curves (dict[str, dict[str, Any]]): Точки кривой по имени модели
+
+        Returns:
+            dict[str, dict[str, Any]]: Ряд точек по имени модели
+        '''
+        return {
+            model_name: self.series(curve)
+            for model_name, curve in curves.items()
+        }
+
+    def curve_hash(self, model_name: str, curve: dict[str, Any]) -> str:
+        '''
+        Хэш изображения ROC-кривой: точки кривой, имя модели \
+            и параметры отрисовки
+
+        Args:
+            model_name (str): Имя модели
+            curve (dict[str, Any]): Точки `fpr`, `tpr` и площадь `auc`
+
+        Returns:
+            str: SHA-256 хэш изображения
+        '''
+        digest = hashlib.sha256()
+        for name in ('fpr', 'tpr'):
+            digest.update(np.ascontiguousarray(curve[name], dtype=np.float64).data)
+        digest.update(
+            f'{model_name}:{curve["auc"]!r}:{self.dpi}:{self.image_format}'.encode()
+        )
+        return digest.hexdigest()
+
+    async def publish(self, model_name: str, curve: dict[str, Any]) -> str:
+        '''
+        Отрисовка и загрузка изображения ROC-кривой в MinIO, \
+            если такое изображение еще не загружено
+
+        Args:
+            model_name (str): Имя модели
+            curve (dict[str, Any]): Точки `fpr`, `tpr` и площадь `auc`
+
+        Returns:
+            str: Публичный URL изображения
+
+        Raises:
+            WasNotCreatedError: Не удалось загрузить изображение в MinIO
+        '''
+        object_name = (
+            f'roc_curves/{self.curve_hash(model_name, curve)}.{self.image_format}'
+        )
+        if not await self.minio_service.object_exists(object_name):
+            image = await self.executor_service.run(
+                render_roc_curve,
+                curve['fpr'],
+                curve['tpr'],
+                curve['auc'],
+                model_name,
+                self.dpi,
+                self.image_format
+            )
+            await self.minio_service.put_object(
+                object_name, image, CONTENT_TYPES[self.image_format]
+            )
+        return self.minio_service.get_file_url_for_public(object_name)
+
+    async def publish_all(
+        self,
+        curves: dict[str, dict[str, Any]]
+    ) -> dict[str, str]:
+        '''
+        Одновременная отрисовка и загрузка ROC-кривых всех моделей
+
+        Args:
+            curves (dict[str, dict[str, Any]]): Точки кривой по имени модели
+
+        Returns:
+            dict[str, str]: Публичный URL изображения по имени модели
+        '''
+        urls = await asyncio.gather(*(
+            self.publish(model_name, curve)
+            for model_name, curve in curves.items()
+        ))
+        return dict(zip(curves, urls))
@@ -0,0 +1,302 @@
+import math
+import time
+import asyncio
+from typing import Any
+from sklearn.base import ClassifierMixin, clone
+from sklearn.model_selection import ParameterGrid, ParameterSampler
+from analytics.services.service import AnalyticsService
+from analytics.services.executor_service import ExecutorService
+from analytics.services.tuned_params_service import TunedParamsService
+from analytics.services.pipeline import evaluate_candidate
+from exceptions.exception import BadRequestError
+from config import settings
+
+
+class SearchBudget:
+    '''
+    Бюджет поиска гиперпараметров: время выполнения \
+        и суммарное процессорное время оценок
+    '''
+
+    def __init__(self, seconds: float, cpu_seconds: float | None) -> None:
+        '''
+        Бюджет поиска гиперпараметров
+
+        Args:
+            seconds (float): Ограничение времени выполнения, секунды
+            cpu_seconds (float | None): Ограничение процессорного времени \
+                всех оценок, секунды. `None` - без ограничения
+        '''
+        self.seconds = seconds
+        self.cpu_seconds = cpu_seconds
+        self.started = time.perf_counter()
+        self.cpu_time = 0.0
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def remaining(self) -> float:
+        return max(self.seconds - self.elapsed, 0.0)
+
+    @property
+    def exhausted(self) -> bool:
+        return self.remaining == 0.0 or (
+            self.cpu_seconds is not None and self.cpu_time >= self.cpu_seconds
+        )
+
+
+class SearchService:
+    '''
+    Бизнес-логика поиска гиперпараметров методом последовательного \
+        деления пополам (successive halving). Все наборы гиперпараметров \
+        оцениваются на малой части выборки, в следующий раунд проходит \
+        лучшая `1 / SEARCH_FACTOR` часть, а выборка увеличивается \
+        в `SEARCH_FACTOR` раз
+    '''
+    SEARCH_FACTOR = 3
+    SEARCH_SPACE: dict[str, dict[str, list[Any]]] = {
+        'KNeighborsClassifier': {
+            'n_neighbors': [3, 5, 7, 11, 15, 21, 31],
+            'weights': ['uniform', 'distance'],
+        },
+        'LogisticRegression': {
+            'C': [0.001, 0.01, 0.1, 1.0, 10.0, 100.0],
+        },
+        'RandomForestClassifier': {
+            'n_estimators': [50, 100, 200, 400],
+            'max_depth': [None, 8, 16],
+            'min_samples_leaf': [1, 2, 5],
+        },
+    }
+
+    def __init__(
+        self,
+        analytics_service: AnalyticsService,
+        executor_service: ExecutorService,
+        tuned_params_service: TunedParamsService
+    ) -> None:
+        '''
+        Бизнес-логика поиска гиперпараметров
+
+        Args:
+            analytics_service (AnalyticsService): Сервис аналитики
+            executor_service (ExecutorService): Пул процессов
+            tuned_params_service (TunedParamsService): Сервис лучших \
+                гиперпараметров моделей
+        '''
+        self.analytics_service = analytics_service
+        self.executor_service = executor_service
+        self.tuned_params_service = tuned_params_service
+
+    async def search(
+        self,
+        model_names: list[str] | None = None,
+        space: dict[str, dict[str, list[Any]]] | None = None,
+        metric: str = 'f1',
+        budget_seconds: float | None = None,
+        cpu_budget_seconds: float | None = None
+    ) -> dict[str, Any]:
+        '''
+        Поиск гиперпараметров моделей аналитики. Лучшие гиперпараметры \
+            сохраняются и используются следующими запусками `analyze`
+
+        Args:
+            model_names (list[str] | None): Классы моделей, \
+                `None` - все модели из пространства поиска
+            space (dict[str, dict[str, list[Any]]] | None): Значения \
+                гиперпараметров по классу модели вместо `SEARCH_SPACE`
+            metric (str): Метрика из `calc_scores`
+            budget_seconds (float | None): Ограничение времени поиска, \
+                секунды. `None` - из настроек
+            cpu_budget_seconds (float | None): Ограничение процессорного \
+                времени, секунды. `None` - из настроек
+
+        Returns:
+            dict[str, Any]: Лучшие гиперпараметры и раунды поиска \
+                по каждой модели, затраченный бюджет
+
+        Raises:
+            NotFoundError: Модель не используется в аналитике
+            BadRequestError: Неизвестный гиперпараметр
+        '''
+        space = {**self.SEARCH_SPACE, **(space or {})}
+        model_names = model_names or list(space)
+        candidates = {
+            model_name: self._candidates(
+                await self.analytics_service.get_model(model_name),
+                space.get(model_name, {})
+            )
+            for model_name in model_names
+        }
+
+        dataset_etag = await self.analytics_service.get_dataset_etag()
+        prepared = await self.analytics_service.preprocess(
+            dataset_etag, 'search', self.analytics_service.search_index
+        )
+        rows = len(prepared.y_train)
+
+        budget = SearchBudget(
+            budget_seconds or settings.analytics.search_budget_seconds,
+            cpu_budget_seconds or settings.analytics.search_cpu_budget_seconds
+        )
+        # Модели ищутся одновременно и делят общий бюджет
+        results = await asyncio.gather(*(
+            self._halving(models, dataset_etag, rows, metric, budget)
+            for models in candidates.values()
+        ))
+
+        for model_name, result in zip(candidates, results):
+            if result['params'] is not None:
+                await self.tuned_params_service.store(
+                    model_name,
+                    result['params'],
+                    metric,
+                    result['score'],
+                    dataset_etag
+                )
+
+        return {
+            'metric': metric,
+            'elapsed': round(budget.elapsed, 3),
+            'cpu_time': round(budget.cpu_time, 3),
+            'budget_exhausted': budget.exhausted,
+            'models': [
+                {'model': model_name, **result}
+                for model_name, result in zip(candidates, results)
+            ],
+        }
+
+    def _candidates(
+        self,
+        model: ClassifierMixin,
+        space: dict[str, list[Any]]
+    ) -> list[tuple[ClassifierMixin, dict[str, Any]]]:
+        max_candidates = settings.analytics.search_max_candidates
+        try:
+            # Пустой список значений гиперпараметра - ошибка запроса
+            params = list(ParameterGrid(space))
+            if len(params) > max_candidates:
+                params = list(ParameterSampler(
+                    space, max_candidates, random_state=42
+                ))
+        except ValueError as exc:
+            raise BadRequestError(str(exc))
+
+        candidates = []
+        for candidate_params in params:
+            try:
+                candidate = clone(model).set_params(**candidate_params)  # type: ignore
+            except ValueError as exc:
+                raise BadRequestError(str(exc))
+            candidates.append((candidate, candidate_params))
+        return candidates
+
+    async def _halving(
+        self,
+        candidates: list[tuple[ClassifierMixin, dict[str, Any]]],
+        dataset_etag: str,
+        rows: int,
+        metric: str,
+        budget: SearchBudget
+    ) -> dict[str, Any]:
+        if not candidates:
+            return {'params': None, 'score': None, 'rounds': []}
+        rounds_count = max(
+            math.floor(math.log(len(candidates), self.SEARCH_FACTOR)) + 1, 1
+        )
+        min_rows = settings.analytics.search_min_rows
+        best: tuple[tuple[ClassifierMixin, dict[str, Any]], float] | None = None
+        rounds = []
+
+        for i in range(rounds_count):
+            round_rows = max(
+                rows // self.SEARCH_FACTOR ** (rounds_count - 1 - i), min_rows
+            )
+            scores, failed = await self._evaluate(
+                candidates, dataset_etag, round_rows, metric, budget
+            )
+            ranked = sorted(scores, key=lambda item: item[1], reverse=True)
+            rounds.append({
+                'rows': round_rows,
+                'candidates': len(candidates),
+                'evaluated': len(scores),
+                'failed': failed,
+                'best_score': ranked[0][1] if ranked else None,
+            })
+            if not ranked:
+                break
+            # Лучший результат на большей части выборки надежнее,
+            # поэтому победитель берется из последнего раунда
+            best = ranked[0]
+            if budget.exhausted:
+                break
+            keep = max(math.ceil(len(ranked) / self.SEARCH_FACTOR), 1)
+            candidates = [candidate for candidate, _ in ranked[:keep]]
+
+        return {
+            'params': best[0][1] if best else None,
+            'score': best[1] if best else None,
+            'rounds': rounds,
+        }
+
+    async def _evaluate(
+        self,
+        candidates: list[tuple[ClassifierMixin, dict[str, Any]]],
+        dataset_etag: str,
+        rows: int,
+        metric: str,
+        budget: SearchBudget
+    ) -> tuple[list[tuple[tuple[ClassifierMixin, dict[str, Any]], float]], int]:
+        '''
+        Оценка наборов гиперпараметров на `rows` строках выборки \
+            в пределах бюджета
+
+        Returns:
+            tuple[list[tuple[tuple[ClassifierMixin, dict[str, Any]], float]], int]: \
+                Оценки наборов и количество наборов, неприменимых \
+                к этой части выборки
+
+        Raises:
+            Exception: Ошибка оценки, кроме неприменимых гиперпараметров, \
+                например остановка пула процессов
+        '''
+        tasks = {
+            asyncio.ensure_future(self.executor_service.run(
+                evaluate_candidate,
+                candidate[0],
+                str(self.analytics_service.dataset_cache.root.resolve()),
+                dataset_etag,
+                'search',
+                rows,
+                metric
+            )): candidate
+            for candidate in candidates
+        }
+        scores = []
+        failed = 0
+        pending = set(tasks)
+        try:
+            while pending and not budget.exhausted:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=budget.remaining,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    try:
+                        evaluation = task.result()
+                    except ValueError:
+                        # Набор гиперпараметров неприменим к этой части
+                        # выборки, например n_neighbors больше количества строк
+                        failed += 1
+                        continue
+                    budget.cpu_time += evaluation['cpu_time']
+                    scores.append((tasks[task], evaluation['score']))
+        finally:
+            # Бюджет исчерпан или оценка завершилась ошибкой:
+            # оценки, еще не переданные в процесс, отменяются
+            for task in pending:
+                task.cancel()
+        return scores, failed
@@ -1,190 +1,627 @@
 import pandas as pd
-import numpy as np
-from typing import Any
-from sklearn.metrics import (
-    accuracy_score,
-    precision_score,
-    recall_score,
-    balanced_accuracy_score,
-    f1_score,
-    confusion_matrix,
-    roc_curve,
-    auc
-)
-import matplotlib.pyplot as plt
-from sklearn.base import ClassifierMixin, RegressorMixin
+from typing import Any, Awaitable, Callable, Literal
+from sklearn.base import ClassifierMixin
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.neighbors import KNeighborsClassifier
-from sklearn.linear_model import LogisticRegression
-from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
-from pathlib import Path
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.naive_bayes import GaussianNB
+from sklearn.model_selection import StratifiedKFold, train_test_split
+from functools import partial
 import asyncio
+import hashlib
+import json
+import numpy as np
 
+from exceptions.exception import NotFoundError
 from storage.services.minio_service import MinioService
 from storage.services.service import StorageService
+from analytics.services.result_service import AnalyticsResultService
+from analytics.services.executor_service import ExecutorService
+from analytics.services.pipeline import (
+    evaluate_fold, evaluate_model, matrix_frame, threshold_report
+)
+from analytics.services.metrics import confusion_matrices, matrix_scores
+from analytics.services.chunked_pipeline import evaluate_chunked
+from analytics.services.tuned_params_service import TunedParamsService
+from analytics.services.roc_service import RocCurveService, RocOutput
+from analytics.services.dataset_cache import DatasetCache
+from analytics.services.compaction import compact_frame, frame_memory
+from analytics.services.preprocessing import (
+    PreprocessedSplit, load_split, preprocess_split, split_features
+)
+from analytics.services.registry_service import (
+    ModelArtifact, ModelRegistryService, get_params_hash
+)
+from config import settings
+
+
+ProgressCallback = Callable[[str, float], Awaitable[None]]
+# holdout - выборка целиком в памяти, chunked - обучение по фрагментам,
+# cv - стратифицированная кросс-валидация
+AnalyticsMode = Literal['holdout', 'chunked', 'cv']
+
+
+async def _skip_progress(stage: str, value: float) -> None:
+    pass
 
 
 class AnalyticsService:
-    def __init__(self, minio_service: MinioService, storage_service: StorageService) -> None:
+    # Этапы аналитики, о прогрессе которых сообщает `analyze`
+    STAGES = ('download', 'train', 'upload')
+
+    def __init__(
+        self,
+        minio_service: MinioService,
+        storage_service: StorageService,
+        result_service: AnalyticsResultService,
+        executor_service: ExecutorService,
+        registry_service: ModelRegistryService,
+        dataset_cache: DatasetCache,
+        tuned_params_service: TunedParamsService,
+        roc_curve_service: RocCurveService
+    ) -> None:
         self.minio_service = minio_service
         self.storage_service = storage_service
+        self.result_service = result_service
+        self.executor_service = executor_service
+        self.registry_service = registry_service
+        self.dataset_cache = dataset_cache
+        self.tuned_params_service = tuned_params_service
+        self.roc_curve_service = roc_curve_service
         self.file_name = 'temp/train_data_fixed.csv'
 
-    def __save_csv(self, df: pd.DataFrame, path: str) -> None:
-        csv_save_kwargs = {
-            'sep': ';',
-            'encoding': 'utf-8',
-            'index': False,
-        }
-
-        return df.to_csv(path, **csv_save_kwargs)  # type: ignore
-
     async def load_csv(self, file_path: str) -> pd.DataFrame:
         file_name = file_path.split('/')[-1]
-        file_url = self.minio_service.get_file_url_for_private(file_name)
-        await self.storage_service.download_file(
-            url=file_url,
-            filename=file_path
-        )
 
         csv_load_kwargs = {
             'sep': ';',
             'encoding': 'utf-8',
         }
 
-        df = await asyncio.to_thread(pd.read_csv, file_path, **csv_load_kwargs)  # type: ignore
+        # CSV разбирается по мере загрузки из MinIO, без временного файла
+        df = await self.minio_service.read_object(
+            file_name,
+            partial(pd.read_csv, **csv_load_kwargs)  # type: ignore
+        )
         return df  # type: ignore
 
-    def _train_test_split(self, df: pd.DataFrame) -> list:
-        X = df.drop(columns=['relevance'])
-        # y = df['relevance']
-        y = (df['relevance'] > df['relevance'].median()).astype(int)  # 0 или 1 (нерелевантно/релевантно)
+    async def load_dataset(
+        self,
+        columns: list[str] | None = None,
+        dataset_etag: str | None = None
+    ) -> pd.DataFrame:
+        '''
+        Загрузка обучающей выборки из колоночного кэша. \
+            CSV скачивается и разбирается один раз на версию выборки
 
-        return train_test_split(
-            X, y,
-            test_size=0.2,
-            random_state=42     # Для воспроизводимости результатов
-        )
+        Args:
+            columns (list[str] | None): Нужные столбцы, `None` - все столбцы
+            dataset_etag (str | None): ETag обучающей выборки, \
+                `None` - запросить в MinIO
 
-    def apply_model(
-        self,
-        model: ClassifierMixin | RegressorMixin,
-        x_train: np.ndarray,
-        x_test: np.ndarray,
-        y_train: np.ndarray
-    ) -> np.ndarray:
-        _x_train = x_train
-        _x_test = x_test
-
-        if isinstance(model, KNeighborsClassifier):
-            scaler = StandardScaler()
-            _x_train = scaler.fit_transform(x_train)
-            _x_test = scaler.transform(x_test)
-
-        model.fit(_x_train, y_train)  # type: ignore
-        return model.predict(_x_test)  # type: ignore
-
-    def calc_scores(
-        self,
-        y_test: np.ndarray,
-        y_pred: np.ndarray
-    ) -> dict[str, float]:
-        _average = 'binary' if len(np.unique(y_test)) == 2 else 'weighted'
-        accuracy = accuracy_score(y_test, y_pred)
-        precision = precision_score(y_test, y_pred, average=_average)
-        recall = recall_score(y_test, y_pred, average=_average)
-        balanced_accuracy = balanced_accuracy_score(y_test, y_pred)
-        f1 = f1_score(y_test, y_pred, average=_average)
-        return {
-            'accuracy': float(accuracy),
-            'precision': float(precision),
-            'recall': float(recall),
-            'balanced_accuracy': float(balanced_accuracy),
-            'f1': float(f1),
+        Returns:
+            pd.DataFrame: Обучающая выборка только для чтения. \
+                Столбцы отображены в память без копирования
+        '''
+        dataset_etag = await self.cache_dataset(dataset_etag)
+        return await asyncio.to_thread(self.dataset_cache.load, dataset_etag, columns)
+
+    async def cache_dataset(self, dataset_etag: str | None = None) -> str:
+        '''
+        Построение колоночного кэша версии выборки, если он еще не построен
+
+        Args:
+            dataset_etag (str | None): ETag обучающей выборки, \
+                `None` - запросить в MinIO
+
+        Returns:
+            str: ETag закэшированной версии выборки
+        '''
+        if dataset_etag is None:
+            dataset_etag = await self.get_dataset_etag()
+
+        if not self.dataset_cache.exists(dataset_etag):
+            async with self.dataset_cache.lock(dataset_etag):
+                if not self.dataset_cache.exists(dataset_etag):
+                    df = await self.load_csv(self.file_name)
+                    df, metadata = await asyncio.to_thread(self._compact, df)
+                    await asyncio.to_thread(
+                        self.dataset_cache.build, dataset_etag, df, metadata
+                    )
+                    await asyncio.to_thread(self.dataset_cache.evict_stale, dataset_etag)
+        return dataset_etag
+
+    def _compact(self, df: pd.DataFrame) -> tuple[pd.DataFrame, dict[str, Any]]:
+        '''
+        Уменьшение типов столбцов выборки, если оно включено в настройках
+
+        Args:
+            df (pd.DataFrame): Выборка с типами pandas по умолчанию
+
+        Returns:
+            tuple[pd.DataFrame, dict[str, Any]]: Выборка и объем памяти \
+                в байтах до и после уменьшения типов
+        '''
+        memory_before = frame_memory(df)
+        if settings.analytics.compact_dtypes:
+            df = compact_frame(
+                df,
+                settings.analytics.compact_float_rtol,
+                settings.analytics.compact_category_ratio
+            )
+        return df, {
+            'memory_before': memory_before,
+            'memory_after': frame_memory(df),
+            'dtypes': {str(name): str(dtype) for name, dtype in df.dtypes.items()},
         }
 
-    def _confusion_matrix(
+    async def dataset_metadata(self, dataset_etag: str) -> dict[str, Any] | None:
+        '''
+        Сведения о версии выборки в колоночном кэше
+
+        Args:
+            dataset_etag (str): ETag обучающей выборки в MinIO
+
+        Returns:
+            dict[str, Any] | None: Количество строк, объем памяти \
+                до и после уменьшения типов и типы столбцов, \
+                `None` если выборка не загружалась в кэш
+        '''
+        if not self.dataset_cache.exists(dataset_etag):
+            return None
+        return await asyncio.to_thread(self.dataset_cache.metadata, dataset_etag)
+
+    async def preprocess(
         self,
-        y_true: np.ndarray,
-        y_pred: np.ndarray
-    ) -> pd.DataFrame:
-        cm = confusion_matrix(y_true, y_pred)
-        confusion_matrix_df = pd.DataFrame(
-            cm,
-            index=['Настоящее 0', 'Настоящее 1'],
-            columns=['Предсказанное 0', 'Предсказанное 1']
+        dataset_etag: str,
+        split: str,
+        split_index: Callable[[int], tuple[np.ndarray, np.ndarray]]
+    ) -> PreprocessedSplit:
+        '''
+        Предобработка разбиения выборки. Выполняется один раз на версию \
+            выборки и разбиение, результат хранится в колоночном кэше \
+            и общий для всех моделей и запросов
+
+        Args:
+            dataset_etag (str): ETag обучающей выборки в MinIO
+            split (str): Имя разбиения
+            split_index (Callable[[int], tuple[np.ndarray, np.ndarray]]): \
+                Номера строк обучающей и тестовой части по количеству строк
+
+        Returns:
+            PreprocessedSplit: Разбиение после предобработки
+        '''
+        prepared = await asyncio.to_thread(
+            load_split, self.dataset_cache, dataset_etag, split
         )
-        return pd.DataFrame(confusion_matrix_df)
+        if prepared is not None:
+            return prepared
 
-    def _roc_curve(
-        self,
-        y_test: np.ndarray,
-        y_pred: np.ndarray,
-        model_name: str,
-        save_path: str | None = None
-    ) -> tuple:
-        fpr, tpr, _ = roc_curve(y_test, y_pred)
-        roc_auc = auc(fpr, tpr)
-        plt.plot(fpr, tpr)
-        plt.title(f'{model_name} (AUC = {roc_auc:.4f})')
-        if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        else:
-            plt.show()
-        return (fpr, tpr, roc_auc, model_name)
+        async with self.dataset_cache.lock(f'{dataset_etag}/{split}'):
+            prepared = await asyncio.to_thread(
+                load_split, self.dataset_cache, dataset_etag, split
+            )
+            if prepared is None:
+                df = await self.load_dataset(['relevance'], dataset_etag)
+                prepared = await asyncio.to_thread(
+                    preprocess_split,
+                    self.dataset_cache,
+                    dataset_etag,
+                    split,
+                    *split_index(len(df))
+                )
+        return prepared
 
-    async def analyze(self) -> dict[str, Any]:
-        df = await self.load_csv(self.file_name)
-        X_train, X_test, y_train, y_test = self._train_test_split(df)
+    def holdout_index(self, rows: int) -> tuple[np.ndarray, np.ndarray]:
+        train_index, test_index = train_test_split(
+            np.arange(rows),
+            test_size=0.2,
+            random_state=42     # Для воспроизводимости результатов
+        )
+        return train_index, test_index
 
-        models = [
+    def search_index(self, rows: int) -> tuple[np.ndarray, np.ndarray]:
+        # Поиск гиперпараметров делит обучающую часть `holdout`,
+        # тестовая часть в нем не участвует
+        train_index, _ = self.holdout_index(rows)
+        fit_index, validation_index = train_test_split(
+            train_index, test_size=0.2, random_state=42
+        )
+        return fit_index, validation_index
+
+    def fold_index(
+        self,
+        dataset_etag: str,
+        folds_name: str,
+        fold: int,
+        rows: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        folds = self.dataset_cache.load_array(dataset_etag, folds_name)
+        return np.flatnonzero(folds != fold), np.flatnonzero(folds == fold)
+
+    def _models(self) -> list[ClassifierMixin]:
+        return [
             KNeighborsClassifier(n_neighbors=5),
             LogisticRegression(max_iter=1000, random_state=42),
             RandomForestClassifier(
                 n_estimators=100,  # количество деревьев
                 random_state=42,  # для воспроизводимости
-                n_jobs=-1  # использовать все ядра процессора
+                # обучение уже идет в пуле процессов, потоки на все ядра
+                # в каждом процессе перегружают процессор
+                n_jobs=1
             )
         ]
 
-        scores = []
-        confusion_matrixes: list[pd.DataFrame] = []
-        graphs = dict()
+    def _chunked_models(self) -> list[ClassifierMixin]:
+        # Модели с `partial_fit` для обучения по фрагментам выборки
+        return [
+            SGDClassifier(loss='log_loss', random_state=42),
+            GaussianNB()
+        ]
+
+    async def _tuned(self, models: list[ClassifierMixin]) -> list[ClassifierMixin]:
+        '''
+        Применение гиперпараметров, найденных поиском гиперпараметров
+
+        Args:
+            models (list[ClassifierMixin]): Модели с гиперпараметрами \
+                по умолчанию
+
+        Returns:
+            list[ClassifierMixin]: Модели с лучшими гиперпараметрами
+        '''
+        tuned = await self.tuned_params_service.get_params()
         for model in models:
-            predicted = self.apply_model(model, X_train, X_test, y_train)  # type: ignore
-            model_name = type(model).__name__
+            params = tuned.get(type(model).__name__)
+            if params:
+                model.set_params(**params)  # type: ignore
+        return models
 
-            file_name = f'{model_name}_roc_curve'
-            file_ext = 'png'
-            save_path = f'temp/{file_name}.{file_ext}'
-            Path(save_path).parent.mkdir(parents=True, exist_ok=True)
-            self._roc_curve(y_test, predicted, model_name, save_path)
+    async def get_model(self, model_name: str) -> ClassifierMixin:
+        '''
+        Получение необученной модели текущей конфигурации по имени класса
 
-            file = await self.storage_service.read_file_as_bytes(save_path)
-            schema = await self.minio_service.upload_file(file, file_name, file_ext)
-            graphs[model_name] = schema.minio_public_file_url
-            scores.append({
-                **self.calc_scores(y_test, predicted),
-                'model': model_name,
-            })
+        Args:
+            model_name (str): Класс модели
 
-            confusion_matrixes.append(self._confusion_matrix(y_test, predicted))
+        Returns:
+            ClassifierMixin: Модель классификации
 
-        results = []
+        Raises:
+            NotFoundError: Модель не используется в аналитике
+        '''
+        for model in await self._tuned(self._models() + self._chunked_models()):
+            if type(model).__name__ == model_name:
+                return model
+        raise NotFoundError(f'Модель {model_name} не используется в аналитике')
+
+    async def get_dataset_etag(self) -> str:
+        '''
+        Получение версии обучающей выборки
 
-        for i, c in enumerate(confusion_matrixes):
-            model_name = type(models[i]).__name__
+        Returns:
+            str: ETag обучающей выборки в MinIO
+        '''
+        return await self.minio_service.get_file_etag(
+            self.file_name.split('/')[-1]
+        )
+
+    def _config_hash(
+        self,
+        models: list[ClassifierMixin],
+        mode: AnalyticsMode = 'holdout',
+        roc: RocOutput = 'points'
+    ) -> str:
+        '''
+        Хэш конфигурации: режим обучения, представление ROC-кривых, \
+            классы и гиперпараметры моделей
+
+        Args:
+            models (list[ClassifierMixin]): Модели классификации
+            mode (AnalyticsMode): Режим обучения
+            roc (RocOutput): Представление ROC-кривых
+
+        Returns:
+            str: SHA-256 хэш конфигурации
+        '''
+        config = {
+            'mode': mode,
+            'chunk_rows': settings.analytics.chunk_rows,
+            'cv_folds': settings.analytics.cv_folds,
+            'compact_dtypes': settings.analytics.compact_dtypes,
+            'roc': roc,
+            'roc_dpi': settings.analytics.roc_dpi,
+            'roc_format': settings.analytics.roc_format,
+            'roc_max_points': settings.analytics.roc_max_points,
+            'models': [
+                {'model': type(model).__name__, 'params': model.get_params()}  # type: ignore
+                for model in models
+            ]
+        }
+        dumped = json.dumps(config, sort_keys=True, default=str)
+        return hashlib.sha256(dumped.encode()).hexdigest()
+
+    async def analyze(
+        self,
+        progress: ProgressCallback = _skip_progress,
+        mode: AnalyticsMode = 'holdout',
+        roc: RocOutput = 'points'
+    ) -> dict[str, Any]:
+        '''
+        Аналитика моделей классификации с кэшированием результата \
+            по ETag обучающей выборки и конфигурации моделей
+
+        Args:
+            progress (ProgressCallback): Обработчик прогресса этапов \
+                `STAGES`, принимает название этапа и прогресс от 0 до 1
+            mode (AnalyticsMode): Режим обучения: `holdout` - выборка \
+                загружается целиком, `chunked` - модели с `partial_fit` \
+                обучаются по фрагментам выборки, для выборок больше памяти, \
+                `cv` - стратифицированная кросс-валидация, в таблице \
+                среднее и стандартное отклонение каждой метрики
+            roc (RocOutput): Представление ROC-кривых: `points` - \
+                прореженный ряд точек и AUC для отрисовки на клиенте, \
+                `image` - URL изображения в MinIO
+
+        Returns:
+            dict[str, Any]: Таблица метрик, матрицы ошибок и ROC-кривые
+        '''
+        models = await self._tuned(
+            self._chunked_models() if mode == 'chunked' else self._models()
+        )
+        dataset_etag = await self.get_dataset_etag()
+        config_hash = self._config_hash(models, mode, roc)
+
+        cached = await self.result_service.get_cached(dataset_etag, config_hash)
+        if cached is not None:
+            for stage in self.STAGES:
+                await progress(stage, 1.0)
+            return cached
+
+        result = await self._analyze(models, dataset_etag, progress, mode, roc)
+
+        # Выборка изменилась - результаты по старым версиям больше не нужны
+        await self.result_service.evict_stale(dataset_etag)
+        stored = await self.result_service.store(dataset_etag, config_hash, result)
+        return stored.result
+
+    async def _analyze(
+        self,
+        models: list[ClassifierMixin],
+        dataset_etag: str,
+        progress: ProgressCallback,
+        mode: AnalyticsMode = 'holdout',
+        roc: RocOutput = 'points'
+    ) -> dict[str, Any]:
+        if mode == 'cv':
+            # Модели блоков кросс-валидации только оцениваются
+            # и в реестр не сохраняются
+            evaluations = await self._evaluate_cv(models, dataset_etag, progress)
+        else:
+            evaluations = await self._evaluate_trained(
+                models, dataset_etag, progress, mode
+            )
+
+        curves = {
+            evaluation['model']: evaluation['roc_curve']
+            for evaluation in evaluations
+        }
+        # URL изображений или ряды точек ROC-кривых по имени модели
+        graphs: dict[str, Any]
+        if roc == 'image':
+            # ROC-кривые всех моделей рисуются и загружаются одновременно
+            graphs = await self.roc_curve_service.publish_all(curves)
+        else:
+            graphs = self.roc_curve_service.series_all(curves)
+        await progress('upload', 1.0)
+
+        scores = []
+        results = []
+        for evaluation in evaluations:
+            model_name = evaluation['model']
+            scores.append({
+                **evaluation['scores'],
+                'auc': evaluation['roc_curve']['auc'],
+                'threshold': evaluation['threshold']['threshold'],
+                'model': model_name,
+            })
             results.append({
                 'method': model_name,
-                'matrix': c.to_dict(),
-                'roc_curve': graphs[model_name]
+                'matrix': evaluation['matrix'].to_dict(),
+                'roc_curve': graphs[model_name],
+                'threshold': evaluation['threshold']
             })
+
         return {
             'table': {
                 'name': 'Оценка ошибки классификации',
                 'data': pd.DataFrame(scores).to_dict()
             },
             'confussion_matrixes': results,
-            'graphs': graphs
+            'graphs': graphs,
+            'metadata': {'dataset': await self.dataset_metadata(dataset_etag)}
         }
+
+    async def _evaluate_trained(
+        self,
+        models: list[ClassifierMixin],
+        dataset_etag: str,
+        progress: ProgressCallback,
+        mode: AnalyticsMode
+    ) -> list[dict[str, Any]]:
+        # Модели, уже обученные на этой версии выборки, не переобучаются
+        artifacts: list[ModelArtifact | None] = [
+            await self.registry_service.load(
+                type(model).__name__,
+                dataset_etag,
+                get_params_hash(model)
+            )
+            for model in models
+        ]
+
+        if mode == 'chunked':
+            evaluations = await self._evaluate_chunked(models, artifacts, progress)
+        else:
+            evaluations = await self._evaluate_holdout(
+                models, artifacts, dataset_etag, progress
+            )
+
+        for evaluation, artifact in zip(evaluations, artifacts):
+            if artifact is None:
+                await self.registry_service.register(
+                    ModelArtifact(evaluation['estimator'], evaluation['scaler']),
+                    dataset_etag
+                )
+        return evaluations
+
+    async def _evaluate_holdout(
+        self,
+        models: list[ClassifierMixin],
+        artifacts: list[ModelArtifact | None],
+        dataset_etag: str,
+        progress: ProgressCallback
+    ) -> list[dict[str, Any]]:
+        await self.preprocess(dataset_etag, 'holdout', self.holdout_index)
+        await progress('download', 1.0)
+
+        trained = 0
+
+        async def train(
+            model: ClassifierMixin,
+            artifact: ModelArtifact | None
+        ) -> dict[str, Any]:
+            nonlocal trained
+            evaluation = await self.executor_service.run(
+                evaluate_model,
+                artifact.estimator if artifact else model,
+                str(self.dataset_cache.root.resolve()),
+                dataset_etag,
+                'holdout',
+                artifact is not None
+            )
+            trained += 1
+            await progress('train', trained / len(models))
+            return evaluation
+
+        # Модели обучаются параллельно в пуле процессов,
+        # цикл событий в это время продолжает обслуживать запросы
+        return await asyncio.gather(*(
+            train(model, artifact)
+            for model, artifact in zip(models, artifacts)
+        ))
+
+    async def _evaluate_chunked(
+        self,
+        models: list[ClassifierMixin],
+        artifacts: list[ModelArtifact | None],
+        progress: ProgressCallback
+    ) -> list[dict[str, Any]]:
+        # Выборка читается фрагментами прямо из MinIO в процессе обучения,
+        # поэтому загрузка и обучение - один этап
+        evaluations = await self.executor_service.run(
+            evaluate_chunked,
+            models,
+            artifacts,
+            self.minio_service.presigned_url(self.file_name.split('/')[-1]),
+            settings.analytics.chunk_rows
+        )
+        await progress('download', 1.0)
+        await progress('train', 1.0)
+        return evaluations
+
+    async def _evaluate_cv(
+        self,
+        models: list[ClassifierMixin],
+        dataset_etag: str,
+        progress: ProgressCallback
+    ) -> list[dict[str, Any]]:
+        df = await self.load_dataset(['relevance'], dataset_etag)
+        _, y = split_features(df)
+        folds_name = await asyncio.to_thread(self._folds, dataset_etag, y)
+        n_splits = settings.analytics.cv_folds
+        # Блоки предобрабатываются до обучения, и модели
+        # читают масштабированные признаки блока из общего кэша
+        splits = [f'{folds_name}-{fold}' for fold in range(n_splits)]
+        for fold, split in enumerate(splits):
+            await self.preprocess(
+                dataset_etag,
+                split,
+                partial(self.fold_index, dataset_etag, folds_name, fold)
+            )
+        await progress('download', 1.0)
+
+        done = 0
+
+        async def train(model: ClassifierMixin, split: str) -> dict[str, Any]:
+            nonlocal done
+            evaluation = await self.executor_service.run(
+                evaluate_fold,
+                model,
+                str(self.dataset_cache.root.resolve()),
+                dataset_etag,
+                split
+            )
+            done += 1
+            await progress('train', done / (len(models) * n_splits))
+            return evaluation
+
+        # Каждая пара (модель, блок) обучается в пуле процессов отдельно
+        fold_evaluations = await asyncio.gather(*(
+            train(model, split)
+            for model in models
+            for split in splits
+        ))
+
+        evaluations = []
+        y_true = y.to_numpy()
+        # Матрицы ошибок всех пар (модель, блок) строятся одним пакетом
+        matrices, labels = confusion_matrices(
+            [y_true[evaluation['test_index']] for evaluation in fold_evaluations],
+            [evaluation['predicted'] for evaluation in fold_evaluations]
+        )
+        fold_scores = matrix_scores(matrices, labels)
+        for i, model in enumerate(models):
+            model_slice = slice(i * n_splits, (i + 1) * n_splits)
+            model_folds = fold_evaluations[model_slice]
+            # Оценки каждой строки моделью, которая ее не видела
+            y_score = np.empty(len(y_true), dtype=np.float64)
+            for evaluation in model_folds:
+                y_score[evaluation['test_index']] = evaluation['y_score']
+
+            model_name = type(model).__name__
+            scores = pd.DataFrame(fold_scores[model_slice])
+            summary = {}
+            for metric in scores.columns:
+                summary[f'{metric}_mean'] = float(scores[metric].mean())
+                summary[f'{metric}_std'] = float(scores[metric].std(ddof=0))
+            evaluations.append({
+                'model': model_name,
+                'scores': summary,
+                # Блоки не пересекаются, поэтому матрица ошибок
+                # по всей выборке - сумма матриц блоков
+                'matrix': matrix_frame(matrices[model_slice].sum(axis=0), labels),
+                **await asyncio.to_thread(threshold_report, y_true, y_score),
+            })
+        return evaluations
+
+    def _folds(self, dataset_etag: str, y: pd.Series) -> str:
+        '''
+        Номера блоков стратифицированной кросс-валидации для каждой строки. \
+            Считаются один раз на версию выборки и хранятся в колоночном кэше
+
+        Args:
+            dataset_etag (str): ETag обучающей выборки в MinIO
+            y (pd.Series): Целевой признак
+
+        Returns:
+            str: Имя массива номеров блоков в колоночном кэше
+        '''
+        n_splits = settings.analytics.cv_folds
+        folds_name = f'folds-{n_splits}'
+        if self.dataset_cache.load_array(dataset_etag, folds_name) is None:
+            folds = np.empty(len(y), dtype=np.int16)
+            splitter = StratifiedKFold(n_splits, shuffle=True, random_state=42)
+            for fold, (_, test) in enumerate(splitter.split(np.zeros(len(y)), y)):
+                folds[test] = fold
+            self.dataset_cache.save_array(dataset_etag, folds_name, folds)
+        return folds_name
@@ -0,0 +1,76 @@
+from typing import Any
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from base.service import BaseService
+from analytics.models.model import TunedParamsModel
+from analytics.repositories.repository import TunedParamsRepository
+
+
+class TunedParamsService(BaseService[TunedParamsModel]):
+    '''
+    Бизнес-логика лучших гиперпараметров моделей
+    '''
+
+    def __init__(self, db: AsyncSession):
+        '''
+        Бизнес-логика лучших гиперпараметров моделей
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД
+        '''
+        super().__init__(
+            TunedParamsRepository(db),
+            TunedParamsModel,
+            single_model_name='гиперпараметры модели',
+            multiple_models_name='гиперпараметры моделей'
+        )
+
+    async def get_params(self) -> dict[str, dict[str, Any]]:
+        '''
+        Получение лучших гиперпараметров всех моделей
+
+        Returns:
+            dict[str, dict[str, Any]]: Гиперпараметры по классу модели
+        '''
+        tuned = await self.repository.scalar_all(select(TunedParamsModel))
+        return {item.model_name: item.params for item in tuned}
+
+    async def store(
+        self,
+        model_name: str,
+        params: dict[str, Any],
+        metric: str,
+        score: float,
+        dataset_etag: str
+    ) -> TunedParamsModel:
+        '''
+        Сохранение лучших гиперпараметров модели вместо предыдущих
+
+        Args:
+            model_name (str): Класс модели
+            params (dict[str, Any]): Гиперпараметры модели
+            metric (str): Метрика, по которой выбирались гиперпараметры
+            score (float): Значение метрики на валидационной части
+            dataset_etag (str): ETag обучающей выборки
+
+        Returns:
+            TunedParamsModel: SQLAlchemy-модель гиперпараметров
+        '''
+        tuned = await self.repository.scalar_first(
+            select(TunedParamsModel).filter_by(model_name=model_name)
+        )
+        if tuned is None:
+            return await self.create(TunedParamsModel(
+                model_name=model_name,
+                params=params,
+                metric=metric,
+                score=score,
+                dataset_etag=dataset_etag
+            ))
+
+        tuned.params = params
+        tuned.metric = metric
+        tuned.score = score
+        tuned.dataset_etag = dataset_etag
+        await self.repository.db.flush()
+        return tuned
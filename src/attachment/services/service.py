@@ -1,24 +1,61 @@
-from minio import S3Error
+import asyncio
+from typing import NamedTuple
 from base.service import BaseService
 from sqlalchemy.ext.asyncio import AsyncSession
 from attachment.models.model import AttachmentModel
 from attachment.repositories.repository import AttachmentRepository
 from fastapi import UploadFile
-from exceptions.exception import FileIsTooLargeError, WasNotCreatedError
+from exceptions.exception import AppException
 from storage.services.minio_service import MinioService
 
 
+class AttachmentUploadError(NamedTuple):
+    '''
+    Ошибка загрузки одного файла
+
+    Args:
+        position (int): Номер файла в запросе
+        file_name (str): Имя файла
+        detail (str): Описание ошибки
+    '''
+    position: int
+    file_name: str
+    detail: str
+
+
+class AttachmentUploadResult(NamedTuple):
+    '''
+    Результат загрузки нескольких файлов
+
+    Args:
+        attachments (list[AttachmentModel]): Сохраненный медиа-контент \
+            в порядке файлов запроса
+        errors (list[AttachmentUploadError]): Файлы, которые \
+            не удалось загрузить
+    '''
+    attachments: list[AttachmentModel]
+    errors: list[AttachmentUploadError]
+
+
 class AttachmentService(BaseService[AttachmentModel]):
     '''
     Бизнес-логика прикрепляемого медиа-контента
     '''
 
-    def __init__(self, db: AsyncSession, minio_service: MinioService):
+    def __init__(
+        self,
+        db: AsyncSession,
+        minio_service: MinioService,
+        parallel_uploads: int = 4
+    ):
         '''
         Бизнес-логика прикрепляемого медиа-контента
 
         Args:
             db (AsyncSession): Асинхронная сессия БД
+            minio_service (MinioService): Сервис MinIO
+            parallel_uploads (int): Количество файлов, \
+                загружаемых в MinIO одновременно
         '''
         super().__init__(
             AttachmentRepository(db),
@@ -27,23 +64,77 @@ class AttachmentService(BaseService[AttachmentModel]):
             multiple_models_name='прикрепляемый медиа-контент'
         )
         self.minio_service = minio_service
+        self.parallel_uploads = parallel_uploads
 
     async def upload_files(
         self,
-        *files: UploadFile
-    ) -> list[AttachmentModel]:
-        uploaded_attachments = []
-        for file in files:
+        *files: UploadFile,
+        tg_msg_id: str = '',
+        tg_file_url: str = ''
+    ) -> AttachmentUploadResult:
+        '''
+        Загрузка файлов в MinIO, не больше `parallel_uploads` \
+            одновременно, и сохранение загруженных файлов \
+            в БД одним пакетным запросом. Ошибка загрузки одного \
+            файла не прерывает загрузку остальных. Записи сохраняются \
+            в точке сохранения транзакции: если сохранить их не удалось, \
+            откатывается только эта вставка, а загруженные объекты \
+            удаляются из MinIO. Фиксацию транзакции выполняет вызывающий код
+
+        Args:
+            files (UploadFile): Загружаемые файлы
+            tg_msg_id (str): Идентификатор сообщения в Telegram
+            tg_file_url (str): URL файла на серверах Telegram
+
+        Returns:
+            AttachmentUploadResult: Сохраненный медиа-контент \
+                и ошибки загрузки отдельных файлов
+
+        Raises:
+            Exception: Ошибка сохранения записей в БД
+        '''
+        semaphore = asyncio.Semaphore(self.parallel_uploads)
+
+        async def upload(file: UploadFile) -> AttachmentModel | str:
+            async with semaphore:
+                try:
+                    attachment_schema = await self.minio_service.upload_file_from_form(file)
+                except AppException as exc:
+                    return exc.detail
+                except Exception as exc:
+                    return f'MinIO: {exc}'
+            return AttachmentModel.from_schema(
+                attachment_schema, tg_msg_id, tg_file_url
+            )
+
+        results = await asyncio.gather(*(upload(file) for file in files))
+
+        attachments = []
+        errors = []
+        for position, (file, result) in enumerate(zip(files, results)):
+            if isinstance(result, AttachmentModel):
+                attachments.append(result)
+            else:
+                errors.append(
+                    AttachmentUploadError(position, file.filename or '', result)
+                )
+        if attachments:
             try:
-                attachment_schema = await self.minio_service.upload_file_from_form(file)
-            except S3Error as exc:
-                raise WasNotCreatedError(f'MinIO: {exc}')
-            except FileIsTooLargeError as exc:
-                raise FileIsTooLargeError(f'MinIO: {exc}')
-            except Exception as exc:
-                raise Exception(f'MinIO: {exc}')
-
-            attachment_model = AttachmentModel.from_schema(
-                attachment_schema)
-            uploaded_attachments.append(attachment_model)
-        return uploaded_attachments
+                async with self.repository.db.begin_nested():
+                    await self.repository.create_many(attachments)
+            except Exception:
+                await self._delete_objects(attachments)
+                raise
+        return AttachmentUploadResult(attachments, errors)
+
+    async def _delete_objects(self, attachments: list[AttachmentModel]) -> None:
+        async def delete(attachment: AttachmentModel) -> None:
+            await self.minio_service.delete_object(
+                self.minio_service.get_object_name(attachment.minio_file_url)
+            )
+
+        # Удаление не должно скрывать исходную ошибку сохранения,
+        # в том числе ошибку разбора URL объекта
+        await asyncio.gather(*(
+            delete(attachment) for attachment in attachments
+        ), return_exceptions=True)
@@ -1,5 +1,5 @@
-from typing import Any, TypeVar
-from sqlalchemy import ScalarResult, Select, Delete
+from typing import Any, TypeVar, cast
+from sqlalchemy import CursorResult, ScalarResult, Select, Delete, Update
 from typing import Sequence
 from sqlalchemy.ext.asyncio import AsyncSession
 from base.model import BaseModel
@@ -22,7 +22,7 @@ class BaseRepository[T: BaseModel]:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def scalar_all(self, statement: Select[tuple[T]]) -> Sequence[T]:
+    async def scalar_all(self, statement: Select) -> Sequence[T]:
         return (await self.db.execute(statement)).scalars().all()
 
     async def scalar_first(self, statement: Select) -> T | None:
@@ -58,6 +58,21 @@ class BaseRepository[T: BaseModel]:
         await self.db.refresh(model)
         return model
 
+    async def create_many(self, models: Sequence[T]) -> Sequence[T]:
+        '''
+        Добавление нескольких сущностей одним пакетным INSERT. \
+            Идентификаторы заполняются из RETURNING того же запроса
+
+        Args:
+            models (Sequence[T]): SQLAlchemy-модели сущностей
+
+        Returns:
+            Sequence[T]: Модели с заполненными идентификаторами
+        '''
+        self.db.add_all(models)
+        await self.db.flush()
+        return models
+
     async def update(
         self,
         model: T,
@@ -99,6 +114,21 @@ class BaseRepository[T: BaseModel]:
         await self.db.execute(statement)
         await self.db.flush()
 
+    async def execute_update(self, statement: Update) -> int:
+        '''
+        Выполнение UPDATE-запроса
+
+        Args:
+            statement (Update): UPDATE-запрос, условия которого \
+                выбирают обновляемые сущности
+
+        Returns:
+            int: Количество обновленных строк
+        '''
+        result = await self.db.execute(statement)
+        await self.db.flush()
+        return cast(CursorResult, result).rowcount
+
     def check_filters(self, filter: dict[str, Any]) -> bool:
         '''
         Проверка фильтра поиска
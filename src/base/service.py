@@ -1,4 +1,4 @@
-from typing import Any, TypeVar
+from typing import Any, Sequence, TypeVar
 from base.model import BaseModel
 from base.repository import BaseRepository
 from sqlalchemy import Select, delete, select
@@ -66,6 +66,23 @@ class BaseService[M]:
             )
         return model
 
+    async def create_many(self, models: Sequence[M]) -> Sequence[M]:
+        '''
+        Создать несколько сущностей в базе данных одним запросом
+
+        Args:
+            models (Sequence[M]): Данные для создания сущностей
+
+        Returns:
+            Sequence[M]: SQLAlchemy-модели сущностей
+
+        '''
+        try:
+            return await self.repository.create_many(models)
+        except Exception as e:
+            await self.repository.db.rollback()
+            raise e
+
     async def get(
         self,
         filter: dict[str, Any],
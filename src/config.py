@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import List
+from typing import List, Literal
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import model_validator
 from typing import Self
@@ -17,6 +17,9 @@ class MinioSettings(BaseSettings):
     port_secure: int
     endpoint: str
     ip_address: str
+    region: str = 'us-east-1'
+    retries: int = 3
+    bucket_refresh_interval: float = 300.0
 
 
 class PostgresSettings(BaseSettings):
@@ -52,6 +55,11 @@ class TelegramSettings(BaseSettings):
 class AttachmentSettings(BaseSettings):
     max_size: int
     extensions: List[str]
+    # Загрузка держит в памяти до part_size * parallel_parts байт
+    # на файл и до parallel_uploads файлов на запрос
+    part_size: int = 5 * 1024 * 1024
+    parallel_parts: int = 1
+    parallel_uploads: int = 4
 
 
 class AppSettings(BaseSettings):
@@ -59,6 +67,40 @@ class AppSettings(BaseSettings):
     templates_path: str
 
 
+class AnalyticsSettings(BaseSettings):
+    workers: int = 3
+    queue_size: int = 6
+    model_cache_size: int = 256 * 1024 * 1024
+    predict_batch_rows: int = 4096
+    predict_batch_window: float = 0.005
+    predict_refresh_interval: float = 5.0
+    score_chunk_rows: int = 50_000
+    score_spool_size: int = 16 * 1024 * 1024
+    dataset_cache_path: str = 'temp/datasets'
+    chunk_rows: int = 100_000
+    cv_folds: int = 5
+    search_budget_seconds: float = 120.0
+    search_cpu_budget_seconds: float | None = None
+    search_max_candidates: int = 27
+    search_min_rows: int = 100
+    roc_dpi: int = 100
+    roc_format: Literal['png', 'webp', 'svg'] = 'png'
+    roc_max_points: int = 100
+    compact_dtypes: bool = True
+    compact_float_rtol: float = 0.0
+    compact_category_ratio: float = 0.5
+
+
+class StorageSettings(BaseSettings):
+    http_limit: int = 100
+    http_limit_per_host: int = 32
+    http_keepalive_timeout: float = 30.0
+    http_dns_cache_ttl: int = 300
+    http_connect_timeout: float = 5.0
+    http_read_timeout: float = 60.0
+    http_chunk_size: int = 1024 * 1024
+
+
 class JwtSettings(BaseSettings):
     access_token_expire: int
     algorithm: str
@@ -85,6 +127,12 @@ class Settings(BaseSettings):
     # JWT
     jwt: JwtSettings
 
+    # Analytics
+    analytics: AnalyticsSettings = AnalyticsSettings()
+
+    # Storage
+    storage: StorageSettings = StorageSettings()
+
     model_config = SettingsConfigDict(
         env_nested_delimiter='__',
         env_file=dot_env_path,
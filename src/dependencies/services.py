@@ -1,6 +1,16 @@
+from functools import cache
 from fastapi import Depends
 from analytics.services.service import AnalyticsService
-from db.database import get_db
+from analytics.services.result_service import AnalyticsResultService
+from analytics.services.executor_service import ExecutorService
+from analytics.services.job_service import AnalyticsJobService, AnalyticsJobRunner
+from analytics.services.registry_service import ModelCache, ModelRegistryService
+from analytics.services.prediction_service import BatchPredictor, PredictionService
+from analytics.services.dataset_cache import DatasetCache
+from analytics.services.tuned_params_service import TunedParamsService
+from analytics.services.search_service import SearchService
+from analytics.services.roc_service import RocCurveService
+from db.database import get_db, async_session
 from sqlalchemy.ext.asyncio import AsyncSession
 from attachment.services.service import AttachmentService
 from role.services.service import RoleService
@@ -9,6 +19,7 @@ from endpoint.services.service import EndpointService
 from permission.services.service import PermissionService
 from user.services.service import UserService
 from info.services.service import InfoService
+from info.services.profile_service import DatasetProfileService
 from storage.services.minio_service import MinioService
 from storage.services.service import StorageService
 from config import settings
@@ -42,7 +53,8 @@ def attachment_service(
     '''
     return AttachmentService(
         db,
-        minio_service()
+        minio_service(),
+        settings.attachment.parallel_uploads
     )
 
 
@@ -76,9 +88,12 @@ def auth_service(
     return AuthService(user_service(db))
 
 
+@cache
 def minio_service() -> MinioService:
     '''
-    Получить сервис MinIO
+    Получить сервис MinIO. \
+        Сервис один на процесс приложения, запускается \
+        и останавливается в lifespan приложения
 
     Returns:
         MinioService: Cервис MinIO
@@ -89,7 +104,12 @@ def minio_service() -> MinioService:
         endpoint=settings.minio.endpoint,
         access_key=settings.minio.access_key,
         secret_key=settings.minio.secret_key,
-        storage_service=storage_service()
+        storage_service=storage_service(),
+        region=settings.minio.region,
+        retries=settings.minio.retries,
+        refresh_interval=settings.minio.bucket_refresh_interval,
+        part_size=settings.attachment.part_size,
+        parallel_parts=settings.attachment.parallel_parts
     )
 
 
@@ -129,31 +149,257 @@ def permission_service(
     )
 
 
-def analytics_service() -> AnalyticsService:
+def analytics_result_service(
+    db: AsyncSession = Depends(get_db)
+) -> AnalyticsResultService:
+    '''
+    Получить объект класса бизнес-логики кэша результатов аналитики
+
+    Args:
+        db (AsyncSession): Асинхронная сессия БД
+
+    Returns:
+        AnalyticsResultService: Сервис кэша результатов аналитики
+    '''
+    return AnalyticsResultService(db)
+
+
+def analytics_service(
+    db: AsyncSession = Depends(get_db)
+) -> AnalyticsService:
     '''
     Получить объект класса бизнес-логики сервиса аналитики
 
+    Args:
+        db (AsyncSession): Асинхронная сессия БД
+
     Returns:
         AnalyticsService: Сервис аналитики
     '''
-    return AnalyticsService(minio_service(), storage_service())
+    return AnalyticsService(
+        minio_service(),
+        storage_service(),
+        analytics_result_service(db),
+        executor_service(),
+        model_registry_service(db),
+        dataset_cache(),
+        tuned_params_service(db),
+        roc_curve_service()
+    )
 
 
-def info_service() -> InfoService:
+def tuned_params_service(
+    db: AsyncSession = Depends(get_db)
+) -> TunedParamsService:
+    '''
+    Получить объект класса бизнес-логики лучших гиперпараметров моделей
+
+    Args:
+        db (AsyncSession): Асинхронная сессия БД
+
+    Returns:
+        TunedParamsService: Сервис лучших гиперпараметров моделей
+    '''
+    return TunedParamsService(db)
+
+
+def roc_curve_service() -> RocCurveService:
+    '''
+    Получить объект класса бизнес-логики ROC-кривых
+
+    Returns:
+        RocCurveService: Сервис ROC-кривых
+    '''
+    return RocCurveService(
+        minio_service(),
+        executor_service(),
+        settings.analytics.roc_dpi,
+        settings.analytics.roc_format,
+        settings.analytics.roc_max_points
+    )
+
+
+def search_service(
+    db: AsyncSession = Depends(get_db)
+) -> SearchService:
+    '''
+    Получить объект класса бизнес-логики поиска гиперпараметров
+
+    Args:
+        db (AsyncSession): Асинхронная сессия БД
+
+    Returns:
+        SearchService: Сервис поиска гиперпараметров
+    '''
+    return SearchService(
+        analytics_service(db),
+        executor_service(),
+        tuned_params_service(db)
+    )
+
+
+def model_registry_service(
+    db: AsyncSession = Depends(get_db)
+) -> ModelRegistryService:
+    '''
+    Получить объект класса бизнес-логики реестра обученных моделей
+
+    Args:
+        db (AsyncSession): Асинхронная сессия БД
+
+    Returns:
+        ModelRegistryService: Сервис реестра обученных моделей
+    '''
+    return ModelRegistryService(db, minio_service(), model_cache())
+
+
+def prediction_service(
+    db: AsyncSession = Depends(get_db)
+) -> PredictionService:
+    '''
+    Получить объект класса бизнес-логики предсказаний обученными моделями
+
+    Args:
+        db (AsyncSession): Асинхронная сессия БД
+
+    Returns:
+        PredictionService: Сервис предсказаний
+    '''
+    return PredictionService(
+        analytics_service(db),
+        model_registry_service(db),
+        batch_predictor()
+    )
+
+
+@cache
+def batch_predictor() -> BatchPredictor:
+    '''
+    Получить прогретые модели. Один объект на процесс приложения
+
+    Returns:
+        BatchPredictor: Прогретые модели и их очереди пакетной обработки
+    '''
+    return BatchPredictor(
+        max_rows=settings.analytics.predict_batch_rows,
+        window=settings.analytics.predict_batch_window,
+        refresh_interval=settings.analytics.predict_refresh_interval
+    )
+
+
+@cache
+def dataset_cache() -> DatasetCache:
+    '''
+    Получить колоночный кэш обучающей выборки. \
+        Кэш один на процесс приложения
+
+    Returns:
+        DatasetCache: Колоночный кэш обучающей выборки
+    '''
+    return DatasetCache(settings.analytics.dataset_cache_path)
+
+
+@cache
+def model_cache() -> ModelCache:
+    '''
+    Получить кэш загруженных моделей. \
+        Кэш один на процесс приложения
+
+    Returns:
+        ModelCache: Кэш загруженных моделей
+    '''
+    return ModelCache(settings.analytics.model_cache_size)
+
+
+def analytics_job_service(
+    db: AsyncSession = Depends(get_db)
+) -> AnalyticsJobService:
+    '''
+    Получить объект класса бизнес-логики фоновых задач аналитики
+
+    Args:
+        db (AsyncSession): Асинхронная сессия БД
+
+    Returns:
+        AnalyticsJobService: Сервис фоновых задач аналитики
+    '''
+    return AnalyticsJobService(db)
+
+
+@cache
+def analytics_job_runner() -> AnalyticsJobRunner:
+    '''
+    Получить обработчик фоновых задач аналитики. \
+        Обработчик один на процесс приложения
+
+    Returns:
+        AnalyticsJobRunner: Обработчик фоновых задач аналитики
+    '''
+    return AnalyticsJobRunner(async_session, analytics_service)
+
+
+@cache
+def executor_service() -> ExecutorService:
+    '''
+    Получить пул процессов аналитики. \
+        Пул один на процесс приложения
+
+    Returns:
+        ExecutorService: Пул процессов аналитики
+    '''
+    return ExecutorService(
+        workers=settings.analytics.workers,
+        queue_size=settings.analytics.queue_size
+    )
+
+
+def info_service(db: AsyncSession = Depends(get_db)) -> InfoService:
     '''
     Получить объект класса бизнес-логики сервиса общей информации
 
+    Args:
+        db (AsyncSession): Асинхронная сессия БД
+
     Returns:
         InfoService: Сервис общей информации
     '''
-    return InfoService(minio_service(), storage_service(), analytics_service())
+    return InfoService(
+        minio_service(),
+        storage_service(),
+        analytics_service(db)
+    )
 
 
+def dataset_profile_service(
+    db: AsyncSession = Depends(get_db)
+) -> DatasetProfileService:
+    '''
+    Получить объект класса бизнес-логики профиля обучающей выборки
+
+    Args:
+        db (AsyncSession): Асинхронная сессия БД
+
+    Returns:
+        DatasetProfileService: Сервис профиля обучающей выборки
+    '''
+    return DatasetProfileService(db, analytics_service(db))
+
+
+@cache
 def storage_service() -> StorageService:
     '''
-    Получить объект класса бизнес-логики сервиса файлов
+    Получить объект класса бизнес-логики сервиса файлов. \
+        Сервис и пул HTTP-соединений одни на процесс приложения
 
     Returns:
         InfoService: Сервис файлов
     '''
-    return StorageService()
+    return StorageService(
+        limit=settings.storage.http_limit,
+        limit_per_host=settings.storage.http_limit_per_host,
+        keepalive_timeout=settings.storage.http_keepalive_timeout,
+        dns_cache_ttl=settings.storage.http_dns_cache_ttl,
+        connect_timeout=settings.storage.http_connect_timeout,
+        read_timeout=settings.storage.http_read_timeout,
+        chunk_size=settings.storage.http_chunk_size
+    )
@@ -26,6 +26,13 @@ class AlreadyExistsError(AppException):
     status_code = status.HTTP_400_BAD_REQUEST
 
 
+class BadRequestError(AppException):
+    '''
+    Ошибка, которая выбрасывается в случае, если переданы некорректные данные
+    '''
+    status_code = status.HTTP_400_BAD_REQUEST
+
+
 class ForbiddenError(AppException):
     '''Ошибка, которая выбрасывается в случае, запрета доступа'''
     status_code = status.HTTP_403_FORBIDDEN
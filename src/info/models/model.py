@@ -0,0 +1,25 @@
+from typing import Any
+from sqlalchemy import JSON
+from sqlalchemy.orm import Mapped, mapped_column
+from base.model import BaseModel
+
+
+class DatasetProfileModel(BaseModel):
+    '''
+    SQL Alchemy модель профиля обучающей выборки
+
+    Args:
+        id (int): Идентификатор
+        dataset_etag (Mapped[str]): ETag обучающей выборки в MinIO
+        rows (Mapped[int]): Количество строк выборки
+        fingerprint (Mapped[str]): Отпечаток строк выборки
+        state (Mapped[dict[str, Any]]): Накопленная статистика столбцов
+        profile (Mapped[dict[str, Any]]): Профиль выборки
+    '''
+    __tablename__ = 'dataset_profile'
+
+    dataset_etag: Mapped[str] = mapped_column(nullable=False, unique=True)
+    rows: Mapped[int] = mapped_column(nullable=False)
+    fingerprint: Mapped[str] = mapped_column(nullable=False)
+    state: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
+    profile: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
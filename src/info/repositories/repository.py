@@ -0,0 +1,16 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from base.repository import BaseRepository
+from info.models.model import DatasetProfileModel
+
+
+class DatasetProfileRepository(BaseRepository[DatasetProfileModel]):
+    '''Обработка профилей обучающей выборки в БД'''
+
+    def __init__(self, db: AsyncSession):
+        '''
+        Обработка профилей обучающей выборки в БД
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД
+        '''
+        super().__init__(db)
@@ -1,7 +1,16 @@
-from fastapi import APIRouter, Depends
-from dependencies.services import info_service
+import asyncio
+from fastapi import APIRouter, Depends, Header, Query, Response
+from fastapi.responses import StreamingResponse
+from dependencies.services import (
+    info_service, dataset_profile_service, storage_service
+)
 from info.services.service import InfoService
+from info.services.profile_service import DatasetProfileService
+from storage.services.service import StorageService
 from info.schemas.schema import InfoSchema
+from info.services.formats import (
+    MEDIA_TYPES, TrainDataFormat, iter_csv, negotiate, to_arrow, to_json
+)
 
 
 router = APIRouter(prefix='/info', tags=['Общая информация'])
@@ -48,14 +57,80 @@ async def get_target_attribute(
 
 @router.get(
     path="/train_data",
-    summary='Получение информации о предметной области',
-    description=('Получение информации о предметной области. '
+    summary='Получение страницы обучающей выборки',
+    description=('Получение страницы обучающей выборки. Формат ответа '
+                 'выбирается параметром format или заголовком Accept: '
+                 'JSON `{columns, index, rows}` (application/json), '
+                 'Arrow IPC stream (application/vnd.apache.arrow.stream) '
+                 'или CSV (text/csv). Поддерживаются выбор '
+                 'столбцов, сортировка и фильтры вида `price>=100`. '
+                 'Курсор следующей страницы возвращается в заголовке '
+                 'X-Next-Cursor. '
                  'Права доступа: студент, преподаватель, суперюзер'),
-    response_model=dict
+    response_class=Response
 )
 async def get_train_data(
-    limit: int = 100,
-    offset: int = 100,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    columns: list[str] | None = Query(None),
+    sort: str | None = None,
+    descending: bool = False,
+    filters: list[str] | None = Query(None, alias='filter'),
+    cursor: str | None = None,
+    format: TrainDataFormat | None = None,
+    accept: str | None = Header(None),
     service: InfoService = Depends(info_service)
 ):
-    return await service.get_train_data(limit=limit, offset=offset)
+    page = await service.get_train_page(
+        limit=limit,
+        offset=offset,
+        columns=columns,
+        sort=sort,
+        descending=descending,
+        filters=filters,
+        cursor=cursor
+    )
+    format = format or negotiate(accept)
+    headers = {'Vary': 'Accept'}
+    if page.next_cursor is not None:
+        headers['X-Next-Cursor'] = page.next_cursor
+
+    if format == 'csv':
+        return StreamingResponse(
+            iter_csv(page.frame), media_type=MEDIA_TYPES['csv'], headers=headers
+        )
+    if format == 'arrow':
+        content = await asyncio.to_thread(to_arrow, page.frame)
+    else:
+        content = await asyncio.to_thread(to_json, page.frame)
+    return Response(content, media_type=MEDIA_TYPES[format], headers=headers)
+
+
+@router.get(
+    path="/profile",
+    summary='Получение профиля обучающей выборки',
+    description=('Получение статистики столбцов обучающей выборки: '
+                 'min, max, mean, квантили, количество пропусков '
+                 'и гистограмма. '
+                 'Права доступа: студент, преподаватель, суперюзер'),
+    response_model=dict
+)
+async def get_profile(
+    service: DatasetProfileService = Depends(dataset_profile_service)
+):
+    return await service.get_profile()
+
+
+@router.get(
+    path="/storage_pool",
+    summary='Получение статистики пула соединений с хранилищем',
+    description=('Получение счетчиков пула HTTP-соединений с MinIO: '
+                 'запросы через открытое соединение и запросы, '
+                 'открывшие новое соединение. '
+                 'Права доступа: студент, преподаватель, суперюзер'),
+    response_model=dict[str, int]
+)
+async def get_storage_pool(
+    service: StorageService = Depends(storage_service)
+):
+    return service.pool_statistics()
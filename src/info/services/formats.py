@@ -0,0 +1,136 @@
+import io
+import orjson
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from typing import Any, Iterator, Literal
+
+
+# json - {columns, index, rows}, arrow - Arrow IPC stream, csv - CSV
+TrainDataFormat = Literal['json', 'arrow', 'csv']
+
+MEDIA_TYPES: dict[TrainDataFormat, str] = {
+    'json': 'application/json',
+    'arrow': 'application/vnd.apache.arrow.stream',
+    'csv': 'text/csv',
+}
+# Количество строк в одной части потока CSV. Страница не больше
+# 1000 строк, поэтому первые строки отправляются до форматирования
+# остальной страницы
+CSV_CHUNK_ROWS = 100
+
+
+def negotiate(accept: str | None) -> TrainDataFormat:
+    '''
+    Выбор формата ответа по заголовку Accept с учетом весов `q`
+
+    Args:
+        accept (str | None): Заголовок Accept
+
+    Returns:
+        TrainDataFormat: Формат с наибольшим весом, \
+            по умолчанию - json
+    '''
+    formats: dict[str, TrainDataFormat] = {
+        media_type: name for name, media_type in MEDIA_TYPES.items()
+    }
+    weighted = []
+    for i, item in enumerate((accept or '').split(',')):
+        media_type, *params = [part.strip() for part in item.split(';')]
+        weight = 1.0
+        for param in params:
+            if param.startswith('q='):
+                try:
+                    weight = float(param[2:])
+                except ValueError:
+                    weight = 0.0
+        if media_type in formats and weight > 0:
+            weighted.append((-weight, i, formats[media_type]))
+    return min(weighted)[2] if weighted else 'json'
+
+
+def column_values(values: pd.Series) -> list[Any]:
+    '''
+    Значения столбца для JSON: пропуски заменяются на `None`
+
+    Args:
+        values (pd.Series): Столбец
+
+    Returns:
+        list[Any]: Значения столбца
+    '''
+    result = values.astype(object).tolist()
+    if values.hasnans:
+        return [None if value is None or value != value else value for value in result]
+    return result
+
+
+def to_dict(frame: pd.DataFrame) -> dict[str, dict[int, Any]]:
+    '''
+    Вложенный словарь: значения по имени столбца и номеру строки
+
+    Args:
+        frame (pd.DataFrame): Страница выборки
+
+    Returns:
+        dict[str, dict[int, Any]]: Значения по имени столбца и номеру строки
+    '''
+    index = frame.index.tolist()
+    return {
+        str(name): dict(zip(index, column_values(values)))
+        for name, values in frame.items()
+    }
+
+
+def to_json(frame: pd.DataFrame) -> bytes:
+    '''
+    Компактный JSON: имена столбцов один раз, строки - массивами
+
+    Args:
+        frame (pd.DataFrame): Страница выборки
+
+    Returns:
+        bytes: JSON `{columns, index, rows}`
+    '''
+    columns = [column_values(values) for _, values in frame.items()]
+    return orjson.dumps({
+        'columns': [str(name) for name in frame.columns],
+        'index': np.asarray(frame.index),
+        'rows': list(zip(*columns)),
+    }, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def to_arrow(frame: pd.DataFrame) -> bytes:
+    '''
+    Страница выборки в формате Arrow IPC stream. Категориальные \
+        столбцы передаются словарями, номера строк - столбцом `row`
+
+    Args:
+        frame (pd.DataFrame): Страница выборки
+
+    Returns:
+        bytes: Arrow IPC stream
+    '''
+    table = pa.Table.from_pandas(frame, preserve_index=True)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def iter_csv(frame: pd.DataFrame, chunk_rows: int = CSV_CHUNK_ROWS) -> Iterator[bytes]:
+    '''
+    Потоковая выдача страницы выборки в CSV (разделитель `;`) частями по `chunk_rows` строк
+
+    Args:
+        frame (pd.DataFrame): Страница выборки
+        chunk_rows (int): Количество строк в части
+
+    Returns:
+        Iterator[bytes]: Части CSV, первая - с заголовком
+    '''
+    for start in range(0, max(len(frame), 1), chunk_rows):
+        buffer = io.StringIO()
+        frame.iloc[start:start + chunk_rows].to_csv(
+            buffer, sep=';', header=start == 0)
+        yield buffer.getvalue().encode()
@@ -0,0 +1,201 @@
+import hashlib
+import numpy as np
+import pandas as pd
+from typing import Any
+
+# Количество интервалов внутренней гистограммы столбца, по которой
+# считаются квантили и итоговая гистограмма
+PROFILE_BINS = 1024
+# Количество интервалов гистограммы в профиле
+HISTOGRAM_BINS = 20
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+# Количество самых частых значений категориального столбца в профиле
+TOP_VALUES = 10
+
+
+def fingerprints(df: pd.DataFrame, rows: int) -> tuple[str, str]:
+    '''
+    Отпечатки первых `rows` строк и всей выборки за один проход. \
+        Отпечаток первых строк новой версии совпадает с отпечатком \
+        старой версии, только если в выборку дописаны строки
+
+    Args:
+        df (pd.DataFrame): Выборка
+        rows (int): Количество первых строк
+
+    Returns:
+        tuple[str, str]: BLAKE2b-хэши имен, типов и содержимого столбцов \
+            первых `rows` строк и всей выборки
+    '''
+    head_digests: list[bytes] = []
+    full_digests: list[bytes] = []
+    for name, values in df.items():
+        digest = hashlib.blake2b(f'{name}:{values.dtype}'.encode(), digest_size=32)
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.astype(object)
+        values = values.to_numpy()
+        parts = ((values[:rows], head_digests), (values[rows:], full_digests))
+        for part, digests in parts:
+            if part.dtype == object:
+                digest.update(''.join(f'{value}\x1f' for value in part).encode())
+            else:
+                digest.update(np.ascontiguousarray(part).data)
+            digests.append(digest.copy().digest())
+    return (
+        hashlib.blake2b(b''.join(head_digests), digest_size=32).hexdigest(),
+        hashlib.blake2b(b''.join(full_digests), digest_size=32).hexdigest(),
+    )
+
+
+def _expand(histogram: dict[str, Any], low: float, high: float) -> None:
+    # Диапазон гистограммы удваивается в сторону новых значений,
+    # соседние интервалы объединяются попарно
+    counts = np.asarray(histogram['counts'], dtype=np.int64)
+    while low < histogram['low'] or high > histogram['low'] + histogram['width'] * len(counts):
+        zeros = np.zeros_like(counts)
+        if low < histogram['low']:
+            doubled = np.concatenate([zeros, counts])
+            histogram['low'] -= histogram['width'] * len(counts)
+        else:
+            doubled = np.concatenate([counts, zeros])
+        counts = doubled.reshape(-1, 2).sum(axis=1)
+        histogram['width'] *= 2
+    histogram['counts'] = counts.tolist()
+
+
+def _numeric_state(
+    state: dict[str, Any] | None,
+    values: np.ndarray
+) -> dict[str, Any]:
+    values = np.asarray(values, dtype=np.float64)
+    present = values[~np.isnan(values)]
+    if state is None:
+        state = {
+            'kind': 'numeric', 'count': 0, 'nulls': 0, 'sum': 0.0,
+            'min': None, 'max': None, 'histogram': None,
+        }
+    state['nulls'] += int(len(values) - len(present))
+    if not len(present):
+        return state
+
+    low, high = float(present.min()), float(present.max())
+    state['count'] += int(len(present))
+    state['sum'] += float(present.sum())
+    state['min'] = low if state['min'] is None else min(state['min'], low)
+    state['max'] = high if state['max'] is None else max(state['max'], high)
+
+    histogram = state['histogram']
+    if histogram is None:
+        width = (high - low) / PROFILE_BINS or 1.0
+        histogram = {'low': low, 'width': width, 'counts': [0] * PROFILE_BINS}
+        state['histogram'] = histogram
+    _expand(histogram, low, high)
+
+    bins = np.floor((present - histogram['low']) / histogram['width']).astype(np.int64)
+    counts = np.asarray(histogram['counts'], dtype=np.int64)
+    counts += np.bincount(np.clip(bins, 0, PROFILE_BINS - 1), minlength=PROFILE_BINS)
+    histogram['counts'] = counts.tolist()
+    return state
+
+
+def _category_state(
+    state: dict[str, Any] | None,
+    values: pd.Series
+) -> dict[str, Any]:
+    if state is None:
+        state = {'kind': 'category', 'count': 0, 'nulls': 0, 'values': {}}
+    nulls = int(values.isna().sum())
+    state['nulls'] += nulls
+    state['count'] += len(values) - nulls
+    for value, count in values.value_counts(sort=False).items():
+        if count:
+            key = str(value)
+            state['values'][key] = state['values'].get(key, 0) + int(count)
+    return state
+
+
+def update_state(
+    state: dict[str, dict[str, Any]] | None,
+    df: pd.DataFrame
+) -> dict[str, dict[str, Any]]:
+    '''
+    Добавление строк к накопленной статистике столбцов. Каждая \
+        статистика складывается из статистик частей выборки, \
+        поэтому при дописывании строк обрабатываются только новые строки
+
+    Args:
+        state (dict[str, dict[str, Any]] | None): Статистика \
+            предыдущих строк, `None` - пустая
+        df (pd.DataFrame): Новые строки
+
+    Returns:
+        dict[str, dict[str, Any]]: Статистика по имени столбца
+    '''
+    state = state or {}
+    for name, values in df.items():
+        name = str(name)
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            state[name] = _numeric_state(state.get(name), values.to_numpy())
+        else:
+            state[name] = _category_state(state.get(name), values)
+    return state
+
+
+def _cdf(histogram: dict[str, Any]) -> tuple[np.ndarray, np.ndarray]:
+    counts = np.asarray(histogram['counts'], dtype=np.float64)
+    edges = histogram['low'] + histogram['width'] * np.arange(len(counts) + 1)
+    return edges, np.concatenate([[0.0], np.cumsum(counts)])
+
+
+def render_profile(state: dict[str, dict[str, Any]], rows: int) -> dict[str, Any]:
+    '''
+    Профиль выборки по накопленной статистике. Квантили и гистограмма \
+        восстанавливаются по внутренней гистограмме из `PROFILE_BINS` \
+        интервалов, погрешность не больше ширины интервала
+
+    Args:
+        state (dict[str, dict[str, Any]]): Статистика столбцов
+        rows (int): Количество строк выборки
+
+    Returns:
+        dict[str, Any]: Количество строк и статистика каждого столбца
+    '''
+    columns = {}
+    for name, column in state.items():
+        profile: dict[str, Any] = {
+            'kind': column['kind'],
+            'count': column['count'],
+            'nulls': column['nulls'],
+        }
+        if column['kind'] == 'category':
+            top = sorted(column['values'].items(), key=lambda item: -item[1])
+            profile['unique'] = len(column['values'])
+            profile['top'] = dict(top[:TOP_VALUES])
+        elif column['count']:
+            edges, cdf = _cdf(column['histogram'])
+            low, high = column['min'], column['max']
+            quantiles = np.clip(
+                np.interp(np.asarray(QUANTILES) * cdf[-1], cdf, edges), low, high
+            )
+            histogram_edges = np.linspace(low, high, HISTOGRAM_BINS + 1)
+            cumulative = np.interp(histogram_edges, edges, cdf)
+            # Доля интервала внутренней гистограммы за пределами [min, max]
+            # относится к крайним интервалам
+            cumulative[0], cumulative[-1] = 0.0, cdf[-1]
+            # Округляется накопленная сумма, чтобы сумма интервалов
+            # совпадала с количеством значений
+            histogram = np.diff(np.round(cumulative))
+            profile.update({
+                'min': low,
+                'max': high,
+                'mean': column['sum'] / column['count'],
+                'quantiles': {
+                    str(q): float(value) for q, value in zip(QUANTILES, quantiles)
+                },
+                'histogram': {
+                    'edges': histogram_edges.tolist(),
+                    'counts': histogram.astype(np.int64).tolist(),
+                },
+            })
+        columns[name] = profile
+    return {'rows': rows, 'columns': columns}
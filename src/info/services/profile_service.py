@@ -0,0 +1,118 @@
+import copy
+import asyncio
+import pandas as pd
+from typing import Any
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from base.service import BaseService
+from analytics.services.service import AnalyticsService
+from info.models.model import DatasetProfileModel
+from info.repositories.repository import DatasetProfileRepository
+from info.services.profile import fingerprints, render_profile, update_state
+
+
+class DatasetProfileService(BaseService[DatasetProfileModel]):
+    '''
+    Бизнес-логика профиля обучающей выборки: статистика столбцов, \
+        сохраненная по ETag выборки
+    '''
+
+    def __init__(self, db: AsyncSession, analytics_service: AnalyticsService):
+        '''
+        Бизнес-логика профиля обучающей выборки
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД
+            analytics_service (AnalyticsService): Сервис аналитики
+        '''
+        super().__init__(
+            DatasetProfileRepository(db),
+            DatasetProfileModel,
+            single_model_name='профиль выборки',
+            multiple_models_name='профили выборки'
+        )
+        self.analytics_service = analytics_service
+
+    async def get_profile(self) -> dict[str, Any]:
+        '''
+        Получение профиля текущей версии обучающей выборки. Профиль \
+            считается один раз на версию выборки, а если в выборку \
+            только дописаны строки - только по новым строкам
+
+        Returns:
+            dict[str, Any]: Количество строк и статистика каждого столбца: \
+                min, max, mean, квантили, количество пропусков и гистограмма
+        '''
+        dataset_etag = await self.analytics_service.get_dataset_etag()
+        profile = await self._get_cached(dataset_etag)
+        if profile is not None:
+            return profile.profile
+
+        dataset_cache = self.analytics_service.dataset_cache
+        async with dataset_cache.lock(f'{dataset_etag}/profile'):
+            profile = await self._get_cached(dataset_etag)
+            if profile is None:
+                df = await self.analytics_service.load_dataset(
+                    dataset_etag=dataset_etag
+                )
+                previous = await self.repository.scalar_first(
+                    select(DatasetProfileModel).order_by(DatasetProfileModel.id.desc())
+                )
+                profile = await asyncio.to_thread(
+                    self._build, dataset_etag, df, previous
+                )
+                await self.create(profile)
+                await self.evict_stale(dataset_etag)
+        return profile.profile
+
+    def _build(
+        self,
+        dataset_etag: str,
+        df: pd.DataFrame,
+        previous: DatasetProfileModel | None
+    ) -> DatasetProfileModel:
+        # Строки предыдущей версии, которые могли остаться без изменений
+        head_rows = previous.rows if previous and previous.rows <= len(df) else 0
+        head, full = fingerprints(df, head_rows)
+        appended = head_rows > 0 and head == previous.fingerprint  # type: ignore
+        if appended:
+            state = update_state(
+                copy.deepcopy(previous.state),  # type: ignore
+                df.iloc[head_rows:]
+            )
+        else:
+            state = update_state(None, df)
+        return DatasetProfileModel(
+            dataset_etag=dataset_etag,
+            rows=len(df),
+            fingerprint=full,
+            state=state,
+            profile={
+                **render_profile(state, len(df)),
+                'dataset_etag': dataset_etag,
+                'incremental': appended,
+            }
+        )
+
+    async def _get_cached(self, dataset_etag: str) -> DatasetProfileModel | None:
+        return await self.repository.scalar_first(
+            select(DatasetProfileModel).filter_by(dataset_etag=dataset_etag)
+        )
+
+    async def evict_stale(self, dataset_etag: str) -> None:
+        '''
+        Удаление профилей других версий обучающей выборки
+
+        Args:
+            dataset_etag (str): ETag актуальной обучающей выборки в MinIO
+        '''
+        try:
+            await self.repository.delete(
+                statement=delete(DatasetProfileModel).where(
+                    DatasetProfileModel.dataset_etag != dataset_etag
+                ),
+                filter={'dataset_etag': dataset_etag}
+            )
+        except Exception as e:
+            await self.repository.db.rollback()
+            raise e
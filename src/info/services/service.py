@@ -1,4 +1,9 @@
+import asyncio
 from info.schemas.schema import InfoSchema
+from info.services.formats import to_dict
+from info.services.train_data import (
+    TrainDataPage, build_sort_index, load_sort_index, read_page
+)
 from storage.services.minio_service import MinioService
 from storage.services.service import StorageService
 from analytics.services.service import AnalyticsService
@@ -18,25 +23,67 @@ class InfoService:
         self.target_attribute_file_name = 'temp/target_attribute.txt'
 
     async def get_train_data(self, limit: int = 100, offset: int = 0) -> dict:
-        df = (await self.analytics_service.load_csv(self.analytics_service.file_name))
-        df_slice = df.iloc[offset:offset + limit + 1]
-        return df_slice.to_dict()
+        page = await self.get_train_page(limit=limit, offset=offset)
+        return to_dict(page.frame)
+
+    async def get_train_page(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        columns: list[str] | None = None,
+        sort: str | None = None,
+        descending: bool = False,
+        filters: list[str] | None = None,
+        cursor: str | None = None
+    ) -> TrainDataPage:
+        '''
+        Страница обучающей выборки из колоночного кэша. \
+            Индекс столбца сортировки строится один раз на версию выборки
+
+        Args:
+            limit (int): Количество строк страницы
+            offset (int): Количество пропускаемых строк, если нет курсора
+            columns (list[str] | None): Возвращаемые столбцы, `None` - все
+            sort (str | None): Столбец сортировки, \
+                `None` - порядок строк в выборке
+            descending (bool): Сортировка по убыванию
+            filters (list[str] | None): Фильтры вида `столбец>=значение`
+            cursor (str | None): Курсор из предыдущей страницы
+
+        Returns:
+            TrainDataPage: Страница и курсор следующей страницы
+
+        Raises:
+            BadRequestError: Некорректные столбцы, фильтры или курсор
+        '''
+        cache = self.analytics_service.dataset_cache
+        dataset_etag = await self.analytics_service.cache_dataset()
+        if sort is not None and load_sort_index(cache, dataset_etag, sort) is None:
+            async with cache.lock(f'{dataset_etag}/index/{sort}'):
+                if load_sort_index(cache, dataset_etag, sort) is None:
+                    await asyncio.to_thread(build_sort_index, cache, dataset_etag, sort)
+        return await asyncio.to_thread(
+            read_page,
+            cache,
+            dataset_etag,
+            limit,
+            offset,
+            columns,
+            sort,
+            descending,
+            filters,
+            cursor
+        )
 
     async def get_subject_area(self) -> str:
         subject_area_file_name = self.subject_area_file_name.split('/')[-1]
-        await self.storage_service.download_file(
-            self.minio_service.get_file_url_for_private(subject_area_file_name),
-            self.subject_area_file_name
-        )
-        return await self.storage_service.read_file(self.subject_area_file_name)
+        content = await self.minio_service.get_object(subject_area_file_name)
+        return content.decode('utf-8')
 
     async def get_target_attribute(self) -> str:
         target_attribute_file_name = self.target_attribute_file_name.split('/')[-1]
-        await self.storage_service.download_file(
-            self.minio_service.get_file_url_for_private(target_attribute_file_name),
-            self.target_attribute_file_name
-        )
-        return await self.storage_service.read_file(self.target_attribute_file_name)
+        content = await self.minio_service.get_object(target_attribute_file_name)
+        return content.decode('utf-8')
 
     async def get_info(self) -> InfoSchema:
         return InfoSchema(
@@ -0,0 +1,404 @@
+import re
+import json
+import base64
+import hashlib
+import operator
+import numpy as np
+import pandas as pd
+from typing import Any, NamedTuple
+from analytics.services.dataset_cache import DatasetCache
+from exceptions.exception import BadRequestError
+
+FILTER_OPERATORS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '>=': operator.ge,
+    '>': operator.gt,
+    '<=': operator.le,
+    '<': operator.lt,
+}
+FILTER_PATTERN = re.compile(r'^(?P<column>[^<>=!]+?)(?P<op>==|!=|>=|<=|>|<)(?P<value>.+)$')
+# Количество строк, проверяемых фильтрами за один шаг обхода
+SCAN_CHUNK = 4096
+
+
+class Filter(NamedTuple):
+    '''
+    Условие на хранимые значения столбца: для категориальных \
+        столбцов - на коды категорий
+
+    Args:
+        column (str): Имя столбца
+        op (str): Оператор сравнения
+        value (float): Значение
+    '''
+    column: str
+    op: str
+    value: float
+
+
+class TrainDataPage(NamedTuple):
+    '''
+    Страница обучающей выборки
+
+    Args:
+        frame (pd.DataFrame): Строки страницы, индекс - номера \
+            строк в выборке
+        next_cursor (str | None): Курсор следующей страницы, \
+            `None` - страница последняя
+    '''
+    frame: pd.DataFrame
+    next_cursor: str | None
+
+
+def indexable(values: np.ndarray) -> bool:
+    return values.dtype.kind in 'biuf'
+
+
+def _category_filters(
+    column: str,
+    op: str,
+    value: str,
+    categories: list[Any]
+) -> list[Filter]:
+    # Категории упорядочены, поэтому сравнение значений
+    # сводится к сравнению кодов, код -1 - пропуск
+    ordered = np.asarray(categories)
+    try:
+        left = int(np.searchsorted(ordered, value, 'left'))
+        right = int(np.searchsorted(ordered, value, 'right'))
+    except TypeError:
+        raise BadRequestError(f'Недопустимое значение фильтра столбца {column}: {value}')
+    code = left if right > left else -2
+    if op in ('==', '!='):
+        return [Filter(column, op, code)]
+    if op in ('>=', '>'):
+        return [Filter(column, '>=', left if op == '>=' else right)]
+    return [
+        Filter(column, '>=', 0),
+        Filter(column, '<', left if op == '<' else right),
+    ]
+
+
+def parse_filters(
+    cache: DatasetCache,
+    dataset_etag: str,
+    filters: list[str]
+) -> list[Filter]:
+    '''
+    Разбор фильтров вида `столбец>=значение`
+
+    Args:
+        cache (DatasetCache): Колоночный кэш выборки
+        dataset_etag (str): ETag обучающей выборки в MinIO
+        filters (list[str]): Фильтры, операторы: ==, !=, >=, >, <=, <
+
+    Returns:
+        list[Filter]: Условия на хранимые значения столбцов
+
+    Raises:
+        BadRequestError: Некорректный фильтр или неиндексируемый столбец
+    '''
+    parsed = []
+    for text in filters:
+        match = FILTER_PATTERN.match(text)
+        if match is None:
+            raise BadRequestError(f'Некорректный фильтр: {text}')
+        column, op, value = match['column'].strip(), match['op'], match['value'].strip()
+        values, categories = column_values(cache, dataset_etag, column)
+        if categories is not None:
+            parsed.extend(_category_filters(column, op, value, categories))
+            continue
+        if values.dtype.kind == 'b':
+            number = float(value.lower() in ('true', '1'))
+        else:
+            try:
+                number = float(value)
+            except ValueError:
+                raise BadRequestError(f'Недопустимое значение фильтра столбца {column}: {value}')
+        parsed.append(Filter(column, op, number))
+    return parsed
+
+
+def column_values(
+    cache: DatasetCache,
+    dataset_etag: str,
+    column: str
+) -> tuple[np.ndarray, list[Any] | None]:
+    '''
+    Хранимый массив индексируемого столбца
+
+    Args:
+        cache (DatasetCache): Колоночный кэш выборки
+        dataset_etag (str): ETag обучающей выборки в MinIO
+        column (str): Имя столбца
+
+    Returns:
+        tuple[np.ndarray, list[Any] | None]: Массив и категории столбца
+
+    Raises:
+        BadRequestError: Столбца нет или по нему нельзя \
+            сортировать и фильтровать
+    '''
+    try:
+        values, categories = cache.load_column(dataset_etag, column)
+    except KeyError:
+        raise BadRequestError(f'Столбец не найден: {column}')
+    if not indexable(values):
+        raise BadRequestError(f'Столбец не индексируется: {column}')
+    return values, categories
+
+
+def build_sort_index(cache: DatasetCache, dataset_etag: str, column: str) -> None:
+    '''
+    Построение индекса сортировки столбца: номера строк в порядке \
+        возрастания значений и отсортированные значения. \
+        Равные значения упорядочены по номеру строки
+
+    Args:
+        cache (DatasetCache): Колоночный кэш выборки
+        dataset_etag (str): ETag обучающей выборки в MinIO
+        column (str): Имя столбца
+    '''
+    values, _ = column_values(cache, dataset_etag, column)
+    order = np.argsort(values, kind='stable')
+    name = _index_name(column)
+    cache.save_array(dataset_etag, f'{name}-sorted', np.asarray(values)[order])
+    # Номера строк пишутся последними и отмечают, что индекс готов
+    cache.save_array(dataset_etag, f'{name}-rows', order)
+
+
+def load_sort_index(
+    cache: DatasetCache,
+    dataset_etag: str,
+    column: str
+) -> tuple[np.ndarray, np.ndarray] | None:
+    '''
+    Чтение индекса сортировки столбца через memory map
+
+    Args:
+        cache (DatasetCache): Колоночный кэш выборки
+        dataset_etag (str): ETag обучающей выборки в MinIO
+        column (str): Имя столбца
+
+    Returns:
+        tuple[np.ndarray, np.ndarray] | None: Номера строк \
+            и отсортированные значения, `None` если индекс не построен
+    '''
+    name = _index_name(column)
+    rows = cache.load_array(dataset_etag, f'{name}-rows')
+    if rows is None:
+        return None
+    return rows, cache.load_array(dataset_etag, f'{name}-sorted')  # type: ignore
+
+
+def _index_name(column: str) -> str:
+    return f'index-{hashlib.blake2b(column.encode(), digest_size=8).hexdigest()}'
+
+
+def _query_key(sort: str | None, descending: bool, filters: list[Filter]) -> str:
+    query = json.dumps([sort, descending, filters])
+    return hashlib.blake2b(query.encode(), digest_size=8).hexdigest()
+
+
+def encode_cursor(key: str, value: float | None, row: int) -> str:
+    cursor = json.dumps({'key': key, 'value': value, 'row': row})
+    return base64.urlsafe_b64encode(cursor.encode()).decode()
+
+
+def decode_cursor(cursor: str, key: str) -> tuple[float | None, int]:
+    '''
+    Разбор курсора страницы
+
+    Args:
+        cursor (str): Курсор из предыдущей страницы
+        key (str): Ключ сортировки и фильтров текущего запроса
+
+    Returns:
+        tuple[float | None, int]: Значение столбца сортировки \
+            и номер последней строки предыдущей страницы
+
+    Raises:
+        BadRequestError: Курсор некорректен или получен \
+            для другой сортировки или других фильтров
+    '''
+    try:
+        decoded = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        value, row = decoded['value'], int(decoded['row'])
+    except (ValueError, TypeError, KeyError):
+        raise BadRequestError('Некорректный курсор')
+    if decoded.get('key') != key:
+        raise BadRequestError('Курсор получен для другой сортировки или других фильтров')
+    return value, row
+
+
+def _narrow(
+    sorted_values: np.ndarray,
+    filters: list[Filter],
+    start: int,
+    stop: int
+) -> tuple[int, int]:
+    # Условия на столбец сортировки сужают диапазон позиций индекса
+    # бинарным поиском, пропуски NaN отсортированы в конец
+    if filters and sorted_values.dtype.kind == 'f':
+        stop = min(stop, int(np.searchsorted(sorted_values, np.nan, 'left')))
+    for item in filters:
+        if item.op in ('>=', '=='):
+            start = max(start, int(np.searchsorted(sorted_values, item.value, 'left')))
+        if item.op == '>':
+            start = max(start, int(np.searchsorted(sorted_values, item.value, 'right')))
+        if item.op in ('<=', '=='):
+            stop = min(stop, int(np.searchsorted(sorted_values, item.value, 'right')))
+        if item.op == '<':
+            stop = min(stop, int(np.searchsorted(sorted_values, item.value, 'left')))
+    return start, max(start, stop)
+
+
+def _keyset_position(
+    rows: np.ndarray,
+    sorted_values: np.ndarray,
+    value: float,
+    row: int,
+    descending: bool
+) -> int:
+    # Позиция первой строки после (value, row) в порядке обхода
+    start = int(np.searchsorted(sorted_values, value, 'left'))
+    stop = int(np.searchsorted(sorted_values, value, 'right'))
+    if descending:
+        return start + int(np.searchsorted(rows[start:stop], row, 'left')) - 1
+    return start + int(np.searchsorted(rows[start:stop], row, 'right'))
+
+
+def _mask(
+    filters: list[Filter],
+    values: dict[str, np.ndarray],
+    row_ids: np.ndarray
+) -> np.ndarray:
+    mask = np.ones(len(row_ids), dtype=bool)
+    for item in filters:
+        mask &= FILTER_OPERATORS[item.op](values[item.column][row_ids], item.value)
+    return mask
+
+
+def read_page(
+    cache: DatasetCache,
+    dataset_etag: str,
+    limit: int,
+    offset: int = 0,
+    columns: list[str] | None = None,
+    sort: str | None = None,
+    descending: bool = False,
+    filters: list[str] | None = None,
+    cursor: str | None = None
+) -> TrainDataPage:
+    '''
+    Чтение страницы обучающей выборки из колоночного кэша. \
+        Строки читаются по номерам через memory map, порядок \
+        сортировки берется из индекса столбца, условия на столбец \
+        сортировки сводятся к бинарному поиску по индексу. \
+        С курсором следующая страница начинается сразу после \
+        последней строки предыдущей, без пропуска `offset` строк
+
+    Args:
+        cache (DatasetCache): Колоночный кэш выборки
+        dataset_etag (str): ETag обучающей выборки в MinIO
+        limit (int): Количество строк страницы
+        offset (int): Количество пропускаемых строк, если нет курсора
+        columns (list[str] | None): Возвращаемые столбцы, `None` - все
+        sort (str | None): Столбец сортировки, `None` - порядок строк в выборке
+        descending (bool): Сортировка по убыванию
+        filters (list[str] | None): Фильтры вида `столбец>=значение`
+        cursor (str | None): Курсор из предыдущей страницы
+
+    Returns:
+        TrainDataPage: Страница и курсор следующей страницы
+
+    Raises:
+        BadRequestError: Некорректные столбцы, фильтры или курсор, \
+            либо не построен индекс столбца сортировки
+    '''
+    total = cache.metadata(dataset_etag)['rows']
+    names = cache.columns(dataset_etag) if columns is None else columns
+    unknown = set(names) - set(cache.columns(dataset_etag))
+    if unknown:
+        raise BadRequestError(f'Столбцы не найдены: {", ".join(sorted(unknown))}')
+    parsed = parse_filters(cache, dataset_etag, filters or [])
+    key = _query_key(sort, descending, parsed)
+
+    if sort is None:
+        rows = sorted_values = None
+        start, stop = 0, total
+        residual = parsed
+    else:
+        index = load_sort_index(cache, dataset_etag, sort)
+        if index is None:
+            raise BadRequestError(f'Индекс столбца {sort} не построен')
+        rows, sorted_values = index
+        ranged = [item for item in parsed if item.column == sort and item.op != '!=']
+        residual = [item for item in parsed if item not in ranged]
+        start, stop = _narrow(sorted_values, ranged, 0, total)
+
+    # Позиция в порядке обхода: по убыванию позиции индекса идут с конца
+    if cursor is not None:
+        value, row = decode_cursor(cursor, key)
+        if sorted_values is None:
+            position = row - 1 if descending else row + 1
+        else:
+            position = _keyset_position(
+                rows, sorted_values, value, row, descending  # type: ignore
+            )
+        skip = 0
+    else:
+        position = stop - 1 if descending else start
+        skip = offset
+        if not residual:
+            position += -skip if descending else skip
+            skip = 0
+
+    filtered = {
+        item.column: cache.load_column(dataset_etag, item.column)[0]
+        for item in residual
+    }
+    step = -1 if descending else 1
+    found: list[np.ndarray] = []
+    count = 0
+    # Одна лишняя строка показывает, есть ли следующая страница
+    wanted = limit + 1
+    position = min(position, stop - 1) if descending else max(position, start)
+    while count < wanted and start <= position < stop:
+        end = position + step * SCAN_CHUNK
+        end = max(end, start - 1) if descending else min(end, stop)
+        positions = np.arange(position, end, step)
+        row_ids = positions if rows is None else np.asarray(rows[positions])
+        if residual:
+            row_ids = row_ids[_mask(residual, filtered, row_ids)]
+            if skip:
+                skipped = min(skip, len(row_ids))
+                row_ids = row_ids[skipped:]
+                skip -= skipped
+        row_ids = row_ids[:wanted - count]
+        found.append(row_ids)
+        count += len(row_ids)
+        position = end
+    row_ids = np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+    has_next = len(row_ids) > limit
+    row_ids = row_ids[:limit]
+
+    data = {}
+    for name in names:
+        values, categories = cache.load_column(dataset_etag, name)
+        values = np.asarray(values[row_ids])
+        if categories is not None:
+            values = pd.Categorical.from_codes(values, categories=categories)
+        data[name] = values
+    frame = pd.DataFrame(data, index=pd.Index(row_ids, name='row'), copy=False)
+
+    next_cursor = None
+    if has_next:
+        last = int(row_ids[-1])
+        value = None
+        if sort is not None:
+            sort_values, _ = cache.load_column(dataset_etag, sort)
+            value = sort_values[last].item()
+        next_cursor = encode_cursor(key, value, last)
+    return TrainDataPage(frame, next_cursor)
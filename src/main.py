@@ -1,4 +1,5 @@
 import uvicorn
+from contextlib import asynccontextmanager
 from fastapi.staticfiles import StaticFiles
 from fastapi import APIRouter, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -10,6 +11,11 @@ from auth.routers.router import router as auth_router
 from analytics.routers.router import router as analytics_router
 from webpages.pages import router as web_router
 from info.routers.router import router as info_router
+from dependencies.services import (
+    executor_service, minio_service, storage_service
+)
+from analytics.services.job_service import AnalyticsJobService
+from db.database import async_session
 from config import settings
 
 import debugpy
@@ -18,6 +24,18 @@ debugpy.listen(("0.0.0.0", 5678))
 # debugpy.wait_for_client()  # опционально
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await minio_service().start()
+    async with async_session() as session:
+        await AnalyticsJobService(session).fail_unfinished()
+        await session.commit()
+    yield
+    executor_service().shutdown()
+    await minio_service().close()
+    await storage_service().close()
+
+
 def get_application(
     api_routers: list[APIRouter],
     other_routers: list[APIRouter] = []
@@ -33,7 +51,7 @@ def get_application(
     Returns:
         FastAPI: объект класса `FastAPI` с настроенными роутерами
     '''
-    app = set_exceptions_handlers(FastAPI())
+    app = set_exceptions_handlers(FastAPI(lifespan=lifespan))
 
     origins = [
         # Локальные адреса для разработки
@@ -1,49 +1,83 @@
-import ssl
 import json
 import uuid
 import asyncio
+import aiohttp
 from io import BytesIO
-from minio import Minio
 from config import settings
 from datetime import timedelta
-from minio.error import S3Error
 from fastapi import File, UploadFile
-from urllib3 import PoolManager, disable_warnings
+from typing import Awaitable, BinaryIO, Callable
 
 from storage.services.service import StorageService
+from storage.services.s3_client import ObjectStat, S3Client, S3Error
 from attachment.schemas.schema import AttachmentMinioSchema
-from exceptions.exception import FileIsTooLargeError, WasNotCreatedError
+from exceptions.exception import (
+    FileIsTooLargeError, NotFoundError, WasNotCreatedError
+)
 
 
 class MinioService:
+    '''
+    Сервис MinIO. Один объект на процесс приложения: запросы идут \
+        через асинхронный клиент S3 поверх общей сессии сервиса файлов, \
+        существование и политика bucket проверяются при запуске \
+        и обновляются в фоне
+    '''
+
+    # Размер фрагмента чтения загружаемого файла
+    READ_CHUNK_SIZE = 256 * 1024
+    # Префикс объектов, закрытых от анонимного чтения:
+    # сериализованные модели загружаются через pickle
+    PRIVATE_PREFIX = 'models/'
+
     def __init__(
         self,
         bucket_name: str,
         endpoint: str,
         access_key: str,
         secret_key: str,
-        storage_service: StorageService
+        storage_service: StorageService,
+        region: str = 'us-east-1',
+        retries: int = 3,
+        refresh_interval: float = 300.0,
+        part_size: int = 5 * 1024 * 1024,
+        parallel_parts: int = 1
     ):
-        self.storage_service = storage_service
-
-        context = ssl.create_default_context()
-        context.options |= ssl.OP_NO_SSLv3 | ssl.OP_NO_SSLv2
+        '''
+        Сервис MinIO. Конструктор не обращается к MinIO, \
+            bucket проверяется в `start`
 
-        disable_warnings()
+        Args:
+            bucket_name (str): Имя bucket
+            endpoint (str): Адрес MinIO
+            access_key (str): Ключ доступа
+            secret_key (str): Секретный ключ
+            storage_service (StorageService): Сервис файлов \
+                с общим пулом соединений
+            region (str): Регион подписи запросов
+            retries (int): Количество повторов при ошибках соединения \
+                и ответах 5xx
+            refresh_interval (float): Период фоновой проверки bucket, секунд
+            part_size (int): Размер части составной загрузки, \
+                не меньше 5 МиБ
+            parallel_parts (int): Количество одновременно загружаемых \
+                частей. Загрузка держит в памяти до `part_size * \
+                parallel_parts` байт
+        '''
+        self.storage_service = storage_service
 
-        self._client = Minio(
+        self._client = S3Client(
+            storage_service,
             endpoint,
             access_key=access_key,
             secret_key=secret_key,
+            region=region,
             secure=False,
-            http_client=PoolManager(
-                cert_reqs="CERT_NONE"
-            )
+            retries=retries
         )
 
         self._bucket_name = bucket_name
-
-        __policy = json.dumps(
+        self._policy = json.dumps(
             {
                 "Version": "2012-10-17",
                 "Statement": [
@@ -52,25 +86,89 @@ class MinioService:
                         "Principal": "*",
                         "Action": ["s3:GetObject"],
                         "Resource": [f"arn:aws:s3:::{self._bucket_name}/*"]
+                    },
+                    {
+                        # Политика bucket в MinIO применяется к анонимным
+                        # запросам, доступ по ключу приложения не меняется
+                        "Effect": "Deny",
+                        "Principal": "*",
+                        "Action": ["s3:GetObject"],
+                        "Resource": [
+                            f"arn:aws:s3:::{self._bucket_name}/{self.PRIVATE_PREFIX}*"
+                        ]
                     }
                 ]
             }
         )
-        self.client.set_bucket_policy(self._bucket_name, __policy)
+        self._refresh_interval = refresh_interval
+        self.part_size = part_size
+        self.parallel_parts = parallel_parts
+        self._bucket_ready = False
+        self._bucket_lock = asyncio.Lock()
+        self._refresh_task: asyncio.Task | None = None
 
-    def __ensure_bucket_exists(self):
+    async def __ensure_bucket_exists(self):
         '''
         Проверка существования MinIO Bucket. \
-            В случае, если не существует, создает его
+            В случае, если не существует, создает его. \
+            Устанавливает политику публичного чтения объектов, \
+            кроме объектов с префиксом `PRIVATE_PREFIX`
+
+        Raises:
+            S3Error: Ошибка MinIO
+        '''
+        if not await self.client.bucket_exists(self.bucket_name):
+            await self.client.make_bucket(self.bucket_name)
+        await self.client.set_bucket_policy(self.bucket_name, self._policy)
+
+    async def ensure_bucket(self) -> None:
+        '''
+        Проверка bucket, если она еще не выполнена или \
+            последняя фоновая проверка завершилась ошибкой
 
         Raises:
             S3Error: Ошибка MinIO
         '''
+        if self._bucket_ready:
+            return
+        async with self._bucket_lock:
+            if not self._bucket_ready:
+                await self.__ensure_bucket_exists()
+                self._bucket_ready = True
+
+    async def start(self) -> None:
+        '''
+        Проверка bucket при запуске приложения и запуск фоновой проверки. \
+            Если MinIO недоступен, bucket проверяется при первом обращении
+        '''
         try:
-            if not self.client.bucket_exists(self.bucket_name):
-                self.client.make_bucket(self.bucket_name)
-        except S3Error as e:
-            raise e
+            await self.ensure_bucket()
+        except (S3Error, aiohttp.ClientError, asyncio.TimeoutError):
+            pass
+        self._refresh_task = asyncio.create_task(self._refresh_bucket())
+
+    async def close(self) -> None:
+        '''
+        Остановка фоновой проверки bucket. Пул соединений \
+            закрывается вместе с сервисом файлов
+        '''
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    async def _refresh_bucket(self) -> None:
+        while True:
+            await asyncio.sleep(self._refresh_interval)
+            try:
+                await self.__ensure_bucket_exists()
+                self._bucket_ready = True
+            except (S3Error, aiohttp.ClientError, asyncio.TimeoutError):
+                # Следующий запрос проверит bucket сам
+                self._bucket_ready = False
 
     async def upload_file(
         self,
@@ -95,7 +193,7 @@ class MinioService:
             WasNotCreatedError: Не удалось загрузить файл в MinIO
             Exception: Прочие ошибки, связаныне с MinIO
         '''
-        self.__ensure_bucket_exists()
+        await self.ensure_bucket()
 
         try:
             full_file_name = f'{uuid.uuid4()}-{file_name}.{file_ext}'
@@ -111,13 +209,10 @@ class MinioService:
                     f"{settings.attachment.max_size / 1024} Кбайт"
                 )
             else:
-                await asyncio.to_thread(
-                    self.client.put_object,
+                await self.client.put_object(
                     self.bucket_name,
                     full_file_name,
-                    file,
-                    file_size,
-                    # content_type=str(file.content_type)
+                    file.getvalue(),
                 )
 
                 return AttachmentMinioSchema(
@@ -135,7 +230,10 @@ class MinioService:
         file: UploadFile = File(...)
     ) -> AttachmentMinioSchema:
         '''
-        Загрузка файла из запроса в MinIO
+        Загрузка файла из запроса в MinIO. К этому моменту Starlette \
+            уже принял тело запроса целиком во временный файл, поэтому \
+            лимит размера не сокращает прием файла, а только не дает \
+            загрузить его в MinIO
 
         Args:
             file (UploadFile): Загружаемый файл
@@ -152,15 +250,316 @@ class MinioService:
         full_file_name = file.filename or 'img.png'
         file_ext = full_file_name.split('.')[-1]
         file_name = full_file_name.replace(file_ext, '')
-        __file = BytesIO(await file.read())
-        return await self.upload_file(
-            __file,
-            file_name,
-            file_ext
+        max_size = settings.attachment.max_size
+        too_large = FileIsTooLargeError(
+            "Максимальный размер файла - "
+            f"{max_size / 1024} Кбайт"
+        )
+        # Файл уже принят, и его размер известен без чтения
+        if file.size is not None and file.size > max_size:
+            raise too_large
+
+        object_name = f'{uuid.uuid4()}-{file_name}.{file_ext}'
+        try:
+            file_size = await self.put_stream(
+                object_name,
+                file.read,
+                file.content_type or 'application/octet-stream',
+                max_size
+            )
+        except FileIsTooLargeError:
+            raise too_large
+        return AttachmentMinioSchema(
+            minio_public_file_url=self.get_file_url_for_public(object_name),
+            minio_private_file_url=self.get_file_url_for_private(object_name),
+            file_name=str(file_name),
+            file_extension=file_ext,
+            file_size=file_size
         )
 
+    async def _read_part(
+        self,
+        read: Callable[[int], Awaitable[bytes]],
+        size: int,
+        limit: int | None
+    ) -> bytes:
+        # Часть читается фрагментами, чтобы лимит размера проверялся
+        # по мере поступления данных, а не после чтения всей части
+        part = bytearray()
+        while len(part) < size:
+            chunk = await read(min(self.READ_CHUNK_SIZE, size - len(part)))
+            if not chunk:
+                break
+            part += chunk
+            if limit is not None and len(part) > limit:
+                raise FileIsTooLargeError()
+        return bytes(part)
+
+    async def put_stream(
+        self,
+        object_name: str,
+        read: Callable[[int], Awaitable[bytes]],
+        content_type: str = 'application/octet-stream',
+        max_size: int | None = None
+    ) -> int:
+        '''
+        Потоковая загрузка объекта в MinIO. Объект меньше одной части \
+            загружается одним запросом, больший - составной загрузкой, \
+            до `parallel_parts` частей одновременно. В памяти находятся \
+            только загружаемые части, не больше `parallel_parts`, \
+            а загрузка прерывается, как только прочитано больше \
+            `max_size` байт
+
+        Args:
+            object_name (str): Полное имя объекта
+            read (Callable[[int], Awaitable[bytes]]): Чтение не больше \
+                заданного количества байт, пустой ответ - конец данных
+            content_type (str): MIME-тип объекта
+            max_size (int | None): Наибольший размер объекта, \
+                `None` - без ограничения
+
+        Returns:
+            int: Размер загруженного объекта
+
+        Raises:
+            FileIsTooLargeError: Размер объекта превышает `max_size`
+            WasNotCreatedError: Не удалось загрузить объект в MinIO
+        '''
+        await self.ensure_bucket()
+
+        part = await self._read_part(read, self.part_size, max_size)
+        if len(part) < self.part_size:
+            await self.put_object(object_name, part, content_type)
+            return len(part)
+
+        try:
+            upload_id = await self.client.create_multipart_upload(
+                self.bucket_name, object_name, content_type
+            )
+        except S3Error as exc:
+            raise WasNotCreatedError(f'MinIO: {exc}')
+
+        size = 0
+        number = 0
+        uploads: set[asyncio.Task[tuple[int, str]]] = set()
+        parts: list[tuple[int, str]] = []
+
+        async def upload(number: int, data: bytes) -> tuple[int, str]:
+            etag = await self.client.upload_part(
+                self.bucket_name, object_name, upload_id, number, data
+            )
+            return number, etag
+
+        try:
+            while part:
+                number += 1
+                size += len(part)
+                uploads.add(asyncio.create_task(upload(number, part)))
+                # Часть остается в памяти только до завершения ее загрузки
+                part = b''
+                if len(uploads) >= self.parallel_parts:
+                    done, uploads = await asyncio.wait(
+                        uploads, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    parts.extend(task.result() for task in done)
+                limit = None if max_size is None else max_size - size
+                part = await self._read_part(read, self.part_size, limit)
+            if uploads:
+                parts.extend(await asyncio.gather(*uploads))
+            await self.client.complete_multipart_upload(
+                self.bucket_name, object_name, upload_id, parts
+            )
+        except BaseException as exc:
+            for task in uploads:
+                task.cancel()
+            await asyncio.gather(*uploads, return_exceptions=True)
+            try:
+                await self.client.abort_multipart_upload(
+                    self.bucket_name, object_name, upload_id
+                )
+            except (S3Error, aiohttp.ClientError):
+                pass
+            if isinstance(exc, S3Error):
+                raise WasNotCreatedError(f'MinIO: {exc}')
+            raise
+        return size
+
+    async def put_object(
+        self,
+        object_name: str,
+        data: bytes,
+        content_type: str = 'application/octet-stream'
+    ) -> None:
+        '''
+        Загрузка служебного объекта в MinIO под заданным именем \
+            без проверки размера
+
+        Args:
+            object_name (str): Полное имя объекта
+            data (bytes): Содержимое объекта
+            content_type (str): MIME-тип объекта
+
+        Raises:
+            WasNotCreatedError: Не удалось загрузить объект в MinIO
+        '''
+        await self.ensure_bucket()
+        try:
+            await self.client.put_object(
+                self.bucket_name, object_name, data, content_type
+            )
+        except S3Error as exc:
+            raise WasNotCreatedError(f'MinIO: {exc}')
+
+    async def get_object(self, object_name: str) -> bytes:
+        '''
+        Получение содержимого объекта из MinIO
+
+        Args:
+            object_name (str): Полное имя объекта
+
+        Returns:
+            bytes: Содержимое объекта
+
+        Raises:
+            NotFoundError: Объект не найден в MinIO
+            S3Error: Другая ошибка MinIO, например нет доступа
+        '''
+        try:
+            return await self.client.get_object(self.bucket_name, object_name)
+        except S3Error as exc:
+            if exc.status == 404:
+                raise NotFoundError(f'MinIO: {exc}')
+            raise
+
+    async def read_object[T](
+        self,
+        object_name: str,
+        read: Callable[[BinaryIO], T]
+    ) -> T:
+        '''
+        Чтение объекта по мере загрузки из MinIO, без записи на диск
+
+        Args:
+            object_name (str): Полное имя объекта
+            read (Callable[[BinaryIO], T]): Синхронная функция чтения, \
+                например `pd.read_csv`
+
+        Returns:
+            T: Результат функции `read`
+
+        Raises:
+            NotFoundError: Объект не найден в MinIO
+            S3Error: Другая ошибка MinIO, например нет доступа
+        '''
+        try:
+            return await self.storage_service.read_response_stream(
+                lambda: self.client.open('GET', self.bucket_name, object_name),
+                read
+            )
+        except S3Error as exc:
+            if exc.status == 404:
+                raise NotFoundError(f'MinIO: {exc}')
+            raise
+
+    async def stat_object(self, object_name: str) -> ObjectStat:
+        '''
+        Сведения об объекте в MinIO без загрузки содержимого
+
+        Args:
+            object_name (str): Полное имя объекта
+
+        Returns:
+            ObjectStat: ETag, размер и MIME-тип объекта
+
+        Raises:
+            NotFoundError: Объект не найден в MinIO
+            S3Error: Другая ошибка MinIO, например нет доступа
+        '''
+        try:
+            return await self.client.head_object(self.bucket_name, object_name)
+        except S3Error as exc:
+            if exc.status == 404:
+                raise NotFoundError(f'MinIO: {exc}')
+            raise
+
+    async def list_objects(self, prefix: str = '') -> list[ObjectStat]:
+        '''
+        Список объектов MinIO с заданным префиксом имени
+
+        Args:
+            prefix (str): Префикс имени объекта
+
+        Returns:
+            list[ObjectStat]: Объекты в порядке имен
+        '''
+        return await self.client.list_objects(self.bucket_name, prefix)
+
+    async def delete_object(self, object_name: str) -> None:
+        '''
+        Удаление объекта из MinIO. Удаление отсутствующего \
+            объекта не считается ошибкой
+
+        Args:
+            object_name (str): Полное имя объекта
+        '''
+        await self.client.delete_object(self.bucket_name, object_name)
+
+    def presigned_url(
+        self,
+        object_name: str,
+        expires: timedelta = timedelta(hours=1)
+    ) -> str:
+        '''
+        Подписанный URL объекта для чтения без ключей доступа, \
+            например из процесса обучения
+
+        Args:
+            object_name (str): Полное имя объекта
+            expires (timedelta): Срок действия URL
+
+        Returns:
+            str: Подписанный URL объекта
+        '''
+        return self.client.presign(self.bucket_name, object_name, expires)
+
+    async def object_exists(self, object_name: str) -> bool:
+        '''
+        Проверка существования объекта в MinIO
+
+        Args:
+            object_name (str): Полное имя объекта
+
+        Returns:
+            bool: Объект существует
+
+        Raises:
+            S3Error: Ошибка MinIO, кроме отсутствия объекта
+        '''
+        try:
+            await self.get_file_etag(object_name)
+        except NotFoundError:
+            return False
+        return True
+
+    async def get_file_etag(self, file_name: str) -> str:
+        '''
+        Получение ETag файла в MinIO
+
+        Args:
+            file_name (str): Полное имя файла
+
+        Returns:
+            str: ETag файла, меняется при каждом изменении содержимого
+
+        Raises:
+            NotFoundError: Файл не найден в MinIO
+            S3Error: Другая ошибка MinIO, например нет доступа
+        '''
+        stat = await self.stat_object(file_name)
+        return stat.etag
+
     @property
-    def client(self) -> Minio:
+    def client(self) -> S3Client:
         return self._client
 
     @property
@@ -181,3 +580,15 @@ class MinioService:
 
     def get_file_url_for_public(self, file_name: str) -> str:
         return f'http://{settings.minio.ip_address}:{settings.minio.port}/{settings.minio.bucket_name}/{file_name}'
+
+    def get_object_name(self, file_url: str) -> str:
+        '''
+        Получение имени объекта по URL файла в MinIO
+
+        Args:
+            file_url (str): Публичный или внутренний URL файла
+
+        Returns:
+            str: Полное имя объекта
+        '''
+        return file_url.split(f'/{self.bucket_name}/', 1)[1]
@@ -0,0 +1,551 @@
+import hmac
+import asyncio
+import hashlib
+import aiohttp
+from yarl import URL
+from typing import AsyncIterator, Mapping, NamedTuple
+from urllib.parse import quote
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from xml.etree import ElementTree
+
+from storage.services.service import StorageService
+
+ALGORITHM = 'AWS4-HMAC-SHA256'
+UNSIGNED_PAYLOAD = 'UNSIGNED-PAYLOAD'
+EMPTY_PAYLOAD = hashlib.sha256(b'').hexdigest()
+S3_NAMESPACE = '{http://s3.amazonaws.com/doc/2006-03-01/}'
+
+
+class S3Error(Exception):
+    '''
+    Ошибка S3 API: код ответа и код ошибки из XML-ответа
+    '''
+
+    def __init__(self, status: int, code: str, message: str, resource: str) -> None:
+        super().__init__(f'{code}: {message} ({resource})')
+        self.status = status
+        self.code = code
+        self.message = message
+        self.resource = resource
+
+
+class ObjectStat(NamedTuple):
+    '''
+    Сведения об объекте
+
+    Args:
+        name (str): Имя объекта
+        etag (str): ETag объекта без кавычек
+        size (int): Размер объекта, байт
+        content_type (str | None): MIME-тип объекта
+    '''
+    name: str
+    etag: str
+    size: int
+    content_type: str | None = None
+
+
+def _quote(value: str, safe: str = '-_.~') -> str:
+    return quote(value, safe=safe)
+
+
+def _hmac(key: bytes, message: str) -> bytes:
+    return hmac.new(key, message.encode(), hashlib.sha256).digest()
+
+
+class S3Client:
+    '''
+    Асинхронный клиент S3 API. Запросы подписываются AWS Signature V4 \
+        и отправляются через общую сессию aiohttp сервиса файлов, \
+        поэтому количество одновременных запросов ограничено \
+        пулом соединений, а не пулом потоков
+    '''
+
+    def __init__(
+        self,
+        storage_service: StorageService,
+        endpoint: str,
+        access_key: str,
+        secret_key: str,
+        region: str = 'us-east-1',
+        secure: bool = False,
+        retries: int = 3
+    ) -> None:
+        '''
+        Асинхронный клиент S3 API
+
+        Args:
+            storage_service (StorageService): Сервис файлов с общей сессией
+            endpoint (str): Адрес S3 в виде `host:port`
+            access_key (str): Ключ доступа
+            secret_key (str): Секретный ключ
+            region (str): Регион подписи
+            secure (bool): HTTPS вместо HTTP
+            retries (int): Количество повторов при ошибках соединения \
+                и ответах 5xx
+        '''
+        self.storage_service = storage_service
+        self.host = endpoint
+        self.base_url = f'{"https" if secure else "http"}://{endpoint}'
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.retries = retries
+        self._signing_keys: dict[str, bytes] = {}
+
+    def _signing_key(self, date: str) -> bytes:
+        # Ключ подписи зависит только от даты, поэтому считается раз в сутки
+        key = self._signing_keys.get(date)
+        if key is None:
+            key = _hmac(f'AWS4{self.secret_key}'.encode(), date)
+            for part in (self.region, 's3', 'aws4_request'):
+                key = _hmac(key, part)
+            self._signing_keys = {date: key}
+        return key
+
+    def _path(self, bucket: str, object_name: str = '') -> str:
+        path = f'/{bucket}'
+        if object_name:
+            path += '/' + _quote(object_name, safe='/-_.~')
+        return path
+
+    def _signature(
+        self,
+        method: str,
+        path: str,
+        query: str,
+        headers: dict[str, str],
+        payload_hash: str,
+        now: datetime
+    ) -> tuple[str, str]:
+        names = sorted(headers)
+        canonical_request = '\n'.join([
+            method,
+            path,
+            query,
+            ''.join(f'{name}:{headers[name].strip()}\n' for name in names),
+            ';'.join(names),
+            payload_hash,
+        ])
+        date = now.strftime('%Y%m%d')
+        scope = f'{date}/{self.region}/s3/aws4_request'
+        string_to_sign = '\n'.join([
+            ALGORITHM,
+            now.strftime('%Y%m%dT%H%M%SZ'),
+            scope,
+            hashlib.sha256(canonical_request.encode()).hexdigest(),
+        ])
+        signature = hmac.new(
+            self._signing_key(date), string_to_sign.encode(), hashlib.sha256
+        ).hexdigest()
+        return scope, signature
+
+    def _query(self, query: dict[str, str]) -> str:
+        return '&'.join(
+            f'{_quote(name)}={_quote(value)}'
+            for name, value in sorted(query.items())
+        )
+
+    def _signed_request(
+        self,
+        method: str,
+        bucket: str,
+        object_name: str = '',
+        query: dict[str, str] | None = None,
+        body: bytes = b'',
+        headers: dict[str, str] | None = None
+    ) -> tuple[URL, dict[str, str]]:
+        path = self._path(bucket, object_name)
+        canonical_query = self._query(query or {})
+        now = datetime.now(timezone.utc)
+        payload_hash = hashlib.sha256(body).hexdigest() if body else EMPTY_PAYLOAD
+        signed = {
+            'host': self.host,
+            'x-amz-date': now.strftime('%Y%m%dT%H%M%SZ'),
+            'x-amz-content-sha256': payload_hash,
+        }
+        scope, signature = self._signature(
+            method, path, canonical_query, signed, payload_hash, now
+        )
+        request_headers = {
+            **(headers or {}),
+            **signed,
+            'authorization': (
+                f'{ALGORITHM} Credential={self.access_key}/{scope}, '
+                f'SignedHeaders={";".join(sorted(signed))}, '
+                f'Signature={signature}'
+            ),
+        }
+        url = f'{self.base_url}{path}'
+        if canonical_query:
+            url += f'?{canonical_query}'
+        return URL(url, encoded=True), request_headers
+
+    def presign(
+        self,
+        bucket: str,
+        object_name: str,
+        expires: timedelta = timedelta(hours=1),
+        method: str = 'GET'
+    ) -> str:
+        '''
+        Подписанный URL объекта, по которому объект доступен \
+            без ключей до истечения срока
+
+        Args:
+            bucket (str): Имя bucket
+            object_name (str): Имя объекта
+            expires (timedelta): Срок действия URL, не больше 7 дней
+            method (str): HTTP-метод запроса
+
+        Returns:
+            str: Подписанный URL
+        '''
+        path = self._path(bucket, object_name)
+        now = datetime.now(timezone.utc)
+        date = now.strftime('%Y%m%d')
+        query = {
+            'X-Amz-Algorithm': ALGORITHM,
+            'X-Amz-Credential': (
+                f'{self.access_key}/{date}/{self.region}/s3/aws4_request'
+            ),
+            'X-Amz-Date': now.strftime('%Y%m%dT%H%M%SZ'),
+            'X-Amz-Expires': str(int(expires.total_seconds())),
+            'X-Amz-SignedHeaders': 'host',
+        }
+        canonical_query = self._query(query)
+        _, signature = self._signature(
+            method, path, canonical_query, {'host': self.host}, UNSIGNED_PAYLOAD, now
+        )
+        return f'{self.base_url}{path}?{canonical_query}&X-Amz-Signature={signature}'
+
+    async def _error(self, response: aiohttp.ClientResponse, resource: str) -> S3Error:
+        code, message = response.reason or str(response.status), ''
+        body = await response.read()
+        if body:
+            try:
+                root = ElementTree.fromstring(body)
+                code = root.findtext('{*}Code') or code
+                message = root.findtext('{*}Message') or ''
+            except ElementTree.ParseError:
+                message = body.decode(errors='replace')
+        return S3Error(response.status, code, message, resource)
+
+    @asynccontextmanager
+    async def open(
+        self,
+        method: str,
+        bucket: str,
+        object_name: str = '',
+        query: dict[str, str] | None = None,
+        body: bytes = b'',
+        headers: dict[str, str] | None = None
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        '''
+        Подписанный запрос с потоковым чтением ответа. \
+            Ошибки соединения и ответы 5xx повторяются \
+            с экспоненциальной задержкой
+
+        Args:
+            method (str): HTTP-метод
+            bucket (str): Имя bucket
+            object_name (str): Имя объекта, пустое - запрос к bucket
+            query (dict[str, str] | None): Параметры запроса
+            body (bytes): Тело запроса
+            headers (dict[str, str] | None): Дополнительные заголовки
+
+        Returns:
+            AsyncIterator[aiohttp.ClientResponse]: Успешный ответ
+
+        Raises:
+            S3Error: S3 вернул ошибку
+            aiohttp.ClientError: Ошибка соединения после всех повторов
+        '''
+        resource = self._path(bucket, object_name)
+        for attempt in range(self.retries + 1):
+            # Подпись содержит время, поэтому пересчитывается при повторе
+            url, request_headers = self._signed_request(
+                method, bucket, object_name, query, body, headers
+            )
+            try:
+                response = await self.storage_service.session.request(
+                    method, url, data=body or None, headers=request_headers
+                )
+            except aiohttp.ClientConnectionError:
+                if attempt == self.retries:
+                    raise
+                await asyncio.sleep(0.2 * 2 ** attempt)
+                continue
+            if response.status >= 500 and attempt < self.retries:
+                response.release()
+                await asyncio.sleep(0.2 * 2 ** attempt)
+                continue
+            try:
+                if response.status >= 300:
+                    raise await self._error(response, resource)
+                yield response
+            finally:
+                response.release()
+            return
+
+    async def request(
+        self,
+        method: str,
+        bucket: str,
+        object_name: str = '',
+        query: dict[str, str] | None = None,
+        body: bytes = b'',
+        headers: dict[str, str] | None = None
+    ) -> tuple[Mapping[str, str], bytes]:
+        '''
+        Подписанный запрос с чтением ответа целиком
+
+        Args:
+            method (str): HTTP-метод
+            bucket (str): Имя bucket
+            object_name (str): Имя объекта, пустое - запрос к bucket
+            query (dict[str, str] | None): Параметры запроса
+            body (bytes): Тело запроса
+            headers (dict[str, str] | None): Дополнительные заголовки
+
+        Returns:
+            tuple[Mapping[str, str], bytes]: Заголовки \
+                без учета регистра и тело ответа
+
+        Raises:
+            S3Error: S3 вернул ошибку
+        '''
+        async with self.open(method, bucket, object_name, query, body, headers) as response:
+            return response.headers.copy(), await response.read()
+
+    async def bucket_exists(self, bucket: str) -> bool:
+        try:
+            await self.request('HEAD', bucket)
+        except S3Error as exc:
+            if exc.status == 404:
+                return False
+            raise
+        return True
+
+    async def make_bucket(self, bucket: str) -> None:
+        await self.request('PUT', bucket)
+
+    async def set_bucket_policy(self, bucket: str, policy: str) -> None:
+        await self.request(
+            'PUT',
+            bucket,
+            query={'policy': ''},
+            body=policy.encode(),
+            headers={'content-type': 'application/json'}
+        )
+
+    async def put_object(
+        self,
+        bucket: str,
+        object_name: str,
+        data: bytes,
+        content_type: str = 'application/octet-stream'
+    ) -> str:
+        '''
+        Загрузка объекта одним запросом
+
+        Args:
+            bucket (str): Имя bucket
+            object_name (str): Имя объекта
+            data (bytes): Содержимое объекта
+            content_type (str): MIME-тип объекта
+
+        Returns:
+            str: ETag загруженного объекта
+
+        Raises:
+            S3Error: S3 вернул ошибку
+        '''
+        headers, _ = await self.request(
+            'PUT',
+            bucket,
+            object_name,
+            body=bytes(data),
+            headers={'content-type': content_type}
+        )
+        return headers.get('ETag', '').strip('"')
+
+    async def get_object(self, bucket: str, object_name: str) -> bytes:
+        _, body = await self.request('GET', bucket, object_name)
+        return body
+
+    async def head_object(self, bucket: str, object_name: str) -> ObjectStat:
+        '''
+        Сведения об объекте без загрузки содержимого
+
+        Args:
+            bucket (str): Имя bucket
+            object_name (str): Имя объекта
+
+        Returns:
+            ObjectStat: Сведения об объекте
+
+        Raises:
+            S3Error: Объект не найден или S3 вернул ошибку
+        '''
+        headers, _ = await self.request('HEAD', bucket, object_name)
+        return ObjectStat(
+            name=object_name,
+            etag=headers.get('ETag', '').strip('"'),
+            size=int(headers.get('Content-Length', 0)),
+            content_type=headers.get('Content-Type'),
+        )
+
+    async def list_objects(self, bucket: str, prefix: str = '') -> list[ObjectStat]:
+        '''
+        Список объектов bucket с заданным префиксом имени. \
+            Страницы ListObjectsV2 запрашиваются последовательно
+
+        Args:
+            bucket (str): Имя bucket
+            prefix (str): Префикс имени объекта
+
+        Returns:
+            list[ObjectStat]: Объекты в порядке имен
+
+        Raises:
+            S3Error: S3 вернул ошибку
+        '''
+        objects = []
+        query = {'list-type': '2', 'prefix': prefix}
+        while True:
+            _, body = await self.request('GET', bucket, query=query)
+            root = ElementTree.fromstring(body)
+            for item in root.iter(f'{S3_NAMESPACE}Contents'):
+                objects.append(ObjectStat(
+                    name=item.findtext(f'{S3_NAMESPACE}Key', ''),
+                    etag=item.findtext(f'{S3_NAMESPACE}ETag', '').strip('"'),
+                    size=int(item.findtext(f'{S3_NAMESPACE}Size', '0')),
+                ))
+            token = root.findtext(f'{S3_NAMESPACE}NextContinuationToken')
+            if root.findtext(f'{S3_NAMESPACE}IsTruncated') != 'true' or not token:
+                return objects
+            query = {**query, 'continuation-token': token}
+
+    async def delete_object(self, bucket: str, object_name: str) -> None:
+        await self.request('DELETE', bucket, object_name)
+
+    async def create_multipart_upload(
+        self,
+        bucket: str,
+        object_name: str,
+        content_type: str = 'application/octet-stream'
+    ) -> str:
+        '''
+        Начало составной загрузки объекта
+
+        Args:
+            bucket (str): Имя bucket
+            object_name (str): Имя объекта
+            content_type (str): MIME-тип объекта
+
+        Returns:
+            str: Идентификатор составной загрузки
+
+        Raises:
+            S3Error: S3 вернул ошибку
+        '''
+        _, body = await self.request(
+            'POST',
+            bucket,
+            object_name,
+            query={'uploads': ''},
+            headers={'content-type': content_type}
+        )
+        return ElementTree.fromstring(body).findtext(f'{S3_NAMESPACE}UploadId', '')
+
+    async def upload_part(
+        self,
+        bucket: str,
+        object_name: str,
+        upload_id: str,
+        part_number: int,
+        data: bytes
+    ) -> str:
+        '''
+        Загрузка части составного объекта. Все части, кроме последней, \
+            должны быть не меньше 5 МиБ
+
+        Args:
+            bucket (str): Имя bucket
+            object_name (str): Имя объекта
+            upload_id (str): Идентификатор составной загрузки
+            part_number (int): Номер части, начиная с 1
+            data (bytes): Содержимое части
+
+        Returns:
+            str: ETag части
+
+        Raises:
+            S3Error: S3 вернул ошибку
+        '''
+        headers, _ = await self.request(
+            'PUT',
+            bucket,
+            object_name,
+            query={'partNumber': str(part_number), 'uploadId': upload_id},
+            body=data
+        )
+        return headers.get('ETag', '').strip('"')
+
+    async def complete_multipart_upload(
+        self,
+        bucket: str,
+        object_name: str,
+        upload_id: str,
+        parts: list[tuple[int, str]]
+    ) -> str:
+        '''
+        Сборка объекта из загруженных частей
+
+        Args:
+            bucket (str): Имя bucket
+            object_name (str): Имя объекта
+            upload_id (str): Идентификатор составной загрузки
+            parts (list[tuple[int, str]]): Номера и ETag частей
+
+        Returns:
+            str: ETag объекта
+
+        Raises:
+            S3Error: S3 вернул ошибку, в том числе в теле ответа 200
+        '''
+        body = ''.join(
+            f'<Part><PartNumber>{number}</PartNumber><ETag>"{etag}"</ETag></Part>'
+            for number, etag in sorted(parts)
+        )
+        _, response = await self.request(
+            'POST',
+            bucket,
+            object_name,
+            query={'uploadId': upload_id},
+            body=f'<CompleteMultipartUpload>{body}</CompleteMultipartUpload>'.encode(),
+            headers={'content-type': 'application/xml'}
+        )
+        root = ElementTree.fromstring(response)
+        # Ошибка сборки может прийти после заголовков с кодом 200,
+        # корневой тег - с пространством имен или без него
+        if root.tag.rsplit('}', 1)[-1] == 'Error':
+            raise S3Error(
+                200,
+                root.findtext('{*}Code', ''),
+                root.findtext('{*}Message', ''),
+                self._path(bucket, object_name)
+            )
+        return root.findtext(f'{S3_NAMESPACE}ETag', '').strip('"')
+
+    async def abort_multipart_upload(
+        self,
+        bucket: str,
+        object_name: str,
+        upload_id: str
+    ) -> None:
+        await self.request(
+            'DELETE', bucket, object_name, query={'uploadId': upload_id}
+        )
@@ -1,12 +1,162 @@
-from pathlib import Path
+from typing import AsyncContextManager, BinaryIO, Callable
+import io
+import asyncio
 import aiohttp
 import aiofiles
 from io import BytesIO
 
 
+class StreamReader(io.RawIOBase):
+    '''
+    Синхронный файловый объект поверх асинхронного потока данных. \
+        Читается в отдельном потоке, данные передаются из цикла событий \
+        через ограниченную очередь
+    '''
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        queue: asyncio.Queue[bytes | BaseException | None]
+    ) -> None:
+        '''
+        Синхронный файловый объект поверх асинхронного потока данных
+
+        Args:
+            loop (asyncio.AbstractEventLoop): Цикл событий, \
+                в котором заполняется очередь
+            queue (asyncio.Queue[bytes | BaseException | None]): Очередь \
+                фрагментов данных. `None` - конец потока, \
+                исключение - ошибка загрузки
+        '''
+        self.loop = loop
+        self.queue = queue
+        self._buffer = memoryview(b'')
+        self._eof = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:  # type: ignore
+        if not self._buffer:
+            if self._eof:
+                return 0
+            item = asyncio.run_coroutine_threadsafe(
+                self.queue.get(), self.loop
+            ).result()
+            if item is None:
+                self._eof = True
+                return 0
+            if isinstance(item, BaseException):
+                raise item
+            self._buffer = memoryview(item)
+
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
 class StorageService:
-    def __init__(self) -> None:
-        pass
+    '''
+    Сервис файлов. Один объект на процесс приложения: HTTP-загрузки \
+        идут через одну сессию aiohttp с общим пулом соединений, \
+        поэтому соединения с MinIO переиспользуются между запросами
+    '''
+    # Размер фрагмента при потоковом чтении файла
+    STREAM_CHUNK_SIZE = 1024 * 1024
+    # Количество фрагментов, загруженных впрок, пока читатель занят
+    STREAM_QUEUE_SIZE = 8
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 32,
+        keepalive_timeout: float = 30.0,
+        dns_cache_ttl: int = 300,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 60.0,
+        chunk_size: int = STREAM_CHUNK_SIZE
+    ) -> None:
+        '''
+        Сервис файлов. Сессия создается при первой загрузке, \
+            внутри цикла событий приложения
+
+        Args:
+            limit (int): Наибольшее количество соединений в пуле
+            limit_per_host (int): Наибольшее количество соединений \
+                с одним хостом
+            keepalive_timeout (float): Время жизни простаивающего \
+                соединения, секунд
+            dns_cache_ttl (int): Время хранения адресов в кэше DNS, секунд
+            connect_timeout (float): Таймаут подключения, секунд
+            read_timeout (float): Таймаут чтения очередного фрагмента, секунд
+            chunk_size (int): Размер фрагмента загрузки, байт
+        '''
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.timeout = aiohttp.ClientTimeout(
+            total=None, connect=connect_timeout, sock_read=read_timeout
+        )
+        self.chunk_size = chunk_size
+        self._session: aiohttp.ClientSession | None = None
+        self._pool_hits = 0
+        self._pool_misses = 0
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        '''
+        Общая сессия aiohttp, создается при первом обращении
+
+        Returns:
+            aiohttp.ClientSession: Сессия с пулом соединений
+        '''
+        if self._session is None or self._session.closed:
+            trace = aiohttp.TraceConfig()
+            trace.on_connection_reuseconn.append(self._on_pool_hit)
+            trace.on_connection_create_end.append(self._on_pool_miss)
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.limit,
+                    limit_per_host=self.limit_per_host,
+                    keepalive_timeout=self.keepalive_timeout,
+                    use_dns_cache=True,
+                    ttl_dns_cache=self.dns_cache_ttl
+                ),
+                timeout=self.timeout,
+                trace_configs=[trace]
+            )
+        return self._session
+
+    async def _on_pool_hit(self, *args) -> None:
+        self._pool_hits += 1
+
+    async def _on_pool_miss(self, *args) -> None:
+        self._pool_misses += 1
+
+    def pool_statistics(self) -> dict[str, int]:
+        '''
+        Счетчики пула соединений
+
+        Returns:
+            dict[str, int]: `hits` - запросы через открытое соединение, \
+                `misses` - запросы, открывшие новое соединение, \
+                `limit` - наибольшее количество соединений
+        '''
+        return {
+            'hits': self._pool_hits,
+            'misses': self._pool_misses,
+            'limit': self.limit,
+        }
+
+    async def close(self) -> None:
+        '''
+        Закрытие сессии и всех соединений пула
+        '''
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
 
     def split_file_name(self, full_file_name: str) -> tuple[str, str]:
         '''
@@ -25,25 +175,55 @@ class StorageService:
         file_name = ".".join(splitted)
         return (file_name, extension)
 
-    async def download_file(self, url: str, filename: str) -> None:
+    async def read_response_stream[T](
+        self,
+        open_response: Callable[[], AsyncContextManager[aiohttp.ClientResponse]],
+        read: Callable[[BinaryIO], T]
+    ) -> T:
         '''
-        Асинхронная загрузка файла
+        Чтение тела HTTP-ответа по мере загрузки, без записи на диск
 
         Args:
-            url (str): URL-файла
-            filename (str): Имя файла
-        '''
-        file = Path(filename)
-        parent = file.parent.absolute()
-        parent.mkdir(parents=True, exist_ok=True)
-        if file.exists():
-            file.unlink(True)
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                async with aiofiles.open(filename, 'wb') as f:
-                    async for chunk in response.content.iter_chunked(1024):
-                        await f.write(chunk)
+            open_response (Callable[[], AsyncContextManager[aiohttp.ClientResponse]]): \
+                Функция, открывающая успешный ответ, \
+                например подписанный запрос к S3
+            read (Callable[[BinaryIO], T]): Синхронная функция чтения
+
+        Returns:
+            T: Результат функции `read`
+        '''
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue[bytes | BaseException | None] = asyncio.Queue(
+            self.STREAM_QUEUE_SIZE
+        )
+
+        async def feed() -> None:
+            try:
+                async with open_response() as response:
+                    async for chunk in response.content.iter_chunked(
+                        self.chunk_size
+                    ):
+                        await queue.put(chunk)
+                await queue.put(None)
+            except asyncio.CancelledError:
+                # Читатель больше не ждет данных, но поток чтения
+                # не должен остаться заблокированным на пустой очереди
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+                raise
+            except Exception as exc:
+                await queue.put(exc)
+
+        reader = io.BufferedReader(
+            StreamReader(loop, queue),
+            buffer_size=self.chunk_size
+        )
+        task = asyncio.create_task(feed())
+        try:
+            return await asyncio.to_thread(read, reader)
+        finally:
+            task.cancel()
 
     async def read_file(self, file_path: str, encoding="utf-8") -> str:
         async with aiofiles.open(file_path, "r", encoding=encoding) as f:
@@ -2,6 +2,37 @@ function image_tag(img_path) {
     return $(`<img style="width: 30%;" src="${img_path}"></img>`)
 }
 
+function roc_chart(modelName, curve) {
+    // ROC-кривая по ряду точек: оси от 0 до 1, ось TPR направлена вверх
+    const size = 300;
+    const padding = 40;
+    const scale = size - 2 * padding;
+    const x = fpr => (padding + fpr * scale).toFixed(1);
+    const y = tpr => (size - padding - tpr * scale).toFixed(1);
+    const points = curve.fpr.map((fpr, i) => `${x(fpr)},${y(curve.tpr[i])}`).join(' ');
+
+    return $(`
+        <figure style="width: 30%;">
+            <svg viewBox="0 0 ${size} ${size}" width="100%">
+                <rect x="${padding}" y="${padding}" width="${scale}" height="${scale}"
+                    fill="none" stroke="currentColor" stroke-width="1"></rect>
+                <line x1="${x(0)}" y1="${y(0)}" x2="${x(1)}" y2="${y(1)}"
+                    stroke="grey" stroke-dasharray="4 4" stroke-width="1"></line>
+                <polyline points="${points}" fill="none" stroke="steelblue" stroke-width="2"></polyline>
+                <text x="${size / 2}" y="${size - 10}" text-anchor="middle" font-size="12" fill="currentColor">FPR</text>
+                <text x="12" y="${size / 2}" text-anchor="middle" font-size="12" fill="currentColor"
+                    transform="rotate(-90 12 ${size / 2})">TPR</text>
+            </svg>
+            <figcaption>${modelName} (AUC = ${Number(curve.auc).toFixed(4)})</figcaption>
+        </figure>
+    `);
+}
+
+function roc_tag(modelName, roc) {
+    // Ряд точек рисуется на клиенте, строка - URL изображения в MinIO
+    return typeof roc === 'string' ? image_tag(roc) : roc_chart(modelName, roc);
+}
+
 async function getAnalytics() {
     try {
         const response = await $.ajax({
@@ -35,10 +66,10 @@ async function getAnalytics() {
             // Находим ROC-кривую в confussion_matrixes
             const cm = response.confussion_matrixes.find(c => c.method === modelName);
             if (cm && cm.roc_curve) {
-                $item.append(image_tag(cm.roc_curve));
+                $item.append(roc_tag(modelName, cm.roc_curve));
             } else if (response.graphs[modelName]) {
                 // fallback на graphs, если нет в confussion_matrixes
-                $item.append(image_tag(response.graphs[modelName]));
+                $item.append(roc_tag(modelName, response.graphs[modelName]));
             }
 
             // Матрица ошибок
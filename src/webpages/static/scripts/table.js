@@ -41,7 +41,21 @@ function table(table_name, data) {
     }
 
     /* ==================================
-       CASE 2: confusion matrix
+       CASE 2: compact page {columns, index, rows}
+       ================================== */
+    if (Array.isArray(data.columns) && Array.isArray(data.rows)) {
+        const nested = {};
+        data.columns.forEach((col, j) => {
+            nested[col] = {};
+            data.rows.forEach((row, i) => {
+                nested[col][data.index[i]] = row[j];
+            });
+        });
+        data = nested;
+    }
+
+    /* ==================================
+       CASE 3: confusion matrix
        ================================== */
     const columns = Object.keys(data);
     const rows = Object.keys(data[columns[0]]);
@@ -0,0 +1,32 @@
+import os
+
+# Настройки приложения читаются при импорте модулей, поэтому для тестов
+# без .env задаются значения-заглушки
+_SETTINGS = {
+    'MINIO__ACCESS_KEY': 'test',
+    'MINIO__SECRET_KEY': 'test',
+    'MINIO__BUCKET_NAME': 'test',
+    'MINIO__ROOT_USER': 'test',
+    'MINIO__ROOT_PASSWORD': 'test',
+    'MINIO__PORT': '9000',
+    'MINIO__PORT_SECURE': '9443',
+    'MINIO__ENDPOINT': 'localhost:9000',
+    'MINIO__IP_ADDRESS': '127.0.0.1',
+    'POSTGRES__HOST': 'localhost',
+    'POSTGRES__PORT': '5432',
+    'POSTGRES__DB': 'test',
+    'POSTGRES__USER': 'test',
+    'POSTGRES__PASSWORD': 'test',
+    'TELEGRAM__BOT_TOKEN': 'test',
+    'TELEGRAM__CHANNEL_ID': 'test',
+    'TELEGRAM__CHANNEL_NAME': 'test',
+    'ATTACHMENT__MAX_SIZE': '1048576',
+    'ATTACHMENT__EXTENSIONS': '["png"]',
+    'APP__STATIC_PATH': 'webpages/static',
+    'APP__TEMPLATES_PATH': 'webpages/templates',
+    'JWT__ACCESS_TOKEN_EXPIRE': '30',
+    'JWT__ALGORITHM': 'HS256',
+    'JWT__SECRET_KEY': 'test',
+}
+for name, value in _SETTINGS.items():
+    os.environ.setdefault(name, value)
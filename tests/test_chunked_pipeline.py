@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDClassifier
+from sklearn.naive_bayes import GaussianNB
+from analytics.services.chunked_pipeline import evaluate_chunked
+
+
+def test_evaluate_chunked_with_short_tail_chunk(tmp_path):
+    # 11 строк по 10 в фрагменте: в последнем фрагменте одна строка,
+    # и обучающая или тестовая часть фрагмента пуста
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'price': rng.random(11),
+        'rating': rng.random(11),
+        'relevance': np.tile([1.0, 3.0], 6)[:11],
+    })
+    path = tmp_path / 'train.csv'
+    df.to_csv(path, sep=';', index=False)
+
+    evaluations = evaluate_chunked(
+        [SGDClassifier(loss='log_loss', random_state=42), GaussianNB()],
+        [None, None],
+        path.as_uri(),
+        chunk_rows=10
+    )
+
+    assert [evaluation['model'] for evaluation in evaluations] == [
+        'SGDClassifier', 'GaussianNB'
+    ]
+    for evaluation in evaluations:
+        assert evaluation['matrix'].to_numpy().sum() > 0